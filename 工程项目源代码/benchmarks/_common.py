@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+基准测试公共函数 - 统一的分位数格式和结果输出
+
+所有基准测试的分位数都使用 percentiles() 的同一组键，单位由 scale 换算后在
+字段名(如 latency_ms、gap_ms)或脚本说明中注明，不同基准测试和不同版本的结果可以直接比较；
+src/audio_output.py 中 AudioOutputArbiter.stats() 的 wait_ms 也使用这组键。
+"""
+
+import json
+from typing import Optional
+
+def percentiles(samples, scale: float = 1.0, digits: int = 3) -> dict:
+    """样本的数量、平均值、p50/p90/p95/p99 和最大值
+
+    samples 乘以 scale 后保留 digits 位小数(如秒转毫秒传入 scale=1000)，
+    分位数取最近秩；没有样本时只返回 count。
+    """
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * scale, digits)
+    return {
+        'count': len(ordered),
+        'mean': round(sum(ordered) / len(ordered) * scale, digits),
+        'p50': pick(0.50),
+        'p90': pick(0.90),
+        'p95': pick(0.95),
+        'p99': pick(0.99),
+        'max': round(ordered[-1] * scale, digits)
+    }
+
+def write_result(result: dict, output: Optional[str] = None):
+    """结果JSON写入 output 文件，未指定文件时输出到标准输出"""
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
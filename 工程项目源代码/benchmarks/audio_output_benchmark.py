@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语音输出调度基准测试 - 多个线程同时播报时的重叠、等待时间和播报间隔
+
+用法:
+    python benchmarks/audio_output_benchmark.py
+    python benchmarks/audio_output_benchmark.py --duration 20 --tts-latency 0.3 --output audio_output.json
+
+VoiceAssistant 使用模拟的讯飞合成(--tts-latency 秒)和播放器(按音频文件大小播放，
+每个字 --seconds-per-char 秒)。提醒(ALERT)、操作回应(INTERACTIVE)、家人消息
+(MESSAGE，成批到达)和系统提示(SYSTEM)各由独立线程在 --duration 秒内随机调用
+speak()，与主程序中提醒线程、按钮回调、消息处理线程同时播报的情况相同。测量:
+    overlaps          - 播放器仍在播放时又开始播放另一段音频的次数(应为0)
+    wait_ms           - 各优先级从提交到开始播放的等待时间
+    gap_ms            - 有播报在等待时，上一段播放结束到下一段开始的间隔
+    concatenated/preempted/ducked - 合并播放、打断和降低音量的次数
+    unfinished        - speak() 没有返回的次数(应为0)
+有重叠、speak() 未返回或提醒等待时间超过 --alert-budget-ms 时退出码为1。
+结果以JSON输出。
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import AUDIO_OUTPUT_CONFIG
+from src.voice_assistant import VoiceAssistant
+from src.audio_output import SpeechPriority
+from benchmarks._common import percentiles, write_result
+
+BYTES_PER_SECOND = 16000  # 模拟音频的码率: 文件大小/码率 = 播放时长
+
+# 每个优先级的播报内容和平均间隔(秒)，MESSAGE 一次到达 1~3 条
+SPEAKERS = {
+    SpeechPriority.ALERT: ("该吃药了", 3.0),
+    SpeechPriority.INTERACTIVE: ("好的，已为您设置提醒", 2.0),
+    SpeechPriority.MESSAGE: ("您有来自子女的新消息：晚上回家吃饭", 3.0),
+    SpeechPriority.SYSTEM: ("语音助手已启用", 8.0)
+}
+
+class SimulatedTTS:
+    """讯飞语音合成 - 阻塞 latency 秒，音频文件记录播报编号，大小对应播放时长"""
+
+    def __init__(self, latency: float, seconds_per_char: float):
+        self.latency = latency
+        self.seconds_per_char = seconds_per_char
+
+    def synthesis(self, text, voice='xiaoyan', speed=50, pitch=50, volume=50, cancel_token=None):
+        time.sleep(self.latency)
+        uid = re.match(r'#(\d+);', text).group(1)
+        size = max(1000, int(len(text) * self.seconds_per_char * BYTES_PER_SECOND))
+        header = f"#{uid};".encode()
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as f:
+            f.write(header + b'\x00' * (size - len(header)))
+        return f.name
+
+class SimulatedMusic:
+    """pygame.mixer.music - 按文件大小播放，记录每段播放和重叠"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded = None
+        self.until = 0.0
+        self.segments = []  # (开始, 结束, [播报编号])
+        self.overlaps = 0
+        self.volumes = []
+
+    def load(self, path: str):
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.loaded = ([int(uid) for uid in re.findall(rb'#(\d+);', data)], len(data) / BYTES_PER_SECOND)
+
+    def play(self):
+        with self.lock:
+            now = time.perf_counter()
+            if now < self.until:
+                self.overlaps += 1
+                self._end(now)
+            uids, duration = self.loaded
+            self.until = now + duration
+            self.segments.append([now, self.until, uids])
+
+    def get_busy(self) -> bool:
+        return time.perf_counter() < self.until
+
+    def stop(self):
+        with self.lock:
+            self._end(time.perf_counter())
+
+    def fadeout(self, ms: int):
+        self.stop()
+
+    def _end(self, now: float):
+        if self.segments and now < self.until:
+            self.segments[-1][1] = now
+        self.until = 0.0
+
+    def set_volume(self, volume: float):
+        self.volumes.append(volume)
+
+    def unload(self):
+        self.loaded = None
+
+def run(args) -> dict:
+    assistant = VoiceAssistant()
+    assistant._xunfei_tts = SimulatedTTS(args.tts_latency, args.seconds_per_char)
+    music = SimulatedMusic()
+    assistant._pygame = SimpleNamespace(mixer=SimpleNamespace(music=music))
+
+    uids = iter(range(1_000_000))
+    uid_lock = threading.Lock()
+    submitted = {}  # 播报编号 -> 提交时间
+    unfinished = []
+    deadline = time.perf_counter() + args.duration
+
+    def say(priority: SpeechPriority, text: str):
+        with uid_lock:
+            uid = next(uids)
+            submitted[uid] = time.perf_counter()
+        # speak() 阻塞到播放结束，主程序中每次播报都在各自的线程里调用
+        worker = threading.Thread(target=assistant.speak, args=(f"#{uid};{text}",),
+                                  kwargs={'priority': priority}, daemon=True)
+        worker.start()
+        return worker
+
+    def speaker(priority: SpeechPriority, rng: random.Random):
+        text, interval = SPEAKERS[priority]
+        workers = []
+        while True:
+            time.sleep(rng.expovariate(1 / interval))
+            if time.perf_counter() >= deadline:
+                break
+            count = rng.randint(1, 3) if priority == SpeechPriority.MESSAGE else 1
+            workers.extend(say(priority, text) for _ in range(count))
+        for worker in workers:
+            worker.join(args.duration + 30)
+            if worker.is_alive():
+                unfinished.append(priority.name)
+
+    speakers = [threading.Thread(target=speaker, args=(priority, random.Random(args.seed + priority)))
+                for priority in SPEAKERS]
+    for thread in speakers:
+        thread.start()
+    for thread in speakers:
+        thread.join()
+
+    stats = assistant.output.stats()
+    assistant.shutdown()
+
+    # 有播报在等待(提交早于上一段结束)时两段播放之间的间隔
+    gaps = []
+    for previous, current in zip(music.segments, music.segments[1:]):
+        if min(submitted[uid] for uid in current[2]) < previous[1]:
+            gaps.append((current[0] - previous[1]) * 1000)
+
+    return {'stats': stats, 'overlaps': music.overlaps, 'segments': len(music.segments),
+            'gap_ms': percentiles(gaps), 'unfinished': unfinished}
+
+def main():
+    parser = argparse.ArgumentParser(description="语音输出调度基准测试")
+    parser.add_argument('--duration', type=float, default=10.0, help="各线程提交播报的时长(秒)")
+    parser.add_argument('--tts-latency', type=float, default=0.2, help="模拟的语音合成耗时(秒)")
+    parser.add_argument('--seconds-per-char', type=float, default=0.05, help="模拟的每个字播放时长(秒)")
+    parser.add_argument('--alert-budget-ms', type=float, default=1000.0, help="提醒播报的最大允许等待时间(毫秒)")
+    parser.add_argument('--seed', type=int, default=1, help="随机数种子")
+    parser.add_argument('--output', help="结果JSON文件路径，默认输出到标准输出")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    measured = run(args)
+    stats = measured['stats']
+    failures = []
+    if measured['overlaps']:
+        failures.append(f"播放重叠 {measured['overlaps']} 次")
+    if measured['unfinished']:
+        failures.append(f"{len(measured['unfinished'])} 次 speak() 没有返回")
+    alert_wait = stats['wait_ms'].get('alert', {}).get('max')
+    if alert_wait is not None and alert_wait > args.alert_budget_ms:
+        failures.append(f"提醒等待 {alert_wait:.1f} ms 超过 {args.alert_budget_ms} ms")
+
+    result = {
+        'benchmark': 'audio_output',
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'parameters': {'duration': args.duration, 'tts_latency': args.tts_latency,
+                       'seconds_per_char': args.seconds_per_char, 'alert_budget_ms': args.alert_budget_ms,
+                       'seed': args.seed, **{k.lower(): v for k, v in AUDIO_OUTPUT_CONFIG.items()}},
+        'overlaps': measured['overlaps'],
+        'segments': measured['segments'],
+        'gap_ms': measured['gap_ms'],
+        'wait_ms': stats['wait_ms'],
+        'max_queue_depth': stats['max_queue_depth'],
+        'counts': {name: stats[name] for name in ('submitted', 'played', 'interrupted', 'cancelled', 'failed',
+                                                  'dropped', 'preempted', 'ducked', 'concatenated')},
+        'unfinished': len(measured['unfinished']),
+        'failures': failures
+    }
+
+    write_result(result, args.output)
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+停止按钮响应基准测试 - 语音操作各阶段从 STOP 到静音的耗时
+
+用法:
+    python benchmarks/cancel_benchmark.py --runs 20
+    python benchmarks/cancel_benchmark.py --asr-latency 2 --llm-latency 3 --budget-ms 200 --output cancel.json
+
+VoiceAssistant 使用模拟的后端(不访问网络和声卡)：测量录音阶段时录音流按采样率
+实时返回静音数据(其他阶段立即返回)，百度识别和DeepSeek请求按 --asr-latency/--llm-latency 阻塞且不响应取消(与
+SDK中的HTTP请求一样)，讯飞合成在 --tts-latency 内等待模拟的WebSocket连接、取消时
+连接被关闭，播放器按 --playback 秒播放。每次运行经状态机开始一次语音操作，在
+record/asr/llm/tts/playback 阶段进行到一半时发送 STOP，测量:
+    silence_ms        - STOP 到该阶段停止(录音流关闭、不再等待请求、连接关闭、播放停止)
+    worker_exit_ms    - STOP 到工作线程返回
+    calls_after_stop  - STOP 之后仍然发起的识别/大模型/合成/播放调用次数(应为0)
+任一阶段 silence_ms 的最大值超过 --budget-ms 或 STOP 后仍有调用时退出码为1。
+结果以JSON输出。
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import AUDIO_CONFIG
+from src.voice_assistant import VoiceAssistant
+from src.state_machine import OperationCancelled, StateMachine, SystemEvent, on_cancel
+from benchmarks._common import percentiles, write_result
+
+STAGES = ('record', 'asr', 'llm', 'tts', 'playback')
+
+class Probe:
+    """记录模拟后端的调用：阶段开始、STOP 之后的调用和各阶段停止的时间"""
+
+    def __init__(self):
+        self.entered = {stage: threading.Event() for stage in STAGES}
+        self.stopped_at = {}
+        self.stop_sent = None
+        self.calls_after_stop = 0
+
+    def enter(self, stage: str):
+        if self.stop_sent is not None:
+            self.calls_after_stop += 1
+        self.entered[stage].set()
+
+    def silenced(self, stage: str):
+        self.stopped_at.setdefault(stage, time.perf_counter())
+
+class SimulatedStream:
+    """录音流 - 按采样率实时返回静音数据，realtime 为False时立即返回(测量其他阶段时跳过录音)"""
+
+    def __init__(self, probe: Probe, rate: int, realtime: bool):
+        self.probe = probe
+        self.rate = rate
+        self.realtime = realtime
+
+    def read(self, chunk: int) -> bytes:
+        self.probe.enter('record')
+        if self.realtime:
+            time.sleep(chunk / self.rate)
+        return b'\x00\x00' * chunk
+
+    def stop_stream(self):
+        self.probe.silenced('record')
+
+    def close(self):
+        pass
+
+class SimulatedAudio:
+    """PyAudio 的替代"""
+
+    def __init__(self, probe: Probe, realtime: bool):
+        self.probe = probe
+        self.realtime = realtime
+
+    def open(self, rate: int, **kwargs) -> SimulatedStream:
+        return SimulatedStream(self.probe, rate, self.realtime)
+
+    def get_format_from_width(self, width: int) -> int:
+        return 8
+
+    def get_sample_size(self, format: int) -> int:
+        return 2
+
+class SimulatedSpeech:
+    """百度语音识别 - 阻塞 latency 秒，不响应取消"""
+
+    def __init__(self, probe: Probe, latency: float):
+        self.probe = probe
+        self.latency = latency
+
+    def asr(self, *args, **kwargs) -> dict:
+        self.probe.enter('asr')
+        time.sleep(self.latency)
+        return {'err_no': 0, 'result': ['十分钟后提醒我吃药']}
+
+class SimulatedCompletions:
+    """DeepSeek 请求 - 阻塞 latency 秒，不响应取消"""
+
+    def __init__(self, probe: Probe, latency: float):
+        self.probe = probe
+        self.latency = latency
+
+    def create(self, **kwargs):
+        self.probe.enter('llm')
+        time.sleep(self.latency)
+        content = json.dumps({'intent': 'set_reminder', 'task': '吃药', 'time_value': 10,
+                              'time_unit': '分钟', 'confidence': 0.95}, ensure_ascii=False)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+class SimulatedTTS:
+    """讯飞语音合成 - 与 XunfeiTTS.synthesis 相同：取消时关闭连接并抛出 OperationCancelled"""
+
+    def __init__(self, probe: Probe, latency: float):
+        self.probe = probe
+        self.latency = latency
+
+    def synthesis(self, text, voice='xiaoyan', speed=50, pitch=50, volume=50, cancel_token=None):
+        self.probe.enter('tts')
+        connection = threading.Event()  # 模拟的WebSocket连接，关闭时置位
+
+        def abort():
+            self.probe.silenced('tts')
+            connection.set()
+
+        with on_cancel(cancel_token, abort):
+            connection.wait(self.latency)
+        if cancel_token is not None and cancel_token.cancelled:
+            raise OperationCancelled()
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as f:
+            f.write(b'\x00' * 2048)
+        return f.name
+
+class SimulatedMusic:
+    """pygame.mixer.music - 播放 duration 秒"""
+
+    def __init__(self, probe: Probe, duration: float):
+        self.probe = probe
+        self.duration = duration
+        self.until = 0.0
+
+    def load(self, path: str):
+        pass
+
+    def play(self):
+        self.probe.enter('playback')
+        self.until = time.perf_counter() + self.duration
+
+    def get_busy(self) -> bool:
+        return time.perf_counter() < self.until
+
+    def stop(self):
+        if self.get_busy():
+            self.probe.silenced('playback')
+        self.until = 0.0
+
+    def unload(self):
+        pass
+
+    def set_volume(self, volume: float):
+        pass
+
+    def fadeout(self, ms: int):
+        self.stop()
+
+def build_assistant(probe: Probe, args, realtime_recording: bool) -> VoiceAssistant:
+    """创建使用模拟后端的语音助手"""
+    assistant = VoiceAssistant()
+    assistant._audio = SimulatedAudio(probe, realtime_recording)
+    assistant.aip_speech = SimulatedSpeech(probe, args.asr_latency)
+    assistant._openai_client = SimpleNamespace(chat=SimpleNamespace(
+        completions=SimulatedCompletions(probe, args.llm_latency)))
+    assistant._xunfei_tts = SimulatedTTS(probe, args.tts_latency)
+    assistant._pygame = SimpleNamespace(mixer=SimpleNamespace(music=SimulatedMusic(probe, args.playback)))
+    return assistant
+
+def measure_stop(stage: str, args) -> dict:
+    """开始一次语音操作，在 stage 阶段进行到一半时发送 STOP"""
+    probe = Probe()
+    assistant = build_assistant(probe, args, realtime_recording=stage == 'record')
+    machine = StateMachine()
+    machine.post(SystemEvent.RECORD)
+    token = machine.token
+    finished = {}
+
+    def operation():
+        try:
+            assistant.process_voice_command(
+                cancel_token=token,
+                on_transcribed=lambda text: machine.post(SystemEvent.SPEECH_CAPTURED, token))
+        except OperationCancelled:
+            pass
+        finally:
+            finished['at'] = time.perf_counter()
+
+    worker = threading.Thread(target=operation, daemon=True)
+    worker.start()
+    latency = {'record': args.record_offset, 'asr': args.asr_latency, 'llm': args.llm_latency,
+               'tts': args.tts_latency, 'playback': args.playback}[stage]
+    if not probe.entered[stage].wait(30):
+        return {'error': f"未进入 {stage} 阶段"}
+    time.sleep(latency / 2)
+
+    probe.stop_sent = time.perf_counter()
+    machine.post(SystemEvent.STOP)
+    worker.join(30)
+    assistant.shutdown()
+
+    # 识别和大模型请求无法中止，工作线程不再等待它们即视为停止
+    silenced = probe.stopped_at.get(stage, finished.get('at'))
+    return {
+        'silence_ms': (silenced - probe.stop_sent) * 1000 if silenced else None,
+        'worker_exit_ms': (finished['at'] - probe.stop_sent) * 1000 if 'at' in finished else None,
+        'calls_after_stop': probe.calls_after_stop
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="停止按钮响应基准测试")
+    parser.add_argument('--runs', type=int, default=10, help="每个阶段的运行次数")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES), help="测量的阶段")
+    parser.add_argument('--record-offset', type=float, default=0.5, help="录音阶段的时长，进行到一半时发送STOP(秒)")
+    parser.add_argument('--asr-latency', type=float, default=1.0, help="模拟的语音识别请求耗时(秒)")
+    parser.add_argument('--llm-latency', type=float, default=1.5, help="模拟的大模型请求耗时(秒)")
+    parser.add_argument('--tts-latency', type=float, default=1.0, help="模拟的语音合成耗时(秒)")
+    parser.add_argument('--playback', type=float, default=2.0, help="模拟的播放时长(秒)")
+    parser.add_argument('--budget-ms', type=float, default=200.0, help="STOP到静音的最大允许耗时(毫秒)")
+    parser.add_argument('--output', help="结果JSON文件路径，默认输出到标准输出")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    stages, failures = {}, []
+    for stage in args.stages:
+        runs = [measure_stop(stage, args) for _ in range(args.runs)]
+        errors = [run['error'] for run in runs if 'error' in run]
+        runs = [run for run in runs if 'error' not in run]
+        silence = [run['silence_ms'] for run in runs if run['silence_ms'] is not None]
+        exits = [run['worker_exit_ms'] for run in runs if run['worker_exit_ms'] is not None]
+        calls = sum(run['calls_after_stop'] for run in runs)
+        stages[stage] = {
+            'runs': len(runs),
+            'silence_ms': percentiles(silence),
+            'worker_exit_ms': percentiles(exits),
+            'calls_after_stop': calls,
+            'errors': errors
+        }
+        if errors or len(silence) < len(runs):
+            failures.append(f"{stage}: 没有停止 ({len(runs) - len(silence)} 次) {' '.join(errors)}")
+        elif max(silence) > args.budget_ms:
+            failures.append(f"{stage}: STOP到静音 {max(silence):.1f} ms 超过 {args.budget_ms} ms")
+        if calls:
+            failures.append(f"{stage}: STOP 之后仍有 {calls} 次调用")
+
+    result = {
+        'benchmark': 'stop_to_silence',
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'parameters': {'runs': args.runs, 'chunk_ms': round(AUDIO_CONFIG['CHUNK_SIZE'] / AUDIO_CONFIG['SAMPLE_RATE'] * 1000, 1),
+                       'asr_latency': args.asr_latency, 'llm_latency': args.llm_latency,
+                       'tts_latency': args.tts_latency, 'playback': args.playback, 'budget_ms': args.budget_ms},
+        'stages': stages,
+        'failures': failures
+    }
+
+    write_result(result, args.output)
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
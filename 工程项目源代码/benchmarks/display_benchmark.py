@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+界面启动开销基准测试 - GUI模式与无界面模式对比
+
+用法:
+    python benchmarks/display_benchmark.py
+    python benchmarks/display_benchmark.py --reminders 20 --frames 60 --output display.json
+
+每种模式在独立的子进程中运行(互不共享已加载的模块)，测量:
+    startup_ms     - 从导入界面模块到第一帧显示完成的耗时
+    rss_mb         - 第一帧显示后的进程常驻内存
+    qt_loaded      - 进程中是否加载了Qt
+    frame_ms       - 无界面模式下绘制并写入一帧状态画面的耗时(输出到临时文件作为虚拟帧缓冲)
+GUI模式未设置 QT_QPA_PLATFORM 时使用 offscreen 平台；无界面模式绘制需要安装Pillow。
+结果以JSON输出。
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import percentiles, write_result
+
+def _rss_mb() -> float:
+    """当前进程常驻内存(MB)，仅支持Linux"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return 0.0
+
+def _reminders(count: int) -> list:
+    from src.reminder import ReminderManager
+    manager = ReminderManager(max_reminders=count, start_monitor=False)
+    manager.add_reminders([{'task': f'提醒{n}', 'scheduled_time': datetime.now() + timedelta(minutes=10 + n)}
+                           for n in range(count)])
+    reminders = manager.get_active_reminders()
+    manager.shutdown()
+    return reminders
+
+def measure_gui(reminders: int, frames: int, output: str) -> dict:
+    """子进程: GUI模式启动到第一帧显示"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    started = time.perf_counter()
+    from src.gui_controller import GUIController
+    controller = GUIController()
+    controller.update_reminder_list(_reminders(reminders))
+    controller.show()
+    controller.app.processEvents()
+    controller.main_window._apply_reminder_changes()
+    controller.app.processEvents()
+    return {'startup_ms': round((time.perf_counter() - started) * 1000, 1)}
+
+def measure_headless(reminders: int, frames: int, output: str) -> dict:
+    """子进程: 无界面模式启动到第一帧状态画面写入虚拟帧缓冲"""
+    started = time.perf_counter()
+    from src.status_display import StatusDisplayController
+    controller = StatusDisplayController(output=output)
+    controller.update_reminder_list(_reminders(reminders))
+    renderer = controller.renderer
+    if renderer:
+        renderer.render_frame(force=True)
+    result = {'startup_ms': round((time.perf_counter() - started) * 1000, 1),
+              'renderer': bool(renderer)}
+    if renderer:
+        times = []
+        for _ in range(frames):
+            frame_started = time.perf_counter()
+            renderer.render_frame(force=True)
+            times.append(time.perf_counter() - frame_started)
+        result.update({'frame_ms': percentiles(times, scale=1000), 'size': f"{renderer.width}x{renderer.height}",
+                       'pixel_format': renderer.pixel_format, 'bytes_written': os.path.getsize(output)})
+    return result
+
+MODES = {'gui': measure_gui, 'headless': measure_headless}
+
+def run_child(mode: str, reminders: int, frames: int, output: str) -> dict:
+    """在子进程中测量一种模式"""
+    command = [sys.executable, os.path.abspath(__file__), '--child', mode,
+               '--reminders', str(reminders), '--frames', str(frames), '--framebuffer', output]
+    started = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'error': completed.stderr.strip().splitlines()[-1:] or completed.returncode}
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['process_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="界面启动开销基准测试")
+    parser.add_argument('--reminders', type=int, default=20, help="提醒数量")
+    parser.add_argument('--frames', type=int, default=30, help="无界面模式测量的帧数")
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES), help="测量的模式")
+    parser.add_argument('--output', help="结果JSON文件路径，默认输出到标准输出")
+    parser.add_argument('--child', choices=list(MODES), help=argparse.SUPPRESS)
+    parser.add_argument('--framebuffer', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        import logging
+        logging.basicConfig(level=logging.WARNING)
+        from dotenv import load_dotenv
+        load_dotenv()
+        result = MODES[args.child](args.reminders, args.frames, args.framebuffer)
+        result.update({'rss_mb': _rss_mb(), 'qt_loaded': 'PyQt5.QtWidgets' in sys.modules})
+        print(json.dumps(result, ensure_ascii=False))
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        framebuffer = os.path.join(temp_dir, 'fb0')
+        result = {
+            'benchmark': 'display_startup',
+            'timestamp': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'parameters': {'reminders': args.reminders, 'frames': args.frames},
+            'modes': {mode: run_child(mode, args.reminders, args.frames, framebuffer) for mode in args.modes}
+        }
+
+    write_result(result, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GUI提醒列表帧时间基准测试 - 使用模拟时钟和离屏渲染
+
+用法:
+    python benchmarks/gui_benchmark.py
+    python benchmarks/gui_benchmark.py --sizes 10 100 1000 --frames 120 --output gui.json
+
+对每个提醒数量创建主界面(未设置 QT_QPA_PLATFORM 时使用 offscreen 平台)，
+模拟时钟每帧前进1秒，测量:
+    load          - 整体载入列表(update_reminder_list)的耗时
+    tick          - 主界面倒计时刷新一帧(应用增量+处理绘制事件)的耗时和发出 dataChanged 的行数
+    update        - 主界面每帧修改一个提醒内容的耗时
+    list_tick     - 单独的提醒列表(QListView+模型)倒计时刷新一帧的耗时
+    legacy_tick   - 对照组: 旧实现每帧清空同样大小的 QListWidget 并重建、排序所有列表项的耗时
+帧时间单位为毫秒，结果以JSON输出。
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QApplication, QListView, QListWidget, QListWidgetItem
+
+from src.gui_controller import VoiceReminderGUI
+from src.reminder import ReminderManager, ReminderChange, ChangeType
+from src.reminder_list_model import ReminderListModel
+from benchmarks._common import percentiles, write_result
+
+class SimulatedClock:
+    """模拟时钟 - 只在基准测试显式推进时前进"""
+
+    def __init__(self, start: datetime):
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def advance(self, seconds: float):
+        self._now += timedelta(seconds=seconds)
+
+def _legacy_rebuild(list_widget: QListWidget, reminders: list):
+    """旧实现: 清空列表后按时间排序重建所有列表项"""
+    list_widget.clear()
+    for index, reminder in enumerate(sorted(reminders, key=lambda r: r.scheduled_time)):
+        time_str = reminder.scheduled_time.strftime('%H:%M')
+        time_remaining = reminder.format_time_remaining()
+        if time_remaining and time_remaining != "已到期":
+            item_text = f"⏰ {time_str} - {reminder.task} (剩余: {time_remaining})"
+        else:
+            item_text = f"🔔 {time_str} - {reminder.task} (即将到时!)"
+        if index == 0:
+            item_text = f"📍 {item_text}"
+        item = QListWidgetItem(item_text)
+        remaining_seconds = reminder.time_remaining().total_seconds()
+        if remaining_seconds <= 60:
+            item.setBackground(QColor(255, 235, 235))
+        elif remaining_seconds <= 300:
+            item.setBackground(QColor(255, 248, 220))
+        list_widget.addItem(item)
+
+def run_size(app: QApplication, size: int, frames: int) -> dict:
+    """测量一个提醒数量下的帧时间"""
+    clock = SimulatedClock(datetime(2025, 1, 1, 8, 0, 0))
+    manager = ReminderManager(clock=clock.now, max_reminders=size, start_monitor=False)
+    # 提醒间隔30秒，列表中同时有按秒和按分钟变化的倒计时
+    manager.add_reminders([{'task': f'提醒{n}', 'scheduled_time': clock.now() + timedelta(seconds=600 + 30 * n)}
+                           for n in range(size)])
+    reminders = manager.get_active_reminders()
+
+    window = VoiceReminderGUI()
+    window.reminder_model.clock = clock.now
+    window.show()
+    app.processEvents()
+
+    rows_changed = []
+    window.reminder_model.dataChanged.connect(
+        lambda first, last, roles: rows_changed.append(last.row() - first.row() + 1))
+
+    started = time.perf_counter()
+    window.update_reminder_list(reminders)
+    window._apply_reminder_changes()
+    app.processEvents()
+    load_seconds = time.perf_counter() - started
+
+    tick_times, tick_rows = [], []
+    for _ in range(frames):
+        clock.advance(1)
+        rows_changed.clear()
+        started = time.perf_counter()
+        window.queue_reminder_changes([ReminderChange(ChangeType.TICK)])
+        window._apply_reminder_changes()
+        app.processEvents()
+        tick_times.append(time.perf_counter() - started)
+        tick_rows.append(sum(rows_changed))
+
+    update_times = []
+    for n in range(frames):
+        reminder = replace(reminders[n % size], task=f'修改后的提醒{n}')
+        started = time.perf_counter()
+        window.queue_reminder_changes([ReminderChange(ChangeType.UPDATED, reminder)])
+        window._apply_reminder_changes()
+        app.processEvents()
+        update_times.append(time.perf_counter() - started)
+
+    window.hide()
+    window.deleteLater()
+
+    # 单独的列表控件，与对照组条件相同
+    model = ReminderListModel(clock=clock.now)
+    model.apply_changes({r.id: ReminderChange(ChangeType.UPDATED, r) for r in reminders}, reset=True)
+    view = QListView()
+    view.setUniformItemSizes(True)
+    view.setModel(model)
+    view.setFixedSize(300, 250)
+    view.show()
+    app.processEvents()
+    list_times = []
+    for _ in range(frames):
+        clock.advance(1)
+        started = time.perf_counter()
+        model.apply_changes({}, tick=True)
+        app.processEvents()
+        list_times.append(time.perf_counter() - started)
+    view.hide()
+    view.deleteLater()
+
+    legacy = QListWidget()
+    legacy.setFixedSize(300, 250)
+    legacy.show()
+    legacy_times = []
+    for _ in range(frames):
+        clock.advance(1)
+        started = time.perf_counter()
+        _legacy_rebuild(legacy, reminders)
+        app.processEvents()
+        legacy_times.append(time.perf_counter() - started)
+    legacy.hide()
+    legacy.deleteLater()
+
+    manager.shutdown()
+    app.processEvents()
+    return {
+        'reminders': size,
+        'load_ms': round(load_seconds * 1000, 3),
+        'tick': dict(percentiles(tick_times, scale=1000), rows_changed_per_frame=round(sum(tick_rows) / len(tick_rows), 1)),
+        'update': percentiles(update_times, scale=1000),
+        'list_tick': percentiles(list_times, scale=1000),
+        'legacy_tick': percentiles(legacy_times, scale=1000)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI提醒列表帧时间基准测试")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help="提醒数量")
+    parser.add_argument('--frames', type=int, default=60, help="每项测量的帧数")
+    parser.add_argument('--output', help="结果JSON文件路径，默认输出到标准输出")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    result = {
+        'benchmark': 'gui_reminder_list',
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': app.platformName(),
+        'parameters': {'frames': args.frames},
+        'sizes': [run_size(app, size, args.frames) for size in args.sizes]
+    }
+
+    write_result(result, args.output)
+
+if __name__ == "__main__":
+    main()
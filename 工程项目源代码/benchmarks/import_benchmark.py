@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模块导入开销回归测试 - 基于 python -X importtime
+
+用法:
+    python benchmarks/import_benchmark.py --output imports.json
+    python benchmarks/import_benchmark.py --baseline imports.json --tolerance 0.25
+
+每个模块在独立的子进程中导入(--repeat 次取中位数)，子进程的环境变量中去掉
+所有API密钥，工作目录为空的临时目录，检查:
+    import_ms      - -X importtime 报告的该模块累计导入耗时(中位数/最小值)
+    top_self       - 自身导入耗时最多的几个模块，便于定位变慢的原因
+    heavy_loaded   - 导入后已加载的语音/大模型/Qt库(pygame、pyaudio、openai、aip、websocket、PyQt5)
+    error          - 导入失败(例如缺少密钥时抛出异常)的错误信息
+    created_paths  - 导入期间在工作目录中创建的文件和目录
+指定 --baseline 时与之前的结果比较：导入耗时超过基线的 (1+tolerance) 倍且多于
+--min-delta-ms 毫秒、加载了语音/大模型/Qt库、导入失败或创建了文件都视为回归，
+退出码为1。结果以JSON输出。
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks._common import write_result
+
+# 只用到提醒、Web服务和无界面显示的模块不应加载这些库
+HEAVY_MODULES = ['pygame', 'pyaudio', 'openai', 'aip', 'websocket', 'PyQt5']
+DEFAULT_MODULES = ['config', 'src.reminder', 'src.web_server', 'src.household',
+                   'src.status_display', 'src.voice_assistant', 'main']
+API_ENV_VARS = ['DEEPSEEK_API_KEY', 'BAIDU_APP_ID', 'BAIDU_API_KEY', 'BAIDU_SECRET_KEY',
+                'XUNFEI_APP_ID', 'XUNFEI_API_KEY', 'XUNFEI_API_SECRET']
+
+def _parse_importtime(stderr: str) -> dict:
+    """解析 -X importtime 的输出: 模块名 -> (自身耗时us, 累计耗时us)"""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头
+        timings[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return timings
+
+def measure_module(module: str, repeat: int, workdir: str) -> dict:
+    """在子进程中导入模块 repeat 次，返回累计耗时和已加载的重型库"""
+    env = {k: v for k, v in os.environ.items() if k not in API_ENV_VARS}
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    script = (f"import {module}, sys, json; "
+              f"print(json.dumps(sorted({{name.split('.')[0] for name in sys.modules}})))")
+
+    samples, timings, loaded = [], {}, []
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', script],
+                                   cwd=workdir, env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            error_lines = [line for line in completed.stderr.splitlines() if not line.startswith('import time:')]
+            return {'error': error_lines[-1] if error_lines else f"exit code {completed.returncode}"}
+        timings = _parse_importtime(completed.stderr)
+        if module in timings:
+            samples.append(timings[module][1] / 1000)
+        loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    top_self = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:5]
+    return {
+        'import_ms': {'median': round(statistics.median(samples), 2), 'min': round(min(samples), 2),
+                      'runs': len(samples)} if samples else None,
+        'top_self': [{'module': name, 'self_ms': round(self_us / 1000, 2)} for name, (self_us, _) in top_self],
+        'heavy_loaded': [name for name in HEAVY_MODULES if name in loaded]
+    }
+
+def compare(result: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    """与基线比较，返回回归列表"""
+    regressions = []
+    for module, current in result['modules'].items():
+        if 'error' in current:
+            regressions.append(f"{module}: 导入失败 - {current['error']}")
+            continue
+        if current['heavy_loaded']:
+            regressions.append(f"{module}: 加载了 {', '.join(current['heavy_loaded'])}")
+        previous = baseline.get('modules', {}).get(module, {}).get('import_ms')
+        if previous and current['import_ms']:
+            before, after = previous['median'], current['import_ms']['median']
+            current['ratio'] = round(after / before, 3) if before else None
+            if after > before * (1 + tolerance) and after - before > min_delta_ms:
+                regressions.append(f"{module}: 导入耗时 {before} ms -> {after} ms")
+    if result['created_paths']:
+        regressions.append(f"导入时创建了文件: {', '.join(result['created_paths'])}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="模块导入开销回归测试")
+    parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES, help="要测量的模块")
+    parser.add_argument('--repeat', type=int, default=5, help="每个模块导入的次数")
+    parser.add_argument('--baseline', help="基线结果JSON文件，指定时检查回归")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="允许的导入耗时增长比例")
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help="小于此增量的变化不算回归(毫秒)")
+    parser.add_argument('--output', help="结果JSON文件路径，默认输出到标准输出")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        modules = {module: measure_module(module, args.repeat, workdir) for module in args.modules}
+        created = sorted(os.path.relpath(os.path.join(path, name), workdir)
+                         for path, dirs, files in os.walk(workdir) for name in dirs + files)
+
+    result = {
+        'benchmark': 'import_time',
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'parameters': {'repeat': args.repeat},
+        'modules': modules,
+        'created_paths': created
+    }
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        result['regressions'] = compare(result, baseline, args.tolerance, args.min_delta_ms)
+
+    write_result(result, args.output)
+    if result.get('regressions'):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+提醒管理器负载/耐久基准测试 - 使用模拟时钟
+
+用法:
+    python benchmarks/reminder_benchmark.py --reminders 10000 --hours 1
+    python benchmarks/reminder_benchmark.py --reminders 100000 --hours 2 --output result.json
+
+在模拟时钟上批量创建提醒，并随机穿插添加/取消/延迟操作，模拟时间按监控线程
+的唤醒规则推进(下一次倒计时刷新或下一个提醒到期，取较早者)。模拟时钟总是恰好
+推进到堆顶时间，无法反映触发延迟，因此触发偏差另外用真实时钟测量: 同样数量的
+提醒排在测量窗口之后，--jitter-reminders 个提醒分布在 --jitter-seconds 秒内，
+由真正的监控线程触发，同时主线程持续随机添加/取消/延迟。结果以JSON输出，
+便于跨版本比较:
+    trigger_jitter  - 监控线程触发时刻相对计划时间的延迟(真实秒)
+    cpu             - 每模拟小时消耗的CPU时间
+    memory          - 进程峰值RSS
+    status_summary  - get_status_summary 调用耗时(毫秒)
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.reminder import ReminderManager, ChangeType
+from benchmarks._common import percentiles, write_result
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+class SimulatedClock:
+    """模拟时钟 - 只在基准测试显式推进时前进"""
+
+    def __init__(self, start: datetime):
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def advance_to(self, moment: datetime):
+        if moment > self._now:
+            self._now = moment
+
+def _peak_rss_mb():
+    """进程峰值RSS(MB)"""
+    if resource is None:
+        return None
+    # Linux上ru_maxrss单位为KB
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def measure_trigger_jitter(background_count: int, jitter_count: int, window_seconds: float, seed: int) -> dict:
+    """用真实时钟和监控线程测量触发延迟
+
+    background_count 个提醒排在窗口之后(保持堆的规模)，jitter_count 个提醒分布
+    在窗口内；窗口期间主线程不停地对后台提醒随机添加/取消/延迟，与监控线程争用写锁。
+    """
+    rng = random.Random(seed)
+    lateness = []
+
+    def on_changes(changes):
+        now = datetime.now()
+        for change in changes:
+            reminder = change.reminder
+            if change.change_type == ChangeType.UPDATED and reminder.is_active and reminder.is_completed:
+                lateness.append((now - reminder.scheduled_time).total_seconds())
+
+    manager = ReminderManager(display_callback=on_changes,
+                              max_reminders=(background_count + jitter_count) * 2 + 1000)
+    later = datetime.now() + timedelta(seconds=window_seconds + 3600)
+    ids = [manager.add_reminder(f"后台提醒{n}", later + timedelta(seconds=rng.uniform(0, 3600)))
+           for n in range(background_count)]
+    ids = [reminder_id for reminder_id in ids if reminder_id]
+    window_start = datetime.now() + timedelta(seconds=1)
+    for n in range(jitter_count):
+        manager.add_reminder(f"计时提醒{n}", window_start + timedelta(seconds=rng.uniform(0, window_seconds)))
+
+    deadline = window_start + timedelta(seconds=window_seconds + 1)
+    while datetime.now() < deadline:
+        roll = rng.random()
+        if roll < 0.4 or not ids:
+            reminder_id = manager.add_reminder("随机添加", later + timedelta(seconds=rng.uniform(0, 3600)))
+            if reminder_id:
+                ids.append(reminder_id)
+        elif roll < 0.7:
+            manager.cancel_reminder(rng.choice(ids))
+        else:
+            manager.snooze_reminder(rng.choice(ids), minutes=rng.randint(1, 10))
+        time.sleep(0.001)
+    manager.shutdown()
+
+    return {'jitter': percentiles(lateness), 'missed': jitter_count - len(lateness)}
+
+def run_benchmark(reminder_count: int, sim_hours: float, ops_per_hour: int,
+                  summary_samples: int, tick_seconds: float, seed: int,
+                  jitter_reminders: int = 200, jitter_seconds: float = 10.0) -> dict:
+    """运行一次基准测试，返回结果字典"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, 8, 0, 0)
+    end = start + timedelta(hours=sim_hours)
+    clock = SimulatedClock(start)
+
+    triggered = []
+
+    def on_changes(changes):
+        triggered.extend(c for c in changes if c.change_type == ChangeType.UPDATED
+                         and c.reminder.is_active and c.reminder.is_completed)
+
+    manager = ReminderManager(display_callback=on_changes, clock=clock.now,
+                              max_reminders=reminder_count * 2, start_monitor=False)
+    rss_before = _peak_rss_mb()
+
+    # 初始加载: 提醒均匀分布在模拟时段内
+    horizon = sim_hours * 3600
+    load_started = time.perf_counter()
+    ids = []
+    for n in range(reminder_count):
+        reminder_id = manager.add_reminder(f"基准提醒{n}", start + timedelta(seconds=rng.uniform(1, horizon)))
+        if reminder_id:
+            ids.append(reminder_id)
+    load_seconds = time.perf_counter() - load_started
+
+    # 随机操作时间表
+    op_count = int(ops_per_hour * sim_hours)
+    operations = sorted(start + timedelta(seconds=rng.uniform(0, horizon)) for _ in range(op_count))
+    op_index = 0
+    op_counts = {'add': 0, 'cancel': 0, 'snooze': 0}
+
+    sample_interval = horizon / max(summary_samples, 1)
+    next_sample = start
+    summary_latencies = []
+    tick = timedelta(seconds=tick_seconds)
+    steps = 0
+
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    while clock.now() < end:
+        # 与监控线程相同的唤醒规则
+        moment = clock.now() + tick
+        next_due = manager.get_next_due_time()
+        if next_due is not None and next_due < moment:
+            moment = next_due
+        if op_index < len(operations) and operations[op_index] < moment:
+            moment = operations[op_index]
+        clock.advance_to(min(moment, end))
+        steps += 1
+
+        while op_index < len(operations) and operations[op_index] <= clock.now():
+            op_index += 1
+            roll = rng.random()
+            if roll < 0.4 or not ids:
+                reminder_id = manager.add_reminder(
+                    "随机添加", clock.now() + timedelta(seconds=rng.uniform(1, 1800)))
+                if reminder_id:
+                    ids.append(reminder_id)
+                op_counts['add'] += 1
+            elif roll < 0.7:
+                manager.cancel_reminder(rng.choice(ids))
+                op_counts['cancel'] += 1
+            else:
+                manager.snooze_reminder(rng.choice(ids), minutes=rng.randint(1, 10))
+                op_counts['snooze'] += 1
+
+        manager.check_and_trigger_due_reminders()
+
+        if clock.now() >= next_sample:
+            next_sample = clock.now() + timedelta(seconds=sample_interval)
+            sample_started = time.perf_counter()
+            manager.get_status_summary()
+            summary_latencies.append(time.perf_counter() - sample_started)
+    cpu_seconds = time.process_time() - cpu_started
+    wall_seconds = time.perf_counter() - wall_started
+
+    missed = sum(1 for r in manager.get_all_reminders()
+                 if r.is_active and not r.is_completed and r.scheduled_time <= end)
+    manager.shutdown()
+
+    jitter = measure_trigger_jitter(reminder_count, jitter_reminders, jitter_seconds, seed)
+
+    return {
+        'benchmark': 'reminder_manager',
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'parameters': {
+            'reminders': reminder_count,
+            'sim_hours': sim_hours,
+            'ops_per_hour': ops_per_hour,
+            'tick_seconds': tick_seconds,
+            'jitter_reminders': jitter_reminders,
+            'jitter_seconds': jitter_seconds,
+            'seed': seed
+        },
+        'load': {
+            'seconds': round(load_seconds, 3),
+            'adds_per_second': round(reminder_count / load_seconds, 1) if load_seconds else None
+        },
+        'operations': op_counts,
+        'simulation': {
+            'steps': steps,
+            'wall_seconds': round(wall_seconds, 3),
+            'triggered': len(triggered),
+            'missed': missed
+        },
+        'trigger_jitter_seconds': jitter['jitter'],
+        'trigger_jitter_missed': jitter['missed'],
+        'cpu': {
+            'seconds_total': round(cpu_seconds, 3),
+            'seconds_per_sim_hour': round(cpu_seconds / sim_hours, 3)
+        },
+        'memory': {
+            'peak_rss_mb_before': rss_before,
+            'peak_rss_mb_after': _peak_rss_mb()
+        },
+        'status_summary_ms': percentiles(summary_latencies, scale=1000)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="提醒管理器模拟时钟基准测试")
+    parser.add_argument('--reminders', type=int, default=10000, help="初始提醒数量")
+    parser.add_argument('--hours', type=float, default=1.0, help="模拟时长(小时)")
+    parser.add_argument('--ops-per-hour', type=int, default=2000, help="每模拟小时的随机添加/取消/延迟次数")
+    parser.add_argument('--summary-samples', type=int, default=50, help="状态摘要耗时采样次数")
+    parser.add_argument('--tick', type=float, default=1.0, help="倒计时刷新间隔(模拟秒)")
+    parser.add_argument('--jitter-reminders', type=int, default=200, help="真实时钟测量触发延迟的提醒数量")
+    parser.add_argument('--jitter-seconds', type=float, default=10.0, help="触发延迟测量窗口(真实秒)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="结果JSON文件路径，默认输出到标准输出")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    result = run_benchmark(args.reminders, args.hours, args.ops_per_hour,
+                           args.summary_samples, args.tick, args.seed,
+                           args.jitter_reminders, args.jitter_seconds)
+    write_result(result, args.output)
+
+if __name__ == "__main__":
+    main()
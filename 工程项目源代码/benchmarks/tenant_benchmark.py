@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多家庭基准测试
+
+用法:
+    python benchmarks/tenant_benchmark.py --households 500 --concurrency 16
+    python benchmarks/tenant_benchmark.py --households 100 --output result.json
+
+在本进程中启动 WebServer 并登记指定数量的家庭(消息回调为空操作，语音输出
+只记录文字)，测量:
+  - 登记全部家庭的耗时、内存(RSS)和线程数增量
+  - 多个客户端随机访问各家庭的添加提醒/查询提醒/发送消息接口的延迟分位数
+  - 每个家庭的提醒和消息是否只出现在本家庭(隔离性)
+  - 所有家庭同时到期的提醒是否都由共享调度线程播报到了各自的语音输出
+结果以JSON输出。
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+import http.client
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.web_server import WebServer
+from src.message_store import MessageStore
+from src.rate_limit import TokenBucketLimiter
+from benchmarks._common import percentiles, write_result
+
+def _rss_mb() -> float:
+    """当前进程常驻内存(MB)，仅支持Linux"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return 0.0
+
+def _run_clients(port: int, household_ids: list, requests_per_client: int, concurrency: int,
+                 due_time: datetime) -> dict:
+    """多个客户端随机选择家庭发送请求，返回各接口延迟和每个家庭实际添加的提醒/消息数"""
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    added = defaultdict(lambda: {'reminders': 0, 'messages': 0})
+    lock = threading.Lock()
+
+    def client(seed: int):
+        rng = random.Random(seed)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        local_latencies = defaultdict(list)
+        local_errors = defaultdict(int)
+        local_added = []
+        for n in range(requests_per_client):
+            household_id = rng.choice(household_ids)
+            operation = rng.choice(('add_reminder', 'list_reminders', 'send_message'))
+            if operation == 'add_reminder':
+                method, path = 'POST', f'/h/{household_id}/api/reminders'
+                body = {'task': f'{household_id}的提醒{seed}-{n}', 'time': due_time.isoformat(),
+                        'announce': False}
+            elif operation == 'send_message':
+                method, path = 'POST', f'/h/{household_id}/api/send_message'
+                body = {'message': f'{household_id}的消息{seed}-{n}', 'sender': f'家人{seed}'}
+            else:
+                method, path, body = 'GET', f'/h/{household_id}/api/reminders', None
+
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=json.dumps(body, ensure_ascii=False).encode('utf-8') if body else None,
+                             headers={'Content-Type': 'application/json'} if body else {})
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                local_errors[operation] += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+                continue
+            local_latencies[operation].append(time.perf_counter() - started)
+            if response.status >= 400:
+                local_errors[operation] += 1
+            elif operation != 'list_reminders':
+                local_added.append((household_id, 'reminders' if operation == 'add_reminder' else 'messages'))
+        conn.close()
+
+        with lock:
+            for operation, samples in local_latencies.items():
+                latencies[operation].extend(samples)
+            for operation, count in local_errors.items():
+                errors[operation] += count
+            for household_id, kind in local_added:
+                added[household_id][kind] += 1
+
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = sum(len(samples) for samples in latencies.values())
+    return {
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(total / elapsed, 1),
+        'endpoints': {op: {'latency_ms': percentiles(samples, scale=1000), 'errors': errors[op]} for op, samples in latencies.items()},
+        'added': added
+    }
+
+def run_benchmark(households: int, concurrency: int, requests_per_client: int, backend: str = None) -> dict:
+    """运行一次基准测试，返回结果字典"""
+    server = WebServer(message_callback=lambda message, sender: {'type': 'message'},
+                       message_store=MessageStore())
+
+    spoken = defaultdict(list)
+    spoken_lock = threading.Lock()
+
+    def voice_output_for(household_id):
+        def voice_output(text):
+            with spoken_lock:
+                spoken[household_id].append(text)
+        return voice_output
+
+    # 测量服务器本身的表现，不受单个客户端限流影响
+    unlimited = lambda: TokenBucketLimiter(rate=1e9, burst=10 ** 9)
+
+    rss_before = _rss_mb()
+    threads_before = threading.active_count()
+    started = time.perf_counter()
+    household_ids = []
+    for n in range(households):
+        household = server.add_household(f"family-{n:04d}",
+                                         message_callback=lambda message, sender: {'type': 'message'},
+                                         voice_output=voice_output_for(f"family-{n:04d}"),
+                                         limits={'MAX_REMINDERS': 10 ** 6, 'INGEST_QUEUE_SIZE': 10 ** 4})
+        household.rate_limiter = unlimited()
+        household_ids.append(household.id)
+    setup_seconds = time.perf_counter() - started
+    idle = {'rss_mb': _rss_mb(), 'threads': threading.active_count()}
+
+    server.start(host='127.0.0.1', port=0, backend=backend)
+    time.sleep(0.2)
+
+    # 所有提醒在请求结束后几秒同时到期，检验共享调度线程的播报
+    due_time = datetime.now() + timedelta(seconds=max(5, requests_per_client * concurrency / 500))
+    try:
+        traffic = _run_clients(server.port, household_ids, requests_per_client, concurrency, due_time)
+        loaded = {'rss_mb': _rss_mb(), 'threads': threading.active_count()}
+
+        # 隔离性: 每个家庭的提醒和消息数量与发给它的请求一致
+        mismatched = []
+        for household_id in household_ids:
+            household = server.households.get(household_id)
+            expected = traffic['added'].get(household_id, {'reminders': 0, 'messages': 0})
+            reminders = household.reminder_manager.get_all_reminders()
+            if (len(reminders) != expected['reminders']
+                    or len(household.message_store) != expected['messages']
+                    or any(not r.task.startswith(f"{household_id}的") for r in reminders)):
+                mismatched.append(household_id)
+        if server.message_store.last_id or server.reminder_manager:
+            mismatched.append('default')
+
+        # 等待到期提醒全部播报(合并窗口内的提醒合成一条)
+        expecting = {h for h in household_ids if traffic['added'].get(h, {}).get('reminders')}
+        wait_started = time.perf_counter()
+        while time.perf_counter() - wait_started < 30:
+            if datetime.now() >= due_time:
+                with spoken_lock:
+                    if expecting <= set(spoken):
+                        break
+            time.sleep(0.1)
+        announce_seconds = max(0.0, (datetime.now() - due_time).total_seconds())
+        with spoken_lock:
+            misrouted = [h for h, texts in spoken.items()
+                         if any(f"{h}的" not in text for text in texts)]
+            announced = len(expecting & set(spoken))
+    finally:
+        server.stop()
+
+    return {
+        'benchmark': 'households',
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'parameters': {
+            'households': households,
+            'concurrency': concurrency,
+            'requests_per_client': requests_per_client,
+            'backend': server.server.name if server.server else backend
+        },
+        'setup': {
+            'seconds': round(setup_seconds, 3),
+            'rss_mb_before': rss_before,
+            'rss_mb_idle': idle['rss_mb'],
+            'rss_kb_per_household': round((idle['rss_mb'] - rss_before) * 1024 / max(households, 1), 1),
+            'threads_before': threads_before,
+            'threads_idle': idle['threads']
+        },
+        'traffic': {
+            'seconds': traffic['seconds'],
+            'requests_per_second': traffic['requests_per_second'],
+            'endpoints': traffic['endpoints'],
+            'rss_mb': loaded['rss_mb'],
+            'threads': loaded['threads']
+        },
+        'isolation': {
+            'mismatched_households': mismatched,
+            'misrouted_announcements': misrouted
+        },
+        'announcements': {
+            'households_expected': len(expecting),
+            'households_announced': announced,
+            'seconds_after_due': round(announce_seconds, 3)
+        }
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="多家庭基准测试")
+    parser.add_argument('--households', type=int, default=500, help="家庭数量")
+    parser.add_argument('--concurrency', type=int, default=16, help="并发客户端数")
+    parser.add_argument('--requests', type=int, default=200, help="每个客户端的请求数")
+    parser.add_argument('--backend', default=None, help="服务后端(threaded/waitress)，默认读取配置")
+    parser.add_argument('--output', help="结果JSON文件路径，默认输出到标准输出")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    result = run_benchmark(args.households, args.concurrency, args.requests, args.backend)
+    write_result(result, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+唤醒词门控离线基准测试 - 用WAV录音测量唤醒率、误唤醒和CPU占用
+
+用法:
+    python benchmarks/wake_word_benchmark.py --templates data/wake_word --positives fixtures/wake --negatives fixtures/other
+    python benchmarks/wake_word_benchmark.py --synthesize --output wake.json
+
+录音文件(16kHz单声道16位WAV)按 CHUNK_SIZE 分块、像实时录音一样逐块输入
+WakeWordGate，每个文件使用新的门控，末尾补1秒静音使最后一句话结束:
+    positives     - 以唤醒词开头的录音，之后可以紧接或停顿后说出指令
+    negatives     - 不含唤醒词的录音(其他说话、电视声、背景噪声)
+没有录音时 --synthesize 生成合成的测试音频(由谐波和噪声合成的类语音音节，
+唤醒词为固定的三个音节，其他语音为随机音节)，只用于检查流程和CPU占用。
+输出:
+    detection_rate          - 正样本中识别出唤醒词的比例
+    false_wakes_per_hour    - 负样本中每小时误唤醒次数
+    asr_requests            - 发送到语音识别的指令数(负样本应为0)
+    distances               - 正/负样本与唤醒词样本的最小距离分布，用于选择阈值
+    cpu_percent             - 处理时间占音频时长的比例(单核)，以及每块处理耗时分位数
+超过 --cpu-budget、低于 --min-detection 或误唤醒超过 --max-false-per-hour 时退出码为1。
+结果以JSON输出。
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import tempfile
+from array import array
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import AUDIO_CONFIG, WAKE_WORD_CONFIG
+from src.wake_word import (COMMAND, WAKE, EnergyVAD, WakeWordDetector, WakeWordGate,
+                           pcm_to_samples, read_wav, samples_to_wav)
+from benchmarks._common import percentiles, write_result
+
+# 合成音频的元音(两个共振峰频率)和唤醒词音节: (是否带擦音, 元音, 起始基频, 结束基频, 时长秒)
+VOWELS = {'a': (800, 1200), 'i': (300, 2300), 'u': (320, 800), 'e': (500, 1900), 'o': (500, 900)}
+WAKE_PHRASE = [(True, 'i', 230, 260, 0.22), (False, 'a', 250, 200, 0.25),
+               (True, 'u', 180, 200, 0.22), (True, 'o', 220, 170, 0.30)]
+
+def _syllable(rng: random.Random, rate: int, fricative: bool, vowel: str, f0a: float, f0b: float,
+              duration: float, gain: float) -> list:
+    """合成一个音节: 可选的擦音(差分白噪声)加上基频滑动的元音(按共振峰加权的谐波)"""
+    out = []
+    if fricative:
+        previous = 0.0
+        for _ in range(int(rate * 0.05)):
+            value = rng.gauss(0, 1)
+            out.append((value - previous) * 1500 * gain)
+            previous = value
+    f1, f2 = VOWELS[vowel]
+    count = int(rate * duration)
+    phases = [0.0] * 12
+    for index in range(count):
+        progress = index / count
+        f0 = f0a + (f0b - f0a) * progress
+        envelope = math.sin(math.pi * progress) ** 0.5
+        value = 0.0
+        for k in range(1, 13):
+            frequency = f0 * k
+            if frequency > rate / 2:
+                break
+            weight = math.exp(-((frequency - f1) / 200) ** 2) + 0.6 * math.exp(-((frequency - f2) / 300) ** 2) + 0.05
+            phases[k - 1] += 2 * math.pi * frequency / rate
+            value += weight * math.sin(phases[k - 1])
+        out.append(value * 2500 * gain * envelope)
+    return out
+
+def _phrase(rng: random.Random, rate: int, syllables: list, gain: float) -> list:
+    """按语速和音调的随机变化合成一串音节"""
+    stretch, pitch = rng.uniform(0.9, 1.15), rng.uniform(0.9, 1.1)
+    out = []
+    for fricative, vowel, f0a, f0b, duration in syllables:
+        out += _syllable(rng, rate, fricative, vowel, f0a * pitch, f0b * pitch, duration * stretch, gain)
+        out += [0.0] * int(rate * rng.uniform(0.02, 0.06))
+    return out
+
+def _random_syllables(rng: random.Random, count: int) -> list:
+    return [(rng.random() < 0.5, rng.choice(list(VOWELS)), rng.uniform(150, 280), rng.uniform(150, 280),
+             rng.uniform(0.15, 0.35)) for _ in range(count)]
+
+def _write(path: str, rng: random.Random, rate: int, parts: list, noise: float):
+    """拼接各段并加上背景噪声，写入WAV文件"""
+    samples = [value + rng.gauss(0, noise) for part in parts for value in part]
+    pcm = array('h', (max(-32768, min(32767, int(value))) for value in samples))
+    with open(path, 'wb') as f:
+        f.write(samples_to_wav(pcm, rate))
+
+def synthesize_fixtures(directory: str, rate: int, positives: int, negatives: int, seed: int) -> dict:
+    """生成合成的唤醒词样本、正样本和负样本，返回各目录"""
+    rng = random.Random(seed)
+    dirs = {name: os.path.join(directory, name) for name in ('templates', 'positives', 'negatives')}
+    for path in dirs.values():
+        os.makedirs(path, exist_ok=True)
+    silence = lambda seconds: [0.0] * int(rate * seconds)
+
+    for index in range(3):
+        _write(os.path.join(dirs['templates'], f"wake_{index}.wav"), rng, rate,
+               [silence(0.2), _phrase(rng, rate, WAKE_PHRASE, 1.0), silence(0.2)], noise=30)
+    for index in range(positives):
+        gain = rng.uniform(0.4, 1.6)
+        pause = silence(0.8) if index % 2 else silence(0.05)  # 一半停顿后说指令，一半紧接着说
+        command = _phrase(rng, rate, _random_syllables(rng, rng.randint(5, 9)), gain)
+        _write(os.path.join(dirs['positives'], f"positive_{index}.wav"), rng, rate,
+               [silence(0.6), _phrase(rng, rate, WAKE_PHRASE, gain), pause, command, silence(0.5)],
+               noise=rng.uniform(20, 80))
+    for index in range(negatives):
+        gain = rng.uniform(0.4, 1.6)
+        syllables = _random_syllables(rng, rng.randint(3, 9))
+        if index % 3 == 0:
+            syllables = WAKE_PHRASE[:1] + syllables  # 开头与唤醒词相同的其他话
+        parts = [silence(0.6), _phrase(rng, rate, syllables, gain), silence(rng.uniform(0.5, 2.0))]
+        if index % 4 == 0:
+            parts.append([rng.gauss(0, 3000) for _ in range(int(rate * 0.08))])  # 碰撞声
+        _write(os.path.join(dirs['negatives'], f"negative_{index}.wav"), rng, rate, parts + [silence(0.5)],
+               noise=rng.uniform(20, 80))
+    # 长时间的背景噪声
+    _write(os.path.join(dirs['negatives'], "background.wav"), rng, rate, [silence(60)], noise=60)
+    return dirs
+
+def run_file(path: str, detector: WakeWordDetector, chunk: int) -> dict:
+    """像实时录音一样逐块输入一个录音文件"""
+    samples, rate = read_wav(path)
+    if rate != detector.rate:
+        raise ValueError(f"{path}: 采样率 {rate} 与配置的 {detector.rate} 不一致")
+    samples.extend(array('h', bytes(rate * 2)))  # 末尾1秒静音
+    gate = WakeWordGate(detector, EnergyVAD(rate, chunk))
+    data = samples.tobytes()
+    step = chunk * 2
+    chunk_ms, events = [], []
+    cpu_started = time.process_time()
+    for offset in range(0, len(data) - step + 1, step):
+        started = time.perf_counter()
+        events += [kind for kind, _ in gate.feed(data[offset:offset + step])]
+        chunk_ms.append((time.perf_counter() - started) * 1000)
+    cpu_seconds = time.process_time() - cpu_started
+
+    # 距离分布: 文件中第一个语音段与样本的最小距离
+    vad, first_segment = EnergyVAD(rate, chunk), None
+    for offset in range(0, len(data) - step + 1, step):
+        first_segment = vad.feed(data[offset:offset + step])
+        if first_segment:
+            break
+    best = detector.best_match(pcm_to_samples(first_segment)) if first_segment else None
+    return {
+        'audio_seconds': len(samples) / rate,
+        'cpu_seconds': cpu_seconds,
+        'chunk_ms': chunk_ms,
+        'segments': gate.segments,
+        'wakes': events.count(WAKE),
+        'commands': events.count(COMMAND),
+        'distance': best.distance if best and math.isfinite(best.distance) else None
+    }
+
+def run_set(directory: str, detector: WakeWordDetector, chunk: int) -> list:
+    names = sorted(name for name in os.listdir(directory) if name.lower().endswith('.wav'))
+    return [dict(run_file(os.path.join(directory, name), detector, chunk), file=name) for name in names]
+
+def main():
+    parser = argparse.ArgumentParser(description="唤醒词门控离线基准测试")
+    parser.add_argument('--templates', help="唤醒词样本目录")
+    parser.add_argument('--positives', help="以唤醒词开头的录音目录")
+    parser.add_argument('--negatives', help="不含唤醒词的录音目录")
+    parser.add_argument('--synthesize', action='store_true', help="生成合成的测试音频(未指定的目录使用合成音频)")
+    parser.add_argument('--count', type=int, default=12, help="合成的正/负样本数")
+    parser.add_argument('--seed', type=int, default=1, help="合成音频的随机种子")
+    parser.add_argument('--threshold', type=float, default=WAKE_WORD_CONFIG['THRESHOLD'], help="唤醒距离阈值")
+    parser.add_argument('--cpu-budget', type=float, default=5.0, help="允许的CPU占用(单核百分比)")
+    parser.add_argument('--min-detection', type=float, default=0.8, help="最低唤醒率")
+    parser.add_argument('--max-false-per-hour', type=float, default=2.0, help="每小时最多误唤醒次数")
+    parser.add_argument('--output', help="结果JSON文件路径，默认输出到标准输出")
+    args = parser.parse_args()
+
+    rate, chunk = AUDIO_CONFIG['SAMPLE_RATE'], AUDIO_CONFIG['CHUNK_SIZE']
+    with tempfile.TemporaryDirectory() as workdir:
+        dirs = {'templates': args.templates, 'positives': args.positives, 'negatives': args.negatives}
+        if args.synthesize:
+            synthetic = synthesize_fixtures(workdir, rate, args.count, args.count, args.seed)
+            dirs = {name: path or synthetic[name] for name, path in dirs.items()}
+        missing = [name for name, path in dirs.items() if not path]
+        if missing:
+            parser.error(f"缺少 --{' --'.join(missing)}，或使用 --synthesize")
+
+        detector = WakeWordDetector(dirs['templates'], threshold=args.threshold, rate=rate)
+        if not detector.load_templates():
+            parser.error(f"{dirs['templates']} 中没有唤醒词样本")
+        positives = run_set(dirs['positives'], detector, chunk)
+        negatives = run_set(dirs['negatives'], detector, chunk)
+
+    runs = positives + negatives
+    audio_seconds = sum(run['audio_seconds'] for run in runs)
+    cpu_seconds = sum(run['cpu_seconds'] for run in runs)
+    negative_hours = sum(run['audio_seconds'] for run in negatives) / 3600
+    detected = sum(1 for run in positives if run['wakes'])
+    false_wakes = sum(run['wakes'] for run in negatives)
+
+    result = {
+        'benchmark': 'wake_word_gate',
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'parameters': {'threshold': args.threshold, 'templates': len(detector.templates), 'chunk': chunk,
+                       'rate': rate, 'synthetic': args.synthesize},
+        'positives': {
+            'files': len(positives),
+            'detection_rate': round(detected / len(positives), 3) if positives else None,
+            'asr_requests': sum(run['commands'] for run in positives),
+            'missed': [run['file'] for run in positives if not run['wakes']]
+        },
+        'negatives': {
+            'files': len(negatives),
+            'audio_seconds': round(negative_hours * 3600, 1),
+            'false_wakes': false_wakes,
+            'false_wakes_per_hour': round(false_wakes / negative_hours, 2) if negative_hours else None,
+            'asr_requests': sum(run['commands'] for run in negatives),
+            'false_files': [run['file'] for run in negatives if run['wakes']]
+        },
+        'distances': {
+            'positives': percentiles([run['distance'] for run in positives if run['distance'] is not None], digits=4),
+            'negatives': percentiles([run['distance'] for run in negatives if run['distance'] is not None], digits=4)
+        },
+        'cpu': {
+            'audio_seconds': round(audio_seconds, 1),
+            'cpu_seconds': round(cpu_seconds, 3),
+            'cpu_percent': round(cpu_seconds / audio_seconds * 100, 2) if audio_seconds else None,
+            'chunk_ms': percentiles([ms for run in runs for ms in run['chunk_ms']]),
+            'segments': sum(run['segments'] for run in runs)
+        }
+    }
+
+    failures = []
+    if result['cpu']['cpu_percent'] is not None and result['cpu']['cpu_percent'] > args.cpu_budget:
+        failures.append(f"CPU占用 {result['cpu']['cpu_percent']}% 超过 {args.cpu_budget}%")
+    if positives and result['positives']['detection_rate'] < args.min_detection:
+        failures.append(f"唤醒率 {result['positives']['detection_rate']} 低于 {args.min_detection}")
+    if negative_hours and result['negatives']['false_wakes_per_hour'] > args.max_false_per_hour:
+        failures.append(f"误唤醒 {result['negatives']['false_wakes_per_hour']} 次/小时超过 {args.max_false_per_hour}")
+    result['failures'] = failures
+
+    write_result(result, args.output)
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
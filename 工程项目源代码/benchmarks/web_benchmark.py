@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Web服务器负载基准测试
+
+用法:
+    python benchmarks/web_benchmark.py --backend threaded --concurrency 8 --duration 10
+    python benchmarks/web_benchmark.py --backend waitress --output waitress.json
+    python benchmarks/web_benchmark.py --llm-latency 0.8 --tts-latency 1.5 --compare waitress.json
+
+在子进程中以指定后端启动 WebServer，消息回调为桩函数(按 --llm-latency 和
+--tts-latency 休眠，模拟大模型解析和语音合成，不访问网络)，限流关闭，消息
+历史只保存在内存中。本进程的多个客户端线程通过HTTP长连接依次对
+/api/status、/api/messages、/api/send_message 持续发送请求，每个接口输出:
+  - 请求数/秒、延迟分位数(毫秒，p50/p90/p95/p99/最大和平均)
+  - 错误率和按状态码的计数(503为消息队列已满的背压，同样计入错误)
+  - 服务器进程的CPU占用和内存(RSS，仅Linux)
+结果为JSON，参数、后端、Python版本和代码版本一并记录；--compare 指定之前的
+结果文件时附上各接口吞吐量和延迟的变化比例，便于比较不同后端和版本。
+"""
+
+import os
+import sys
+import json
+import time
+import select
+import logging
+import platform
+import argparse
+import threading
+import subprocess
+import http.client
+import itertools
+from collections import Counter
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks._common import percentiles, write_result
+
+ENDPOINTS = ('/api/status', '/api/messages', '/api/send_message')
+
+def _serve(backend: str, llm_latency: float, tts_latency: float):
+    """子进程: 启动服务器，把端口写到标准输出，标准输入关闭时停止"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from src.web_server import WebServer
+    from src.message_store import MessageStore
+    from src.rate_limit import TokenBucketLimiter
+
+    def stub_message_callback(message, sender):
+        time.sleep(llm_latency)  # 大模型意图解析
+        time.sleep(tts_latency)  # 语音合成与播报
+        return {'type': 'message'}
+
+    server = WebServer(message_callback=stub_message_callback, message_store=MessageStore())
+    # 测量服务器本身的吞吐量，不受单个客户端限流影响
+    server.rate_limiter = TokenBucketLimiter(rate=1e9, burst=10 ** 9)
+    server.start(host='127.0.0.1', port=0, backend=backend)
+    if not server.running:
+        sys.exit(1)
+
+    print(json.dumps({'port': server.port, 'backend': server.server.name}), flush=True)
+    sys.stdin.read()
+
+    started = time.perf_counter()
+    server.stop()
+    print(json.dumps({'stop_seconds': round(time.perf_counter() - started, 3)}), flush=True)
+
+class ServerProcess:
+    """运行服务器的子进程，读取其CPU时间和内存(Linux /proc)"""
+
+    def __init__(self, backend: str, llm_latency: float, tts_latency: float):
+        command = [sys.executable, os.path.abspath(__file__), '--serve',
+                   '--llm-latency', str(llm_latency), '--tts-latency', str(tts_latency)]
+        if backend:
+            command += ['--backend', backend]
+        self.process = subprocess.Popen(command, cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        text=True, encoding='utf-8')
+        info = self._read_json('port', timeout=30)
+        if info is None:
+            self.process.kill()
+            raise RuntimeError("服务器进程启动失败")
+        self.port = info['port']
+        self.backend = info['backend']
+
+        self._clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+        self._peak_rss = 0.0
+        self._sampling = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_rss, daemon=True)
+        self._sampler.start()
+
+    def _read_json(self, key: str, timeout: float):
+        """读取子进程输出中包含key的JSON行，跳过其他输出"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            ready, _, _ = select.select([self.process.stdout], [], [], deadline - time.monotonic())
+            line = self.process.stdout.readline() if ready else ''
+            if not line:
+                return None
+            try:
+                data = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(data, dict) and key in data:
+                return data
+        return None
+
+    def cpu_seconds(self):
+        """服务器进程累计CPU时间(用户态+内核态)，不支持时返回None"""
+        try:
+            with open(f'/proc/{self.process.pid}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / self._clock_ticks
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def rss_mb(self):
+        try:
+            with open(f'/proc/{self.process.pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        return round(int(line.split()[1]) / 1024, 1)
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def take_peak_rss(self):
+        """自上次调用以来的内存峰值"""
+        peak, self._peak_rss = self._peak_rss, 0.0
+        return max(peak, self.rss_mb() or 0.0) or None
+
+    def _sample_rss(self):
+        while not self._sampling.wait(0.1):
+            self._peak_rss = max(self._peak_rss, self.rss_mb() or 0.0)
+
+    def stop(self) -> dict:
+        self._sampling.set()
+        result = None
+        try:
+            self.process.stdin.close()
+            result = self._read_json('stop_seconds', timeout=30)
+            self.process.wait(timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+        return result or {}
+
+def _run_clients(port: int, method: str, path: str, body, concurrency: int,
+                 duration: float, warmup: float) -> dict:
+    """并发请求同一个接口；body 为无参函数，每次请求生成请求体。预热期间的请求不计入结果"""
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    measure_from = time.perf_counter() + warmup
+    deadline = measure_from + duration
+    headers = {'Content-Type': 'application/json'} if body else {}
+
+    def client():
+        local_latencies = []
+        local_statuses = Counter()
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        while True:
+            started = time.perf_counter()
+            if started >= deadline:
+                break
+            try:
+                conn.request(method, path, body=body() if body else None, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as e:
+                status = type(e).__name__
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            if started >= measure_from:
+                local_latencies.append(time.perf_counter() - started)
+                local_statuses[status] += 1
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            statuses.update(local_statuses)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    requests = sum(statuses.values())
+    errors = sum(count for status, count in statuses.items() if not isinstance(status, int) or status >= 400)
+    return {
+        'requests': requests,
+        'requests_per_second': round(requests / duration, 1),
+        'errors': errors,
+        'error_rate': round(errors / requests, 4) if requests else 0.0,
+        'status_codes': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        'latency_ms': percentiles(latencies, scale=1000)
+    }
+
+def _code_version():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_benchmark(backend: str, concurrency: int, duration: float, warmup: float = 1.0,
+                  llm_latency: float = 0.0, tts_latency: float = 0.0, endpoints=ENDPOINTS) -> dict:
+    """运行一次基准测试，返回结果字典"""
+    server = ServerProcess(backend, llm_latency, tts_latency)
+
+    # 每条消息内容不同，避免被重复消息过滤
+    sequence = itertools.count()
+    message = lambda: json.dumps({'message': f'基准测试消息{next(sequence)}', 'sender': '基准测试'},
+                                 ensure_ascii=False).encode('utf-8')
+    requests = {
+        '/api/status': ('GET', '/api/status', None),
+        '/api/messages': ('GET', '/api/messages?limit=10', None),
+        '/api/send_message': ('POST', '/api/send_message', message)
+    }
+
+    results = {}
+    try:
+        idle_rss = server.rss_mb()
+        for endpoint in endpoints:
+            method, path, body = requests[endpoint]
+            cpu_before = server.cpu_seconds()
+            started = time.perf_counter()
+            result = _run_clients(server.port, method, path, body, concurrency, duration, warmup)
+            elapsed = time.perf_counter() - started
+            cpu_after = server.cpu_seconds()
+            result['server'] = {
+                'cpu_percent': (round((cpu_after - cpu_before) / elapsed * 100, 1)
+                                if cpu_before is not None and cpu_after is not None else None),
+                'rss_mb_peak': server.take_peak_rss()
+            }
+            results[endpoint] = result
+    finally:
+        stopped = server.stop()
+
+    return {
+        'benchmark': 'web_server',
+        'schema': 2,
+        'timestamp': datetime.now().isoformat(),
+        'environment': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'code_version': _code_version()
+        },
+        'parameters': {
+            'backend': server.backend,
+            'concurrency': concurrency,
+            'duration': duration,
+            'warmup': warmup,
+            'llm_latency': llm_latency,
+            'tts_latency': tts_latency
+        },
+        'endpoints': results,
+        'server': {
+            'rss_mb_idle': idle_rss,
+            'stop_seconds': stopped.get('stop_seconds')
+        }
+    }
+
+def compare(result: dict, baseline: dict) -> dict:
+    """与之前的结果比较，返回各接口指标的变化比例(新/旧)"""
+    ratio = lambda new, old: round(new / old, 3) if new is not None and old else None
+    changes = {}
+    for endpoint, current in result['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(endpoint)
+        if not previous:
+            continue
+        changes[endpoint] = {
+            'requests_per_second': ratio(current['requests_per_second'], previous.get('requests_per_second')),
+            'error_rate': {'new': current['error_rate'], 'old': previous.get('error_rate')}
+        }
+        for key in ('p50', 'p99'):
+            changes[endpoint][f'{key}_ms'] = ratio(current['latency_ms'].get(key),
+                                                   previous.get('latency_ms', {}).get(key))
+    return {
+        'baseline': {'timestamp': baseline.get('timestamp'), 'parameters': baseline.get('parameters'),
+                     'code_version': baseline.get('environment', {}).get('code_version')},
+        'ratios': changes
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Web服务器负载基准测试")
+    parser.add_argument('--backend', default=None, help="服务后端(threaded/waitress)，默认读取配置")
+    parser.add_argument('--concurrency', type=int, default=8, help="并发客户端数")
+    parser.add_argument('--duration', type=float, default=10.0, help="每个接口的测试时长(秒)")
+    parser.add_argument('--warmup', type=float, default=1.0, help="每个接口的预热时长(秒)，不计入结果")
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS), help="测试的接口")
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="桩消息回调模拟的大模型解析耗时(秒)")
+    parser.add_argument('--tts-latency', type=float, default=0.0, help="桩消息回调模拟的语音合成耗时(秒)")
+    parser.add_argument('--compare', help="之前的结果JSON文件，输出变化比例")
+    parser.add_argument('--output', help="结果JSON文件路径，默认输出到标准输出")
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.serve:
+        _serve(args.backend, args.llm_latency, args.tts_latency)
+        return
+
+    result = run_benchmark(args.backend, args.concurrency, args.duration, args.warmup,
+                           args.llm_latency, args.tts_latency, args.endpoints)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            result['comparison'] = compare(result, json.load(f))
+
+    write_result(result, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -9,22 +9,18 @@ import os
 # API 配置
 # =============================================================================
 
-# DeepSeek API 配置 (用于大语言模型)
-DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY')
+# API密钥从环境变量读取(.env 文件或系统环境)，在第一次访问时才读取和检查:
+# 导入本模块不会因为缺少密钥而失败，只用到提醒、Web服务的工具和脚本无需配置语音/大模型密钥。
+# 访问 config.DEEPSEEK_API_KEY 等属性时读取，未设置则抛出 ValueError；
+# 主程序启动时调用 validate_required_env() 一次性检查所有密钥。
+
+# DeepSeek API 配置 (用于大语言模型) - 密钥: DEEPSEEK_API_KEY
 DEEPSEEK_MODEL = 'deepseek-chat'
 DEEPSEEK_BASE_URL = 'https://api.deepseek.com/v1'
 
-# 百度语音API配置 (用于语音识别)
-BAIDU_APP_ID = os.getenv('BAIDU_APP_ID')
-BAIDU_API_KEY = os.getenv('BAIDU_API_KEY')
-BAIDU_SECRET_KEY = os.getenv('BAIDU_SECRET_KEY')
-
-# 科大讯飞语音合成API配置
-XUNFEI_APP_ID = os.getenv('XUNFEI_APP_ID')
-XUNFEI_API_KEY = os.getenv('XUNFEI_API_KEY')
-XUNFEI_API_SECRET = os.getenv('XUNFEI_API_SECRET')
+# 百度语音API配置 (用于语音识别) - 密钥: BAIDU_APP_ID, BAIDU_API_KEY, BAIDU_SECRET_KEY
+# 科大讯飞语音合成API配置 - 密钥: XUNFEI_APP_ID, XUNFEI_API_KEY, XUNFEI_API_SECRET
 
-# 检查环境变量是否设置
 _required_env_vars = [
     'DEEPSEEK_API_KEY',
     'BAIDU_APP_ID',
@@ -35,9 +31,24 @@ _required_env_vars = [
     'XUNFEI_API_SECRET'
 ]
 
-for var in _required_env_vars:
-    if not globals().get(var):
-        raise ValueError(f"错误：环境变量 {var} 未设置。请在 .env 文件中或直接在系统中设置。")
+_env_cache = {}
+
+def __getattr__(name):
+    """按需读取API密钥环境变量(模块级 __getattr__，只在普通属性不存在时调用)"""
+    if name not in _required_env_vars:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name not in _env_cache:
+        value = os.getenv(name)
+        if not value:
+            raise ValueError(f"错误：环境变量 {name} 未设置。请在 .env 文件中或直接在系统中设置。")
+        _env_cache[name] = value
+    return _env_cache[name]
+
+def validate_required_env():
+    """检查所有API密钥环境变量，缺少时抛出 ValueError 并列出全部缺少的变量"""
+    missing = [var for var in _required_env_vars if not os.getenv(var)]
+    if missing:
+        raise ValueError(f"错误：环境变量 {', '.join(missing)} 未设置。请在 .env 文件中或直接在系统中设置。")
 
 # =============================================================================
 # GUI配置
@@ -49,7 +60,9 @@ GUI_CONFIG = {
     'WINDOW_HEIGHT': 600,
     'WINDOW_TITLE': '适老化语音备忘录系统',
     'FONT_SIZE': 14,
-    'LARGE_FONT_SIZE': 18
+    'LARGE_FONT_SIZE': 18,
+    'FRAME_RATE': 30,  # 界面增量更新的最大帧率(每秒最多应用的批次数)
+    'LOG_MAX_LINES': 200  # 消息/日志区域保留的最大行数，超出时删除最早的行
 }
 
 # 按钮配置
@@ -69,6 +82,18 @@ AUDIO_CONFIG = {
     'PHRASE_TIMEOUT': 1   # 短语超时时间(秒)
 }
 
+# 连续监听(长按录音按钮开启)：本地检测到唤醒词后，才把随后的一句话发送到语音识别
+# 唤醒词样本用 python -m src.wake_word --enroll 3 录制
+WAKE_WORD_CONFIG = {
+    'TEMPLATE_DIR': 'data/wake_word/',  # 唤醒词样本(16kHz单声道WAV)目录
+    'THRESHOLD': 0.45,        # 与样本的平均帧距离低于此值视为唤醒词，误唤醒多时调小(--listen 可查看距离)
+    'VAD_RATIO': 3.0,         # 音量超过背景噪声的倍数视为语音
+    'VAD_MIN_RMS': 300,       # 语音的最低音量(16位采样的均方根)
+    'SILENCE_MS': 500,        # 静音超过此时长视为一句话结束(毫秒)
+    'MAX_SEGMENT_SECONDS': 8, # 单句最长时长，超出时截断
+    'COMMAND_TIMEOUT': 5      # 唤醒后等待指令开始的时长(秒)
+}
+
 # =============================================================================
 # Web服务配置
 # =============================================================================
@@ -76,7 +101,44 @@ AUDIO_CONFIG = {
 WEB_CONFIG = {
     'HOST': '0.0.0.0',
     'PORT': 5000,
-    'DEBUG': False
+    'DEBUG': False,
+    'SERVER_BACKEND': 'threaded',  # 服务后端: threaded(Werkzeug多线程) / waitress(需安装waitress)
+    'SERVER_THREADS': 8,           # waitress工作线程数
+    'KEEP_ALIVE_TIMEOUT': 15,      # 长连接空闲超时(秒)
+    'SHUTDOWN_TIMEOUT': 5,         # 停止时等待进行中请求完成的时间(秒)
+    'MESSAGE_HISTORY_SIZE': 200,   # 保留的消息历史条数
+    'MESSAGE_PAGE_LIMIT': 50,      # /api/messages 单页最多返回条数
+    'MESSAGE_DB': 'data/messages.db',  # 消息历史数据库，设为None时只保存在内存中
+    'RATE_LIMIT_PER_MINUTE': 6,    # 每个发送者/IP每分钟可发送的消息数
+    'RATE_LIMIT_BURST': 3,         # 允许连续发送的消息数
+    'DEDUP_WINDOW': 60,            # 相同内容的消息在此时间内只处理一次(秒)
+    'BATCH_MAX_ITEMS': 100,        # /api/reminders/batch 单次最多提醒数
+    'BATCH_PARSE_WORKERS': 4,      # 批量文字提醒并发解析数(大模型请求)
+    'INGEST_WORKERS': 1,           # 消息处理线程数 - 播报共用一个音频通道，默认按顺序处理
+    'INGEST_QUEUE_SIZE': 50,       # 等待处理的消息上限，超出时返回503
+    'INGEST_RESULT_HISTORY': 200,  # 保留的消息处理结果条数
+    'INGEST_RETRY_AFTER': 10,      # 队列已满时建议客户端重试的间隔(秒)
+    'EVENT_MAX_CLIENTS': 200,      # 每个家庭的推送连接数上限 - threaded后端每个连接占用一个线程
+    'EVENT_RESERVED_THREADS': 4,   # waitress后端为普通接口保留的工作线程，所有家庭的推送连接最多占用其余线程
+    'EVENT_QUEUE_SIZE': 100,       # 单个连接待发送事件上限，超出时断开让客户端重连
+    'EVENT_REPLAY_SIZE': 200,      # 断线重连时可补发的最近事件数
+    'EVENT_HEARTBEAT': 15          # 推送连接心跳间隔(秒)
+}
+
+# 多家庭配置 - 一个进程服务多个家庭，通过 /h/<家庭ID>/... 访问各自的页面和接口
+# (不带前缀的地址访问本机默认家庭，默认家庭沿用上面的 WEB_CONFIG 和 REMINDER_CONFIG)
+HOUSEHOLD_CONFIG = {
+    'MAX_HOUSEHOLDS': 1000,        # 家庭数量上限(不含默认家庭)
+    'MAX_REMINDERS': 50,           # 每个家庭的提醒上限
+    'MESSAGE_HISTORY_SIZE': 50,    # 每个家庭保留的消息历史条数
+    'MESSAGE_DB_DIR': None,        # 消息历史数据库目录，每个家庭一个文件；None时只保存在内存中
+    'INGEST_QUEUE_SIZE': 10,       # 每个家庭等待处理的消息上限
+    'INGEST_RESULT_HISTORY': 50,   # 每个家庭保留的消息处理结果条数
+    'EVENT_MAX_CLIENTS': 5,        # 每个家庭的推送连接数上限
+    'EVENT_REPLAY_SIZE': 50,       # 每个家庭可补发的最近事件数
+    'RATE_LIMIT_KEYS': 64,         # 每个家庭记录的限流键(发送者/IP)数量
+    'SCHEDULER_INTERVAL': 1,       # 共享提醒调度线程的检查间隔(秒)
+    'CLEANUP_INTERVAL': 60         # 清理已完成提醒的间隔(秒)
 }
 
 # =============================================================================
@@ -92,6 +154,17 @@ TTS_CONFIG = {
     'VOICE': 'xiaoyan'    # 发音人 (xiaoyan-小燕, aisjiuxu-爱思久, aisxping-爱思萍等)
 }
 
+# 语音输出调度 - 所有播报经同一个线程按优先级播放: 到期提醒 > 操作回应 > 家人消息 > 系统提示
+AUDIO_OUTPUT_CONFIG = {
+    'PREEMPT_GAP': 2,     # 等待的播报比正在播放的高出这么多级时打断当前播报(淡出，稍后重新播放)
+    'DUCK_VOLUME': 0.3,   # 高出一级时当前播报降到此音量播完，高优先级播报紧接着播放
+    'FADE_MS': 150,       # 打断时的淡出时长(毫秒)
+    'MAX_QUEUE': 20,      # 等待播放的播报上限，超出时丢弃最早的最低优先级播报
+    'CONCAT_MAX': 4,      # 同一优先级已合成的连续播报最多合并为一个音频无缝播放
+    'POLL_MS': 20,        # 播放期间检查停止和抢占的间隔(毫秒)
+    'WAIT_HISTORY': 200   # 每个优先级保留的等待时间样本数(统计用)
+}
+
 # =============================================================================
 # 系统配置
 # =============================================================================
@@ -111,14 +184,32 @@ REMINDER_CONFIG = {
     'CONCURRENT_REMINDERS': True,  # 启用多个提醒同时运行
     'UPDATE_INTERVAL': 1,  # 倒计时更新间隔(秒)
     'URGENT_THRESHOLD': 300,  # 紧急提醒阈值(秒) - 5分钟内的提醒会高亮显示
-    'CRITICAL_THRESHOLD': 60  # 关键提醒阈值(秒) - 1分钟内的提醒会特别标记
+    'CRITICAL_THRESHOLD': 60,  # 关键提醒阈值(秒) - 1分钟内的提醒会特别标记
+    'ACK_HISTORY_SIZE': 200   # 保留的提醒确认记录条数(确认耗时统计)
+}
+
+# 提醒播报配置
+ANNOUNCE_CONFIG = {
+    'MERGE_WINDOW': 2.0,                  # 合并窗口(秒) - 窗口内到期的提醒合并为一条播报
+    'ESCALATION_BACKOFF': [60, 120, 300], # 未确认的用药提醒重复播报间隔(秒)，用完后不再重复
+    'CATEGORY_KEYWORDS': {                # 类别关键词，优先级: 用药 > 预约 > 日常
+        'medical': ['药', '血压', '血糖', '胰岛素', '打针', '透析', '吸氧', '测体温'],
+        'appointment': ['医院', '复诊', '体检', '门诊', '挂号', '预约', '约了', '见面', '接孩子', '开会']
+    }
 }
 
 # 显示配置
 DISPLAY_CONFIG = {
     'FONT_SIZE': 12,
     'SCROLL_SPEED': 2,     # 滚动速度
-    'UPDATE_INTERVAL': 1   # 更新间隔(秒)
+    'UPDATE_INTERVAL': 1,  # 更新间隔(秒)
+    # 无界面模式(python main.py --headless)的状态画面，绘制需要安装Pillow
+    'OUTPUT': None,        # 输出: None不绘制 / '/dev/fb0'帧缓冲设备 / '*.png'离屏图片 / 其他文件按帧缓冲原始格式写入
+    'WIDTH': None,         # 画面尺寸，None时帧缓冲设备从sysfs读取，其他输出为320x240
+    'HEIGHT': None,
+    'PIXEL_FORMAT': None,  # 帧缓冲像素格式: RGB565 / BGRA，None时按设备位深选择
+    'FPS': 2,              # 每秒检查画面内容的次数，内容不变时不重绘
+    'FONT_FILE': None      # 含中文字形的字体文件(如 /usr/share/fonts/truetype/wqy/wqy-microhei.ttc)
 }
 
 # =============================================================================
@@ -132,6 +223,7 @@ PATHS = {
     'AUDIO_TEMP': 'temp/audio/'
 }
 
-# 确保目录存在
-for path in PATHS.values():
-    os.makedirs(path, exist_ok=True)
\ No newline at end of file
+def ensure_paths():
+    """确保运行时目录存在 - 由主程序启动时调用，导入配置本身不创建目录"""
+    for path in PATHS.values():
+        os.makedirs(path, exist_ok=True)
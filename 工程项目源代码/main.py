@@ -18,7 +18,7 @@ import logging
 import signal
 import threading
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional, TYPE_CHECKING
 from dotenv import load_dotenv
 
 # 加载 .env 文件中的环境变量
@@ -28,17 +28,27 @@ load_dotenv()
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.voice_assistant import VoiceAssistant
+from src.audio_output import SpeechPriority
 from src.reminder import ReminderManager
-from src.gui_controller import GUIController
 from src.web_server import WebServer
 from src.gui_button_controller import GUIButtonController, ButtonEvent, ButtonFunction
-from config import LOG_CONFIG, PATHS
+from src.startup import StartupOrchestrator
+from src.wake_word import ContinuousListener, WakeWordDetector
+from src.state_machine import (CancellationToken, OperationCancelled, OPERATION_STATES,
+                               StateMachine, SystemEvent, SystemState, Transition)
+from config import LOG_CONFIG, REMINDER_CONFIG, ensure_paths, validate_required_env
+
+if TYPE_CHECKING:
+    # Qt只在GUI模式下加载，无界面模式不导入
+    from src.gui_controller import GUIController
+    from src.status_display import StatusDisplayController
 
 class VoiceReminderSystem:
     """语音提醒系统主类"""
     
-    def __init__(self, gui_mode: bool = True):
+    def __init__(self, gui_mode: bool = True, display_output: Optional[str] = None):
         self.gui_mode = gui_mode
+        self.display_output = display_output  # 无界面模式的状态画面输出，None时使用配置
         self.running = False
         
         # 设置日志
@@ -48,13 +58,18 @@ class VoiceReminderSystem:
         # 初始化组件
         self.voice_assistant: Optional[VoiceAssistant] = None
         self.reminder_manager: Optional[ReminderManager] = None
-        self.gui_controller: Optional[GUIController] = None
+        self.gui_controller: Optional["GUIController | StatusDisplayController"] = None
         self.web_server: Optional[WebServer] = None
         self.button_controller: Optional[GUIButtonController] = None
+        self.continuous_listener: Optional[ContinuousListener] = None  # 连续监听模式(长按录音按钮开启)
+        
+        # 系统状态 - 由状态机统一管理，转换在锁内原子完成
+        self.state_machine = StateMachine()
+        self.state_machine.add_listener(self._on_state_transition)
         
-        # 系统状态
-        self.current_state = "idle"  # idle, listening, processing, reminder_active
-        self.state_lock = threading.Lock()
+        # 启动时间线 - 各组件初始化的开始时间、耗时和执行线程
+        self.startup_timeline: list = []
+        self._created_at = time.perf_counter()
         
         self.logger.info("语音提醒系统初始化开始")
         
@@ -65,9 +80,15 @@ class VoiceReminderSystem:
             self.logger.error(f"系统初始化失败: {e}")
             raise
     
+    @property
+    def current_state(self) -> str:
+        """当前系统状态: idle, listening, processing"""
+        return self.state_machine.state.value
+    
     def _setup_logging(self):
         """设置日志系统"""
-        # 确保日志目录存在
+        # 确保日志和临时文件目录存在
+        ensure_paths()
         os.makedirs(os.path.dirname(LOG_CONFIG['FILE']), exist_ok=True)
         
         # 配置日志
@@ -81,47 +102,100 @@ class VoiceReminderSystem:
         )
     
     def _initialize_components(self):
-        """初始化所有组件"""
+        """初始化所有组件 - 按依赖关系并行初始化，记录启动时间线"""
+        orchestrator = StartupOrchestrator()
+        
+        # 1. 界面控制器 - Qt对象必须在主线程创建
+        orchestrator.add("gui_controller", self._init_gui_controller, main_thread=True)
+        
+        # 2. 语音助手 - 语音识别/合成/播放库在第一次使用或启动后预热时才加载
+        orchestrator.add("voice_assistant", self._init_voice_assistant)
+        
+        # 3. 提醒管理器 - 到期提醒需要打断正在进行的播报
+        orchestrator.add("reminder_manager", self._init_reminder_manager, depends=["voice_assistant"])
+        
+        # 4. Web服务器 - 创建与其他组件无关，创建后再接入提醒管理和语音助手
+        orchestrator.add("web_server", self._init_web_server)
+        orchestrator.add("web_wiring", self._wire_web_server,
+                         depends=["web_server", "reminder_manager", "voice_assistant"])
+        
+        # 5. GUI按钮控制器
+        orchestrator.add("button_controller", self._init_button_controller)
+        
+        # 6. 设置GUI回调函数 - 录音按钮经由按钮控制器分派，提醒播报时按下即为确认
+        orchestrator.add("gui_callbacks", self._connect_gui_callbacks,
+                         depends=["gui_controller", "button_controller"], main_thread=True)
+        
         try:
-            # 1. 初始化GUI控制器
-            self.gui_controller = GUIController()
-            self.gui_controller.show_welcome_screen()
-            
-            # 2. 初始化语音助手
-            self.voice_assistant = VoiceAssistant()
-            
-            # 3. 初始化提醒管理器
-            self.reminder_manager = ReminderManager(
-                voice_callback=self._voice_callback,
-                display_callback=self._display_callback
-            )
-            
-            # 4. 初始化Web服务器
-            self.web_server = WebServer(message_callback=self._message_callback)
-            
-            # 5. 初始化GUI按钮控制器
-            self.button_controller = GUIButtonController(
-                button_callback=self._button_callback
-            )
-            
-            # 6. 设置GUI回调函数
-            self.gui_controller.set_callbacks(
-                record_callback=self._start_voice_recording,
-                clear_callback=self._clear_all_reminders
-            )
-            
-            self.logger.info("所有组件初始化完成")
-            
+            orchestrator.run()
         except Exception as e:
             self.logger.error(f"组件初始化失败: {e}")
+            self.logger.info(orchestrator.format_timeline())
             raise
+        
+        self.startup_timeline = orchestrator.timeline()
+        self.logger.info(orchestrator.format_timeline())
+        self.logger.info("所有组件初始化完成")
+    
+    def _init_gui_controller(self):
+        """初始化界面控制器 - 无界面模式使用不依赖Qt的状态显示"""
+        if self.gui_mode:
+            from src.gui_controller import GUIController
+            self.gui_controller = GUIController()
+        else:
+            from src.status_display import StatusDisplayController
+            self.gui_controller = StatusDisplayController(output=self.display_output)
+        self.gui_controller.show_welcome_screen()
+    
+    def _init_voice_assistant(self):
+        """初始化语音助手"""
+        self.voice_assistant = VoiceAssistant()
+    
+    def _init_reminder_manager(self):
+        """初始化提醒管理器"""
+        self.reminder_manager = ReminderManager(
+            voice_callback=lambda message: self._voice_callback(message, SpeechPriority.ALERT),
+            display_callback=self._display_callback,
+            # 确认提醒时只停止提醒播报，不影响其他播报
+            interrupt_callback=lambda: self.voice_assistant.stop_speaking(SpeechPriority.ALERT)
+        )
+    
+    def _init_web_server(self):
+        """初始化Web服务器"""
+        self.web_server = WebServer(message_callback=self._message_callback)
     
-    def _voice_callback(self, message: str):
-        """语音播报回调"""
+    def _wire_web_server(self):
+        """把提醒管理器和语音助手接入Web服务器"""
+        self.web_server.reminder_manager = self.reminder_manager
+        self.web_server.intent_parser = self.voice_assistant.parse_reminder
+        self.web_server.announce_callback = lambda message: self._speak_async(message, SpeechPriority.MESSAGE)
+        self.web_server.audio_stats = self.voice_assistant.output.stats
+    
+    def _init_button_controller(self):
+        """初始化GUI按钮控制器"""
+        self.button_controller = GUIButtonController(
+            button_callback=self._button_callback
+        )
+    
+    def _connect_gui_callbacks(self):
+        """设置GUI回调函数"""
+        self.gui_controller.set_callbacks(
+            record_callback=self.button_controller.handle_record_button,
+            clear_callback=self._clear_all_reminders
+        )
+    
+    def _voice_callback(self, message: str, priority: SpeechPriority = SpeechPriority.INTERACTIVE):
+        """语音播报回调 - 阻塞到播放结束，各线程的播报按优先级排队播放"""
         try:
             self.logger.info(f"语音播报: {message}")
             if self.voice_assistant:
-                self.voice_assistant.speak(message)
+                if self.web_server:
+                    self.web_server.publish_event('speech', {'state': 'started', 'text': message})
+                try:
+                    self.voice_assistant.speak(message, priority=priority)
+                finally:
+                    if self.web_server:
+                        self.web_server.publish_event('speech', {'state': 'finished', 'text': message})
         except Exception as e:
             self.logger.error(f"语音播报失败: {e}")
     
@@ -134,12 +208,19 @@ class VoiceReminderSystem:
         except Exception as e:
             self.logger.error(f"重置状态失败: {e}")
     
-    def _display_callback(self):
-        """显示更新回调"""
+    def _display_callback(self, changes: Optional[list] = None):
+        """显示更新回调 - 提醒管理器传入增量时只转发增量，由GUI按帧合并后应用"""
         try:
+            if changes is not None and self.web_server:
+                self.web_server.publish_reminder_changes(changes)
+            
             if not self.gui_controller or not self.reminder_manager:
                 return
             
+            if changes is not None:
+                self.gui_controller.apply_reminder_changes(changes)
+                return
+            
             # 获取当前提醒
             current_reminder = self.reminder_manager.get_current_reminder()
             
@@ -167,8 +248,7 @@ class VoiceReminderSystem:
         try:
             if self.gui_controller:
                 # 重置状态标签为系统就绪
-                if hasattr(self.gui_controller, 'main_window') and self.gui_controller.main_window:
-                    self.gui_controller.main_window.status_label.setText("系统就绪")
+                self.gui_controller.set_status("系统就绪")
                 
                 # 调用正常的显示更新
                 self._display_callback()
@@ -177,8 +257,12 @@ class VoiceReminderSystem:
         except Exception as e:
             self.logger.error(f"恢复正常显示失败: {e}")
     
-    def _message_callback(self, message: str, sender: str):
-        """Web消息回调 - 增强处理子女消息中的提醒项目"""
+    def _message_callback(self, message: str, sender: str) -> Dict:
+        """Web消息回调 - 增强处理子女消息中的提醒项目
+        
+        在Web服务器的消息处理线程中执行，返回的处理结果供 /api/messages/<id> 查询
+        """
+        summary = {'type': 'message', 'fallback': False}
         try:
             self.logger.info(f"收到来自 {sender} 的消息: {message}")
             
@@ -195,6 +279,13 @@ class VoiceReminderSystem:
                         original_text=reminder_data['original_text']
                     )
                     
+                    summary = {
+                        'type': 'reminder',
+                        'task': reminder_data['task'],
+                        'scheduled_time': reminder_data['time'].isoformat(),
+                        'reminder_id': reminder_id
+                    }
+                    
                     if reminder_id:
                         self.logger.info(f"从{sender}消息中成功添加提醒: {reminder_id}")
                         if self.gui_controller:
@@ -217,33 +308,40 @@ class VoiceReminderSystem:
                 
                 else:
                     # 处理失败，使用原有逻辑
+                    summary['fallback'] = True
                     announcement = f"您有来自{sender}的新消息：{message}"
-                    self._voice_callback(announcement)
+                    self._voice_callback(announcement, SpeechPriority.MESSAGE)
                     if self.gui_controller:
                         self.gui_controller.show_message_screen(message, sender)
             
             else:
                 # 语音助手未初始化，使用原有逻辑
+                summary['fallback'] = True
                 announcement = f"您有来自{sender}的新消息：{message}"
-                self._voice_callback(announcement)
+                self._voice_callback(announcement, SpeechPriority.MESSAGE)
                 if self.gui_controller:
                     self.gui_controller.show_message_screen(message, sender)
             
             # 5秒后恢复正常显示
             if self.gui_controller:
                 threading.Timer(5.0, self._restore_normal_display).start()
+            
+            return summary
                 
         except Exception as e:
             self.logger.error(f"消息处理失败: {e}")
             # 发生错误时使用原有逻辑
+            summary = {'type': 'message', 'fallback': True}
             try:
                     announcement = f"您有来自{sender}的新消息：{message}"
-                    self._voice_callback(announcement)
+                    self._voice_callback(announcement, SpeechPriority.MESSAGE)
                     if self.gui_controller:
                         self.gui_controller.show_message_screen(message, sender)
                         threading.Timer(5.0, self._restore_normal_display).start()
             except Exception as fallback_error:
                 self.logger.error(f"消息处理降级方案也失败: {fallback_error}")
+                raise
+            return summary
     
     def _button_callback(self, button_name: str, event: ButtonEvent):
         """按钮事件回调"""
@@ -263,16 +361,20 @@ class VoiceReminderSystem:
         self.logger.info(f"按钮短按: {button_name}")
         
         try:
+            awaiting_ack = bool(self.reminder_manager and self.reminder_manager.get_awaiting_ack())
+            
             if button_name == "RECORD":
-                # 录音按钮：开始录音
-                if self.current_state == "idle":
-                    self._start_voice_recording()
-                elif self.current_state == "reminder_active":
+                # 录音按钮：有待确认的提醒时确认提醒，否则开始录音(状态机只在空闲时接受)
+                if awaiting_ack:
                     self._confirm_reminder()
+                else:
+                    self.state_machine.post(SystemEvent.RECORD)
                     
             elif button_name == "STOP":
-                # 停止按钮：停止当前操作
-                if self.current_state in ["listening", "processing"]:
+                # 停止按钮：有待确认的提醒时稍后提醒，否则停止当前操作
+                if awaiting_ack:
+                    self._snooze_reminders()
+                elif self.state_machine.state in OPERATION_STATES:
                     self._stop_current_operation()
                 else:
                     self._cancel_current_operation()
@@ -285,53 +387,75 @@ class VoiceReminderSystem:
             self.logger.error(f"处理按钮事件失败: {e}")
     
     def _handle_button_long_press(self, button_name: str):
-        """处理按钮长按"""
-        with self.state_lock:
-            if button_name == "RECORD":
-                # 长按录音按钮：开始连续语音识别模式
-                self._start_continuous_listening()
-                
-            elif button_name == "STOP":
-                # 长按停止按钮：系统关机
-                self._initiate_shutdown()
-                
-            elif button_name == "CLEAR":
-                # 长按清除按钮：清除所有提醒
-                self._clear_all_reminders()
+        """处理按钮长按 - 操作之间的互斥由状态机负责，这里不加锁"""
+        if button_name == "RECORD":
+            # 长按录音按钮：开始连续语音识别模式
+            self._start_continuous_listening()
+            
+        elif button_name == "STOP":
+            # 长按停止按钮：系统关机
+            self._initiate_shutdown()
+            
+        elif button_name == "CLEAR":
+            # 长按清除按钮：清除所有提醒
+            self._clear_all_reminders()
     
-    def _start_voice_recording(self):
-        """开始语音录制"""
+    def _on_state_transition(self, transition: Transition):
+        """状态转换后的界面更新和后台操作 - 在发送事件的线程中执行，不能阻塞"""
+        if transition.target == SystemState.LISTENING:
+            self._start_voice_recording(transition.token, transition.payload)
+        
+        elif transition.target == SystemState.PROCESSING:
+            if self.gui_controller:
+                self.gui_controller.show_processing_screen()
+                self.gui_controller.add_log_message(f"识别结果: {transition.payload}")
+        
+        elif transition.event == SystemEvent.STOP:
+            # 令牌已取消，工作线程不会再发起新的识别/大模型/合成请求
+            if self.gui_controller:
+                self.gui_controller.add_log_message("操作已停止")
+            self._speak_async("操作已停止")
+            self._reset_to_ready_state()
+            self._display_callback()
+        
+        elif transition.event == SystemEvent.FINISHED:
+            # 重置状态并确保GUI可以继续录音
+            self._reset_to_ready_state()
+            self._display_callback()
+    
+    def _start_voice_recording(self, token: CancellationToken, recorded_audio: Optional[bytes] = None):
+        """开始语音录制 - 进入录音状态时调用，recorded_audio 为连续监听唤醒后已录好的一句话"""
         try:
-            self.current_state = "listening"
-            
             if self.gui_controller:
                 self.gui_controller.show_listening_screen()
-                self.gui_controller.add_log_message("开始录音...")
+                self.gui_controller.add_log_message("开始录音..." if recorded_audio is None else "正在识别唤醒后的指令...")
             
             # 在新线程中处理语音
-            threading.Thread(target=self._process_voice_command, daemon=True).start()
+            threading.Thread(target=self._process_voice_command, args=(token, recorded_audio), daemon=True).start()
             
         except Exception as e:
             self.logger.error(f"开始语音录制失败: {e}")
-            self.current_state = "idle"
             if self.gui_controller:
-                self.gui_controller.show_welcome_screen()
                 self.gui_controller.add_log_message(f"录音失败: {e}")
+            self.state_machine.post(SystemEvent.FINISHED, token)
     
-    def _process_voice_command(self):
-        """处理语音命令"""
+    def _process_voice_command(self, token: CancellationToken, recorded_audio: Optional[bytes] = None):
+        """处理语音命令 - 每一步之前检查令牌，停止后不再发起新的请求"""
         try:
-            self.current_state = "processing"
-            
-            if self.gui_controller:
-                self.gui_controller.show_processing_screen()
-                self.gui_controller.add_log_message("正在处理语音...")
-            
             if not self.voice_assistant:
                 raise Exception("语音助手未初始化")
             
-            # 处理语音命令
-            result = self.voice_assistant.process_voice_command()
+            # 按钮开始的录音要等连续监听让出录音设备
+            if recorded_audio is None and self.continuous_listener and self.continuous_listener.running:
+                self.continuous_listener.wait_released(timeout=0.5)
+            
+            # 处理语音命令，识别出文字后进入处理状态
+            result = self.voice_assistant.process_voice_command(
+                cancel_token=token,
+                on_transcribed=lambda text: self.state_machine.post(SystemEvent.SPEECH_CAPTURED, token, text),
+                recorded_audio=recorded_audio
+            )
+            token.raise_if_cancelled()  # 确认播报期间被停止时不添加提醒
             
             if result and result['type'] == 'reminder':
                 # 添加提醒
@@ -356,43 +480,104 @@ class VoiceReminderSystem:
                 self.logger.info(f"对话内容: {result['data']['message']}")
                 if self.gui_controller:
                     self.gui_controller.add_log_message(f"对话: {result['data']['message']}")
-            
+        
+        except OperationCancelled:
+            self.logger.info("语音命令已取消")
+        
         except Exception as e:
             self.logger.error(f"语音命令处理失败: {e}")
             if self.voice_assistant:
-                self.voice_assistant.speak("抱歉，处理您的请求时出现了问题。")
+                self.voice_assistant.speak("抱歉，处理您的请求时出现了问题。", token)
             if self.gui_controller:
                 self.gui_controller.add_log_message(f"处理失败: {e}")
         
         finally:
-            # 重置状态并确保GUI可以继续录音
-            self.current_state = "idle"
-            self._reset_to_ready_state()
-            self._display_callback()
+            # 已被停止或已开始新的操作时，状态机会忽略这个令牌的结束事件
+            self.state_machine.post(SystemEvent.FINISHED, token)
     
     def _stop_current_operation(self):
-        """停止当前操作"""
-        self.current_state = "idle"
-        self._voice_callback("操作已停止")
-        self._display_callback()
+        """停止当前操作 - 取消进行中的识别/大模型/合成请求"""
+        self.state_machine.post(SystemEvent.STOP)
     
     def _cancel_current_operation(self):
         """取消当前操作"""
-        self.current_state = "idle"
         self._voice_callback("操作已取消")
         self._display_callback()
     
+    def _speak_async(self, message: str, priority: SpeechPriority = SpeechPriority.INTERACTIVE):
+        """在后台线程播报，避免阻塞按钮响应"""
+        threading.Thread(target=self._voice_callback, args=(message, priority), daemon=True).start()
+    
     def _confirm_reminder(self):
-        """确认提醒"""
-        # 这里可以添加确认提醒的逻辑
-        self._voice_callback("提醒已确认")
-        self.current_state = "idle"
-        self._display_callback()
+        """确认提醒 - 立即打断正在进行的播报并停止重复提醒"""
+        acknowledged = self.reminder_manager.acknowledge_reminder() if self.reminder_manager else []
+        if acknowledged:
+            tasks = "、".join(r.task for r in acknowledged)
+            if self.gui_controller:
+                self.gui_controller.add_log_message(f"已确认提醒: {tasks}")
+            self._speak_async("提醒已确认")
+    
+    def _snooze_reminders(self):
+        """稍后提醒 - 将所有待确认的提醒延迟默认时长"""
+        if not self.reminder_manager:
+            return
+        snoozed = [r for r in self.reminder_manager.get_awaiting_ack()
+                   if self.reminder_manager.snooze_reminder(r.id)]
+        if snoozed:
+            minutes = REMINDER_CONFIG['DEFAULT_SNOOZE']
+            if self.gui_controller:
+                self.gui_controller.add_log_message(
+                    f"{minutes}分钟后再次提醒: {'、'.join(r.task for r in snoozed)}")
+            self._speak_async(f"好的，{minutes}分钟后再提醒您")
     
     def _start_continuous_listening(self):
-        """开始连续监听模式"""
-        self._voice_callback("进入连续监听模式")
-        # 这里可以实现连续监听逻辑
+        """开启/关闭连续监听模式 - 说出唤醒词后直接说提醒内容，不用按按钮
+
+        只有本地识别出唤醒词后的一句话才会发送到语音识别；系统空闲时才监听，
+        录音、处理和确认播报期间让出录音设备。
+        """
+        try:
+            if self.continuous_listener and self.continuous_listener.running:
+                self.continuous_listener.stop()
+                self.continuous_listener = None
+                self._speak_async("已退出连续监听模式")
+                if self.gui_controller:
+                    self.gui_controller.add_log_message("连续监听已关闭")
+                return
+            
+            detector = WakeWordDetector()
+            if not detector.load_templates():
+                self.logger.warning(f"没有唤醒词样本: {detector.template_dir}")
+                self._speak_async("还没有录制唤醒词，无法进入连续监听模式")
+                return
+            
+            self.continuous_listener = ContinuousListener(
+                self.voice_assistant.audio, detector,
+                on_wake=self._on_wake_word,
+                on_command=self._on_wake_command,
+                is_enabled=lambda: self.state_machine.state == SystemState.IDLE
+            )
+            self.continuous_listener.start()
+            self._speak_async("进入连续监听模式，请先说唤醒词")
+            if self.gui_controller:
+                self.gui_controller.add_log_message("连续监听已开启")
+        except Exception as e:
+            self.logger.error(f"开启连续监听失败: {e}")
+    
+    def _on_wake_word(self):
+        """检测到唤醒词 - 在监听线程中调用"""
+        if self.gui_controller:
+            self.gui_controller.show_listening_screen()
+            self.gui_controller.add_log_message("检测到唤醒词，请说出提醒内容")
+    
+    def _on_wake_command(self, recorded_audio: Optional[bytes]):
+        """唤醒后的一句话 - 与按下录音按钮一样开始一次语音操作，没有等到指令时为None"""
+        if recorded_audio is None:
+            if self.gui_controller:
+                self.gui_controller.add_log_message("没有听到指令")
+            self._reset_to_ready_state()
+            return
+        self.state_machine.post(SystemEvent.RECORD, payload=recorded_audio)
     
     def _clear_all_reminders(self):
         """清除所有提醒"""
@@ -463,18 +648,11 @@ class VoiceReminderSystem:
             
             self.logger.info("系统启动完成")
             
-            # 延迟播放语音，确保GUI完全显示后再播放
-            def delayed_voice_announcement():
-                try:
-                    # 等待2秒确保GUI完全渲染
-                    import time
-                    time.sleep(2)
-                    self._voice_callback("语音助手已启用")
-                except Exception as e:
-                    self.logger.error(f"延迟语音播放失败: {e}")
-            
-            # 在新线程中播放语音，避免阻塞GUI
-            threading.Thread(target=delayed_voice_announcement, daemon=True).start()
+            # 界面主循环开始处理事件后才算可以操作，此时再预热语音库并播报启用提示
+            if self.gui_controller:
+                self.gui_controller.call_when_ready(self._on_interactive)
+            else:
+                self._on_interactive()
             
             # 启动GUI主循环
             if self.gui_controller:
@@ -484,29 +662,22 @@ class VoiceReminderSystem:
             self.logger.error(f"系统启动失败: {e}")
             raise
     
-    def _main_loop(self):
-        """主循环"""
+    def _on_interactive(self):
+        """系统可以响应操作 - 记录可交互耗时，在后台预热语音库后播报启用提示"""
+        elapsed_ms = round((time.perf_counter() - self._created_at) * 1000, 1)
+        self.startup_timeline.append({'step': 'interactive', 'status': 'done', 'thread': threading.current_thread().name,
+                                      'depends': [], 'start_ms': elapsed_ms, 'duration_ms': 0.0})
+        self.logger.info(f"系统可交互，从创建系统起耗时 {elapsed_ms:.0f} ms")
+        threading.Thread(target=self._warm_up_and_announce, name='voice-warm-up', daemon=True).start()
+    
+    def _warm_up_and_announce(self):
+        """预热语音识别/合成/播放库，然后播报启用提示"""
         try:
-            while self.running:
-                # 定期更新显示
-                self._display_callback()
-                
-                # 检查系统状态
-                if self.reminder_manager:
-                    status = self.reminder_manager.get_status_summary()
-                    if status['current_reminder']:
-                        self.current_state = "reminder_active"
-                    elif self.current_state == "reminder_active":
-                        self.current_state = "idle"
-                
-                time.sleep(1)  # 1秒更新间隔
-                
-        except KeyboardInterrupt:
-            self.logger.info("收到中断信号，正在关闭系统...")
+            if self.voice_assistant:
+                self.voice_assistant.warm_up()
+            self._voice_callback("语音助手已启用", SpeechPriority.SYSTEM)
         except Exception as e:
-            self.logger.error(f"主循环异常: {e}")
-        finally:
-            self.shutdown()
+            self.logger.error(f"启用提示播报失败: {e}")
     
     def shutdown(self):
         """关闭系统"""
@@ -518,13 +689,21 @@ class VoiceReminderSystem:
             if self.button_controller:
                 self.button_controller.cleanup()
             
+            if self.continuous_listener:
+                self.continuous_listener.stop()
+            
             if self.web_server:
                 self.web_server.stop()
             
             if self.reminder_manager:
                 self.reminder_manager.shutdown()
             
-            # GUI控制器会在应用程序退出时自动关闭
+            if self.voice_assistant:
+                self.voice_assistant.shutdown()
+            
+            # GUI控制器会在应用程序退出时自动关闭，无界面模式需要结束 run()
+            if self.gui_controller and not self.gui_mode:
+                self.gui_controller.stop()
             
             self.logger.info("系统已关闭")
             
@@ -543,14 +722,20 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
     
     # 检查命令行参数
-    gui_mode = '--gui' in sys.argv or len(sys.argv) == 1  # 默认使用GUI模式
+    gui_mode = '--headless' not in sys.argv  # 默认使用GUI模式
+    display_output = next((arg.split('=', 1)[1] for arg in sys.argv if arg.startswith('--display=')), None)
     
     if gui_mode:
         print("运行在GUI模式下")
+    else:
+        print("运行在无界面模式下" + (f"，状态画面输出到 {display_output}" if display_output else ""))
     
     try:
+        # 完整系统需要语音和大模型的API密钥，启动前一次性检查
+        validate_required_env()
+        
         # 创建并启动系统
-        system = VoiceReminderSystem(gui_mode=gui_mode)
+        system = VoiceReminderSystem(gui_mode=gui_mode, display_output=display_output)
         exit_code = system.start()
         sys.exit(exit_code or 0)
         
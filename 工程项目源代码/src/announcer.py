@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+提醒播报调度模块 - 按优先级合并、抢占和重复播报到期提醒
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, TYPE_CHECKING
+
+from config import ANNOUNCE_CONFIG
+
+if TYPE_CHECKING:
+    from src.reminder import Reminder
+
+class AnnouncementScheduler:
+    """提醒播报调度器
+
+    到期提醒先进入待播报队列，在合并窗口内到达的提醒合成一条播报，按
+    用药 > 预约 > 日常 的优先级排列。正在播报低优先级内容时到达更高优先级的
+    提醒会打断当前播报，被打断的提醒稍后重新播报。用药类提醒在确认之前按
+    退避间隔重复播报。所有播报都在调度器自己的工作线程中执行。
+    """
+
+    def __init__(self, speak_callback: Callable[[str], None],
+                 interrupt_callback: Optional[Callable[[], None]] = None,
+                 merge_window: float = None, escalation_backoff: List[float] = None):
+        self.logger = logging.getLogger(__name__)
+        self.speak_callback = speak_callback          # 阻塞式语音播报
+        self.interrupt_callback = interrupt_callback  # 立即停止当前播报
+        self.merge_window = ANNOUNCE_CONFIG['MERGE_WINDOW'] if merge_window is None else merge_window
+        self.escalation_backoff = list(escalation_backoff or ANNOUNCE_CONFIG['ESCALATION_BACKOFF'])
+
+        self._condition = threading.Condition()
+        self._pending: Dict[str, 'Reminder'] = {}   # 待播报提醒
+        self._attempts: Dict[str, int] = {}       # 提醒ID -> 已播报次数
+        self._first_pending_at: Optional[float] = None
+        self._retries: List[tuple] = []           # (重播时间, 序号, 提醒ID, 提醒) 小顶堆
+        self._retry_seq = itertools.count()
+        self._acknowledged = set()               # 已确认、但仍被重播队列或当前播报引用的提醒ID
+        self._speaking: List['Reminder'] = []
+        self._speaking_priority: Optional[int] = None
+        self._preempt_requested = False          # 已请求打断当前播报(避免重复打断)
+        self._preempted = False                  # 打断已送达，当前播报结束后重新排队
+        self._running = True
+
+        # 工作线程在第一次提交时才启动，没有到期提醒的家庭不占用线程
+        self._worker = threading.Thread(target=self._run, daemon=True)
+
+    def submit(self, reminders: List['Reminder']):
+        """提交到期提醒"""
+        if not reminders:
+            return
+        interrupt = None
+        with self._condition:
+            if not self._worker.is_alive() and self._running:
+                self._worker.start()
+            for reminder in reminders:
+                self._acknowledged.discard(reminder.id)
+                self._pending[reminder.id] = reminder
+            if self._first_pending_at is None:
+                self._first_pending_at = time.monotonic()
+
+            # 更高优先级的提醒抢占正在进行的播报
+            top_priority = max(r.category.priority for r in reminders)
+            if (self._speaking_priority is not None and top_priority > self._speaking_priority
+                    and not self._preempt_requested and self.interrupt_callback):
+                self._preempt_requested = True
+                interrupt = self._speaking
+            self._condition.notify()
+
+        if interrupt is not None:
+            self.logger.info("高优先级提醒到达，打断当前播报")
+            delivered = self._interrupt()
+            with self._condition:
+                # 只有打断确实送达、且还是同一批播报时才重新排队，否则让它正常播完
+                if delivered and self._speaking is interrupt:
+                    self._preempted = True
+
+    def acknowledge(self, reminder_id: str) -> bool:
+        """确认提醒，停止后续重复播报；正在播报的提醒全部确认后立即停止播报"""
+        with self._condition:
+            known = (reminder_id in self._pending or reminder_id in self._attempts
+                     or any(r.id == reminder_id for r in self._speaking))
+            if not known:
+                return False
+            self._acknowledged.add(reminder_id)
+            self._pending.pop(reminder_id, None)
+            self._attempts.pop(reminder_id, None)
+            interrupt = bool(self._speaking) and all(r.id in self._acknowledged for r in self._speaking)
+            self._forget_acknowledged([reminder_id])
+            self._condition.notify()
+
+        if interrupt:
+            self._interrupt()
+        return True
+
+    def get_unacknowledged(self) -> List[str]:
+        """获取已播报但尚未确认的提醒ID，最近播报的在前"""
+        with self._condition:
+            speaking = [r.id for r in self._speaking]
+            return speaking + [rid for rid in self._attempts if rid not in speaking]
+
+    def shutdown(self):
+        """停止调度线程"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._worker.is_alive():
+            self._worker.join(timeout=2)
+
+    def _interrupt(self) -> bool:
+        """停止当前播报，返回是否已送达"""
+        if not self.interrupt_callback:
+            return False
+        try:
+            self.interrupt_callback()
+            return True
+        except Exception as e:
+            self.logger.error(f"打断播报失败: {e}")
+            return False
+
+    def _next_wakeup(self) -> Optional[float]:
+        """计算下一次需要处理的时间点 - 调用方必须持有锁"""
+        candidates = []
+        if self._pending:
+            candidates.append(self._first_pending_at + self.merge_window)
+        if self._retries:
+            candidates.append(self._retries[0][0])
+        return min(candidates) if candidates else None
+
+    def _forget_acknowledged(self, reminder_ids):
+        """不再被任何队列引用的已确认提醒ID从确认集合中移除 - 调用方必须持有锁"""
+        for reminder_id in reminder_ids:
+            if reminder_id not in self._acknowledged:
+                continue
+            if (reminder_id in self._pending or reminder_id in self._attempts
+                    or any(r.id == reminder_id for r in self._speaking)
+                    or any(entry[2] == reminder_id for entry in self._retries)):
+                continue
+            self._acknowledged.discard(reminder_id)
+
+    def _collect_due_retries(self, now: float):
+        """将到期的重复播报移回待播报队列 - 调用方必须持有锁"""
+        while self._retries and self._retries[0][0] <= now:
+            _, _, reminder_id, reminder = heapq.heappop(self._retries)
+            if reminder_id in self._acknowledged or reminder_id not in self._attempts:
+                self._forget_acknowledged([reminder_id])
+                continue
+            self._pending[reminder_id] = reminder
+            if self._first_pending_at is None:
+                # 重复播报不需要再等待合并窗口
+                self._first_pending_at = now - self.merge_window
+
+    def _run(self):
+        """调度线程主循环"""
+        while True:
+            with self._condition:
+                while self._running:
+                    now = time.monotonic()
+                    self._collect_due_retries(now)
+                    wakeup = self._next_wakeup()
+                    if self._pending and wakeup <= now:
+                        break
+                    self._condition.wait(None if wakeup is None else wakeup - now)
+                if not self._running:
+                    return
+
+                batch = sorted(self._pending.values(),
+                               key=lambda r: (-r.category.priority, r.scheduled_time))
+                self._pending.clear()
+                self._first_pending_at = None
+                self._speaking = batch
+                self._speaking_priority = batch[0].category.priority
+                self._preempt_requested = False
+                self._preempted = False
+                repeated = all(self._attempts.get(r.id, 0) > 0 for r in batch)
+
+            try:
+                self.speak_callback(self._format_message(batch, repeated))
+            except Exception as e:
+                self.logger.error(f"提醒播报失败: {e}")
+
+            with self._condition:
+                self._speaking = []
+                self._speaking_priority = None
+                now = time.monotonic()
+                for reminder in batch:
+                    if reminder.id in self._acknowledged:
+                        continue
+                    if self._preempted and reminder.id not in self._pending:
+                        # 被打断的提醒重新排队，与抢占者一起播报
+                        self._pending[reminder.id] = reminder
+                        continue
+                    attempts = self._attempts.get(reminder.id, 0) + 1
+                    if not reminder.category.escalates:
+                        continue
+                    if attempts > len(self.escalation_backoff):
+                        self.logger.warning(f"提醒多次播报仍未确认: {reminder.task}")
+                        self._attempts.pop(reminder.id, None)
+                        continue
+                    self._attempts[reminder.id] = attempts
+                    heapq.heappush(self._retries, (now + self.escalation_backoff[attempts - 1],
+                                                   next(self._retry_seq), reminder.id, reminder))
+                if self._pending and self._first_pending_at is None:
+                    self._first_pending_at = now - self.merge_window
+                self._preempt_requested = False
+                self._preempted = False
+                self._forget_acknowledged([r.id for r in batch])
+
+    def _format_message(self, batch: List['Reminder'], repeated: bool) -> str:
+        """合并播报文本，高优先级提醒在前"""
+        if len(batch) == 1:
+            message = f"提醒时间到了！{batch[0].task}"
+        else:
+            tasks = "、".join(r.task for r in batch)
+            message = f"有 {len(batch)} 个提醒时间到了！包括：{tasks}"
+        if repeated:
+            message = f"再次提醒，请确认。{message}"
+        return message
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+语音输出调度模块 - 所有线程的播报经同一个播放线程按优先级排队输出
+"""
+
+import os
+import time
+import logging
+import threading
+import itertools
+import statistics
+import tempfile
+from collections import deque
+from enum import Enum, IntEnum
+from typing import Callable, Dict, List, Optional
+
+from config import AUDIO_OUTPUT_CONFIG
+from src.state_machine import CancellationToken
+
+class SpeechPriority(IntEnum):
+    """播报优先级，数值越大越优先"""
+    SYSTEM = 0       # 系统提示(启用、关机等)
+    MESSAGE = 1      # 家人发来的消息
+    INTERACTIVE = 2  # 对用户操作的回应(确认、出错、停止)
+    ALERT = 3        # 到期提醒
+
+class UtteranceStatus(Enum):
+    """播报状态"""
+    PENDING = "pending"          # 等待合成或播放
+    PLAYING = "playing"
+    PLAYED = "played"            # 播放完成
+    INTERRUPTED = "interrupted"  # 被 interrupt() 打断
+    CANCELLED = "cancelled"      # 令牌被取消
+    FAILED = "failed"            # 合成或播放失败
+    DROPPED = "dropped"          # 队列已满被丢弃
+
+FINAL_STATUSES = {UtteranceStatus.PLAYED, UtteranceStatus.INTERRUPTED, UtteranceStatus.CANCELLED,
+                  UtteranceStatus.FAILED, UtteranceStatus.DROPPED}
+
+class Utterance:
+    """一条播报 - submit() 返回，调用方可以 wait() 等待播放结束"""
+
+    def __init__(self, text: str, priority: SpeechPriority, seq: int,
+                 cancel_token: Optional[CancellationToken] = None):
+        self.text = text
+        self.priority = priority
+        self.seq = seq
+        self.cancel_token = cancel_token
+        self.status = UtteranceStatus.PENDING
+        self.audio_file: Optional[str] = None
+        self.synthesizing = False
+        self.error: Optional[str] = None
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+        self._remove_cancel_callback: Callable[[], None] = lambda: None
+
+    @property
+    def ready(self) -> bool:
+        return self.audio_file is not None
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待播放结束(完成、打断、取消或失败)，返回是否已结束"""
+        return self._done.wait(timeout)
+
+class AudioOutputArbiter:
+    """语音输出调度器
+
+    播报按优先级(同级先到先播)进入队列。合成线程按同样的顺序提前合成，播放
+    线程是唯一操作播放器(pygame.mixer.music)的线程：
+      - 同一优先级已合成的连续播报合并为一个音频文件播放，中间没有停顿
+      - 正在播放时有更高优先级的播报合成完毕: 高出 PREEMPT_GAP 级以上时淡出打断
+        当前播报，当前播报重新排队；只高出一级时当前播报降低音量(ducking)播完，
+        高优先级播报紧接着播放
+      - interrupt() 和令牌取消在 POLL_MS 内停止播放
+    synthesize(text, cancel_token) 返回音频文件路径，失败时返回None；播放结束后
+    文件由调度器删除。
+    """
+
+    def __init__(self, synthesize: Callable[[str, Optional[CancellationToken]], Optional[str]],
+                 player: Callable[[], object], config: Dict = None):
+        self.logger = logging.getLogger(__name__)
+        self.synthesize = synthesize
+        self.player = player  # 返回已初始化 mixer 的 pygame 模块，第一次播放时才调用
+        settings = dict(AUDIO_OUTPUT_CONFIG, **(config or {}))
+        self.preempt_gap = settings['PREEMPT_GAP']
+        self.duck_volume = settings['DUCK_VOLUME']
+        self.fade_ms = settings['FADE_MS']
+        self.max_queue = settings['MAX_QUEUE']
+        self.concat_max = settings['CONCAT_MAX']
+        self.poll_seconds = settings['POLL_MS'] / 1000
+
+        self._condition = threading.Condition()
+        self._queue: List[Utterance] = []  # 等待播放，按 (-优先级, 序号) 排序
+        self._playing: List[Utterance] = []
+        self._stop_requested: Optional[UtteranceStatus] = None
+        self._playing_cancelled: Optional[Utterance] = None  # 令牌被取消的那条正在播放的播报
+        self._seq = itertools.count()
+        self._running = True
+        self._threads: List[threading.Thread] = []
+
+        self._counters = {name: 0 for name in ('submitted', 'played', 'interrupted', 'cancelled', 'failed',
+                                               'dropped', 'preempted', 'ducked', 'concatenated')}
+        self._max_depth = 0
+        self._waits = {priority: deque(maxlen=settings['WAIT_HISTORY']) for priority in SpeechPriority}
+
+    def submit(self, text: str, priority: SpeechPriority = SpeechPriority.INTERACTIVE,
+               cancel_token: Optional[CancellationToken] = None) -> Utterance:
+        """提交播报，立即返回"""
+        with self._condition:
+            utterance = Utterance(text, SpeechPriority(priority), next(self._seq), cancel_token)
+            self._counters['submitted'] += 1
+            if not self._running:
+                self._finish([utterance], UtteranceStatus.DROPPED)
+                return utterance
+            if not self._threads:
+                # 线程在第一次播报时才启动
+                for target, name in ((self._synthesis_loop, 'speech-synthesis'), (self._playback_loop, 'speech-output')):
+                    thread = threading.Thread(target=target, name=name, daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+
+            self._queue.append(utterance)
+            self._queue.sort(key=lambda u: (-u.priority, u.seq))
+            if len(self._queue) > self.max_queue:
+                # 丢弃最早的最低优先级播报(可能就是刚提交的这条)
+                victim = min(self._queue, key=lambda u: (u.priority, u.seq))
+                self._queue.remove(victim)
+                self.logger.warning(f"播报队列已满，丢弃: {victim.text}")
+                self._finish([victim], UtteranceStatus.DROPPED)
+            self._max_depth = max(self._max_depth, len(self._queue))
+            self._condition.notify_all()
+
+        if cancel_token is not None and not utterance.done:
+            utterance._remove_cancel_callback = cancel_token.add_callback(lambda: self.cancel(utterance))
+        return utterance
+
+    def cancel(self, utterance: Utterance):
+        """取消一条播报 - 还在排队时移出队列，正在播放时停止"""
+        with self._condition:
+            if utterance in self._queue:
+                self._queue.remove(utterance)
+                self._finish([utterance], UtteranceStatus.CANCELLED)
+            elif utterance in self._playing:
+                self._stop_requested = UtteranceStatus.CANCELLED
+                self._playing_cancelled = utterance
+            self._condition.notify_all()
+
+    def interrupt(self, priority: Optional[SpeechPriority] = None):
+        """立即停止正在播放的内容，并取消此前提交、尚未播放的播报
+
+        priority 不为None时只影响该优先级的播报(例如确认提醒时只停止提醒播报)。
+        """
+        with self._condition:
+            boundary = next(self._seq)
+            matches = lambda u: u.seq < boundary and (priority is None or u.priority == priority)
+            if any(matches(u) for u in self._playing):
+                self._stop_requested = UtteranceStatus.INTERRUPTED
+                self._playing_cancelled = None
+            dropped = [u for u in self._queue if matches(u)]
+            for utterance in dropped:
+                self._queue.remove(utterance)
+            self._finish(dropped, UtteranceStatus.INTERRUPTED)
+            self._condition.notify_all()
+
+    def shutdown(self, timeout: float = 2.0):
+        """停止播放线程，丢弃等待中的播报"""
+        with self._condition:
+            self._running = False
+            if self._playing:
+                self._stop_requested = UtteranceStatus.INTERRUPTED
+                self._playing_cancelled = None
+            self._finish(list(self._queue), UtteranceStatus.DROPPED)
+            self._queue.clear()
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def stats(self) -> Dict:
+        """队列深度、各优先级的等待时间(提交到开始播放，毫秒)和各类计数"""
+        with self._condition:
+            waits = {}
+            for priority, samples in self._waits.items():
+                if samples:
+                    # 与 benchmarks/_common.py 的 percentiles() 使用同一组键和最近秩取法
+                    ordered = sorted(samples)
+                    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+                    waits[priority.name.lower()] = {
+                        'count': len(ordered),
+                        'mean': round(statistics.mean(ordered), 1),
+                        'p50': pick(0.50),
+                        'p90': pick(0.90),
+                        'p95': pick(0.95),
+                        'p99': pick(0.99),
+                        'max': round(ordered[-1], 1)
+                    }
+            return {
+                'queue_depth': len(self._queue),
+                'max_queue_depth': self._max_depth,
+                'playing': [u.text for u in self._playing],
+                'wait_ms': waits,
+                **self._counters
+            }
+
+    # ------------------------------------------------------------------
+    # 合成线程
+    # ------------------------------------------------------------------
+
+    def _synthesis_loop(self):
+        """按播放顺序提前合成，播放线程播放当前内容时合成下一条"""
+        while True:
+            with self._condition:
+                while self._running and not any(not u.ready and not u.synthesizing for u in self._queue):
+                    self._condition.wait()
+                if not self._running:
+                    return
+                utterance = next(u for u in self._queue if not u.ready and not u.synthesizing)
+                utterance.synthesizing = True
+
+            audio_file, error = None, None
+            try:
+                audio_file = self.synthesize(utterance.text, utterance.cancel_token)
+                if not audio_file:
+                    error = "语音合成失败"
+            except Exception as e:
+                error = str(e)
+
+            with self._condition:
+                utterance.synthesizing = False
+                if utterance not in self._queue:
+                    # 合成期间已被取消或丢弃
+                    self._remove_file(audio_file)
+                elif error:
+                    self.logger.error(f"播报合成失败: {utterance.text} - {error}")
+                    utterance.error = error
+                    self._queue.remove(utterance)
+                    self._finish([utterance], UtteranceStatus.FAILED)
+                else:
+                    utterance.audio_file = audio_file
+                self._condition.notify_all()
+
+    # ------------------------------------------------------------------
+    # 播放线程
+    # ------------------------------------------------------------------
+
+    def _playback_loop(self):
+        while True:
+            with self._condition:
+                # 队首(优先级最高、最早提交)合成完毕后才播放，保证同级按提交顺序
+                while self._running and not (self._queue and self._queue[0].ready):
+                    self._condition.wait()
+                if not self._running:
+                    return
+                group = self._take_group()
+
+            try:
+                self._play_group(group)
+            except Exception as e:
+                self.logger.error(f"播报播放失败: {e}")
+                with self._condition:
+                    for utterance in group:
+                        utterance.error = str(e)
+                    self._playing = []
+                    self._finish(group, UtteranceStatus.FAILED)
+
+    def _take_group(self) -> List[Utterance]:
+        """取出队首及其后同一优先级、已合成的连续播报(调用时持有锁)"""
+        group = [self._queue.pop(0)]
+        while (self._queue and len(group) < self.concat_max and self._queue[0].ready
+               and self._queue[0].priority == group[0].priority):
+            group.append(self._queue.pop(0))
+        now = time.monotonic()
+        for utterance in group:
+            utterance.status = UtteranceStatus.PLAYING
+            if utterance.started_at is None:
+                utterance.started_at = now
+                self._waits[utterance.priority].append((now - utterance.submitted_at) * 1000)
+        self._playing = group
+        self._stop_requested = None
+        self._playing_cancelled = None
+        return group
+
+    def _play_group(self, group: List[Utterance]):
+        pygame = self.player()
+        path = group[0].audio_file if len(group) == 1 else self._concatenate(group)
+        with self._condition:
+            self._counters['concatenated'] += len(group) - 1
+        ducked = False
+        try:
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(1.0)
+            pygame.mixer.music.play()
+            while True:
+                with self._condition:
+                    stop = self._stop_requested
+                    waiting = self._queue[0] if self._queue and self._queue[0].ready else None
+                if stop is not None:
+                    pygame.mixer.music.stop()
+                    self._end_group(group, stop)
+                    return
+                if waiting and waiting.priority - group[0].priority >= self.preempt_gap:
+                    self.logger.info(f"高优先级播报打断当前播报: {waiting.text}")
+                    pygame.mixer.music.fadeout(self.fade_ms)
+                    self._end_group(group, None)
+                    return
+                if waiting and waiting.priority > group[0].priority and not ducked:
+                    pygame.mixer.music.set_volume(self.duck_volume)
+                    ducked = True
+                    with self._condition:
+                        self._counters['ducked'] += 1
+                if not pygame.mixer.music.get_busy():
+                    break
+                time.sleep(self.poll_seconds)
+            self._end_group(group, UtteranceStatus.PLAYED)
+        finally:
+            try:
+                pygame.mixer.music.unload()
+            except Exception:
+                pass  # 忽略pygame清理错误
+            if path != group[0].audio_file:
+                self._remove_file(path)
+
+    def _end_group(self, group: List[Utterance], status: Optional[UtteranceStatus]):
+        """结束一组播报；status 为None表示被抢占，这组播报重新排队"""
+        with self._condition:
+            self._playing = []
+            if status is None:
+                self._counters['preempted'] += 1
+                for utterance in group:
+                    utterance.status = UtteranceStatus.PENDING
+                self._queue.extend(group)
+                self._queue.sort(key=lambda u: (-u.priority, u.seq))
+            elif status == UtteranceStatus.CANCELLED and self._playing_cancelled is not None:
+                # 只取消令牌对应的那条，合并播放的其他播报重新排队
+                others = [u for u in group if u is not self._playing_cancelled]
+                for utterance in others:
+                    utterance.status = UtteranceStatus.PENDING
+                self._queue.extend(others)
+                self._queue.sort(key=lambda u: (-u.priority, u.seq))
+                self._finish([self._playing_cancelled], UtteranceStatus.CANCELLED)
+            else:
+                self._finish(group, status)
+            self._stop_requested = None
+            self._playing_cancelled = None
+            self._condition.notify_all()
+
+    def _concatenate(self, group: List[Utterance]) -> str:
+        """把同一合成引擎输出的MP3帧依次拼接为一个文件"""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(group[0].audio_file)[1]) as out:
+            for utterance in group:
+                with open(utterance.audio_file, 'rb') as f:
+                    out.write(f.read())
+        return out.name
+
+    def _finish(self, utterances: List[Utterance], status: UtteranceStatus):
+        """记录结束状态，删除音频文件并唤醒等待的调用方(调用时持有锁)"""
+        for utterance in utterances:
+            utterance.status = status
+            utterance.finished_at = time.monotonic()
+            self._counters[status.value] += 1
+            self._remove_file(utterance.audio_file)
+            utterance.audio_file = None
+            utterance._remove_cancel_callback()
+            utterance._done.set()
+
+    def _remove_file(self, path: Optional[str]):
+        if not path:
+            return
+        for attempt in range(3):
+            try:
+                os.unlink(path)
+                return
+            except FileNotFoundError:
+                return
+            except OSError as e:
+                if attempt == 2:
+                    self.logger.warning(f"删除临时音频文件失败: {path} - {e}")
+                else:
+                    time.sleep(0.1)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+事件推送模块 - 通过Server-Sent Events向家属网页推送提醒和消息处理状态
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+from config import WEB_CONFIG
+
+class Subscription:
+    """单个推送连接的待发送事件队列"""
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self.closed = False
+        self._events = deque()
+        self._condition = threading.Condition()
+
+    def put(self, item: bytes):
+        with self._condition:
+            if self.closed:
+                return
+            if len(self._events) >= self.max_pending:
+                # 客户端读取过慢，断开连接，客户端重连后通过 Last-Event-ID 补发
+                self.closed = True
+            else:
+                self._events.append(item)
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify()
+
+    def take(self, timeout: float) -> List[bytes]:
+        """取出所有待发送事件，没有事件时最多等待timeout秒"""
+        with self._condition:
+            if not self._events and not self.closed:
+                self._condition.wait(timeout)
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+class EventBroadcaster:
+    """事件广播器
+
+    每个事件只序列化一次，然后放入所有连接的队列。空闲连接只占用一个阻塞
+    等待的线程，不产生任何请求；每隔一段时间发送一次注释行作为心跳，
+    避免代理或路由器断开长连接。最近的事件保留在回放缓冲区中，断线重连时
+    按 Last-Event-ID 补发。
+    """
+
+    def __init__(self, max_clients: int = None, max_pending: int = None, replay_size: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_clients = max_clients or WEB_CONFIG['EVENT_MAX_CLIENTS']
+        self.max_pending = max_pending or WEB_CONFIG['EVENT_QUEUE_SIZE']
+
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._last_id = 0
+        self._recent = deque(maxlen=replay_size or WEB_CONFIG['EVENT_REPLAY_SIZE'])  # (事件ID, 编码后的事件)
+
+    @staticmethod
+    def _encode(event_id: int, event: str, data: Dict) -> bytes:
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n".encode('utf-8')
+
+    def publish(self, event: str, data: Dict):
+        """向所有连接推送事件(可在任意线程调用)"""
+        with self._lock:
+            self._last_id += 1
+            event_id = self._last_id
+            item = self._encode(event_id, event, data)
+            self._recent.append((event_id, item))
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(item)
+
+    def subscribe(self, last_event_id: Optional[int] = None,
+                  snapshot: Optional[Callable[[], Dict]] = None) -> Optional[Subscription]:
+        """建立推送连接，连接数已满时返回None
+
+        last_event_id 为重连时客户端收到的最后一个事件ID：断线期间的事件仍在回放
+        缓冲区内时只补发这些事件，否则(或首次连接)调用 snapshot 发送完整状态。
+        """
+        subscription = Subscription(self.max_pending)
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                return None
+            self._subscribers.add(subscription)
+
+            # 服务重启后事件ID从头开始，客户端带来的ID大于当前ID时同样需要完整状态
+            oldest = self._recent[0][0] if self._recent else self._last_id + 1
+            if last_event_id is not None and oldest - 1 <= last_event_id <= self._last_id:
+                for event_id, item in self._recent:
+                    if event_id > last_event_id:
+                        subscription.put(item)
+            elif snapshot is not None:
+                # 在锁内生成快照，之后发布的事件一定排在快照之后
+                self._last_id += 1
+                subscription.put(self._encode(self._last_id, 'snapshot', snapshot()))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def client_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def stream(self, subscription: Subscription, heartbeat: float = None) -> Iterator[bytes]:
+        """生成SSE响应体，连接关闭时自动取消订阅"""
+        heartbeat = heartbeat or WEB_CONFIG['EVENT_HEARTBEAT']
+        try:
+            # 客户端断线后重连的间隔(毫秒)
+            yield b"retry: 1000\n\n"
+            while True:
+                events = subscription.take(heartbeat)
+                if events:
+                    yield b"".join(events)
+                elif subscription.closed:
+                    return
+                else:
+                    yield b": keep-alive\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def close(self):
+        """关闭所有连接"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscription in subscribers:
+            subscription.close()
@@ -5,17 +5,22 @@ Qt5 GUI控制器模块 - 替代OLED显示屏的图形界面
 
 import sys
 import logging
+import threading
+import itertools
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, List
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QPushButton, QTextEdit, QListWidget, QListWidgetItem,
+    QLabel, QPushButton, QPlainTextEdit, QListView,
     QFrame, QScrollArea, QMessageBox, QSystemTrayIcon, QMenu, QGraphicsDropShadowEffect
 )
-from PyQt5.QtCore import QTimer, pyqtSignal, QThread, Qt, QSize
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, QThread, Qt, QSize
 from PyQt5.QtGui import QFont, QIcon, QPalette, QColor, QPixmap
 
 from config import GUI_CONFIG, BUTTON_CONFIG
+from src.reminder import ChangeType, ReminderChange
+from src.reminder_list_model import ReminderListModel
 
 def add_shadow(widget):
     shadow = QGraphicsDropShadowEffect(widget)
@@ -32,6 +37,7 @@ class VoiceReminderGUI(QMainWindow):
     stop_requested = pyqtSignal()
     clear_reminders_requested = pyqtSignal()
     message_received = pyqtSignal(str)  # 添加一个用于接收消息的信号
+    reminder_changes_pending = pyqtSignal()  # 有待应用的提醒增量(跨线程排队)
     
     def __init__(self):
         super().__init__()
@@ -45,11 +51,35 @@ class VoiceReminderGUI(QMainWindow):
         # 当前状态
         self.current_state = "idle"  # idle, listening, processing
         
+        # 提醒列表模型 - 仅在Qt线程中访问
+        self.reminder_model = ReminderListModel(parent=self)
+        
+        # 待应用的增量 - 任意线程写入，按提醒ID合并
+        self._pending_lock = threading.Lock()
+        self._pending_changes: Dict[str, ReminderChange] = {}
+        self._pending_tick = False
+        self._pending_reset = False
+        self._flush_requested = False
+        
         # 初始化界面
         self._init_ui()
         self._setup_style()
         self._connect_signals()
-        self.message_received.connect(self.message_area.append) # 连接信号到槽
+        self.message_received.connect(self._queue_log_line) # 连接信号到槽
+        
+        # 增量按帧合并: 信号排队到Qt线程后启动单次帧定时器，定时器到期时统一应用
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.setInterval(max(1, 1000 // GUI_CONFIG['FRAME_RATE']))
+        self._frame_timer.timeout.connect(self._apply_reminder_changes)
+        self.reminder_changes_pending.connect(self._schedule_frame, Qt.QueuedConnection)
+        
+        # 消息/日志行按帧批量追加，帧内超出行数上限的旧行直接丢弃
+        self._pending_log_lines = deque(maxlen=GUI_CONFIG['LOG_MAX_LINES'])
+        self._log_timer = QTimer(self)
+        self._log_timer.setSingleShot(True)
+        self._log_timer.setInterval(max(1, 1000 // GUI_CONFIG['FRAME_RATE']))
+        self._log_timer.timeout.connect(self._flush_log_lines)
         
         self.logger.info("Qt5 GUI界面初始化完成")
     
@@ -154,12 +184,14 @@ class VoiceReminderGUI(QMainWindow):
         self.status_label.setFont(QFont('', 14))
         self.status_label.setWordWrap(True)
         
-        # 消息显示区域
-        self.message_area = QTextEdit()
+        # 消息显示区域 - 只保留最近的 LOG_MAX_LINES 行，长期运行时内存和排版开销不变
+        self.message_area = QPlainTextEdit()
         self.message_area.setObjectName("messageArea")
         self.message_area.setFont(QFont('', 12))
         self.message_area.setMaximumHeight(400)
         self.message_area.setReadOnly(True)
+        self.message_area.setUndoRedoEnabled(False)
+        self.message_area.setMaximumBlockCount(GUI_CONFIG['LOG_MAX_LINES'])
         
         message_layout.addWidget(message_title)
         message_layout.addWidget(self.status_label)
@@ -226,10 +258,12 @@ class VoiceReminderGUI(QMainWindow):
         self.current_reminder_label.setWordWrap(True)
         
         # 提醒列表
-        self.reminder_list = QListWidget()
+        self.reminder_list = QListView()
         self.reminder_list.setObjectName("reminderList")
         self.reminder_list.setFont(QFont('', 12))
         self.reminder_list.setMaximumHeight(250)
+        self.reminder_list.setUniformItemSizes(True)  # 行高相同，不必逐行计算尺寸
+        self.reminder_list.setModel(self.reminder_model)
         
         reminder_layout.addWidget(reminder_title)
         reminder_layout.addWidget(self.countdown_label)
@@ -482,24 +516,62 @@ class VoiceReminderGUI(QMainWindow):
         self.show_notification_non_blocking(f"来自{sender}的消息", message)
     
     def update_reminder_list(self, reminders: list):
-        """更新提醒列表 - 支持多个提醒同时显示倒计时"""
-        self.reminder_list.clear()
-        
-        # 过滤活跃的提醒
-        active_reminders = [r for r in reminders if r.is_active and not r.is_completed]
-        
-        # 更新当前提醒显示
-        if active_reminders:
-            # 按时间排序，显示最近的提醒
-            active_reminders.sort(key=lambda r: r.scheduled_time)
-            next_reminder = active_reminders[0]
-            
+        """更新提醒列表 - 以给定列表整体替换当前内容(可在任意线程调用)"""
+        with self._pending_lock:
+            self._pending_changes = {r.id: ReminderChange(ChangeType.UPDATED, r) for r in reminders}
+            self._pending_reset = True
+            self._pending_tick = True
+        self._request_flush()
+    
+    def queue_reminder_changes(self, changes: List[ReminderChange]):
+        """排队提醒增量 - 可在任意线程调用，同一提醒的多次变更只保留最新一次"""
+        with self._pending_lock:
+            for change in changes:
+                if change.change_type == ChangeType.TICK:
+                    self._pending_tick = True
+                elif change.change_type == ChangeType.ACKNOWLEDGED:
+                    continue  # 确认不改变列表显示
+                else:
+                    self._pending_changes[change.reminder_id] = change
+        self._request_flush()
+    
+    def _request_flush(self):
+        """请求在Qt线程中应用增量，已有未处理的请求时不重复发送信号"""
+        with self._pending_lock:
+            if self._flush_requested:
+                return
+            self._flush_requested = True
+        self.reminder_changes_pending.emit()
+    
+    def _schedule_frame(self):
+        """在Qt线程中启动帧定时器，同一帧内到达的增量一起应用"""
+        if not self._frame_timer.isActive():
+            self._frame_timer.start()
+    
+    def _apply_reminder_changes(self):
+        """应用累积的提醒增量 - 模型只通知发生变化的行"""
+        with self._pending_lock:
+            changes = self._pending_changes
+            reset = self._pending_reset
+            tick = self._pending_tick
+            self._pending_changes = {}
+            self._pending_reset = False
+            self._pending_tick = False
+            self._flush_requested = False
+        
+        changed = self.reminder_model.apply_changes(changes, reset=reset, tick=tick)
+        if tick or changed:
+            self._update_current_reminder(self.reminder_model.head())
+    
+    def _update_current_reminder(self, next_reminder):
+        """更新最近提醒和主倒计时显示"""
+        if next_reminder:
             self.current_reminder_label.setText(
                 f"最近提醒:\n{next_reminder.task}\n{next_reminder.scheduled_time.strftime('%H:%M')}"
             )
             
             # 更新主倒计时（显示最近提醒的倒计时）
-            time_remaining = next_reminder.format_time_remaining() if hasattr(next_reminder, 'format_time_remaining') else None
+            time_remaining = next_reminder.format_time_remaining()
             if time_remaining and time_remaining != "已到期":
                 self.countdown_label.setText(time_remaining)
             else:
@@ -507,37 +579,6 @@ class VoiceReminderGUI(QMainWindow):
         else:
             self.current_reminder_label.setText("暂无提醒")
             self.countdown_label.setText("--:--")
-        
-        # 更新提醒列表 - 显示所有活跃提醒的倒计时
-        for i, reminder in enumerate(active_reminders):
-            # 格式化显示文本，包含倒计时
-            time_str = reminder.scheduled_time.strftime('%H:%M')
-            task_str = reminder.task
-            
-            if hasattr(reminder, 'format_time_remaining'):
-                time_remaining = reminder.format_time_remaining()
-                if time_remaining and time_remaining != "已到期":
-                    item_text = f"⏰ {time_str} - {task_str} (剩余: {time_remaining})"
-                else:
-                    item_text = f"🔔 {time_str} - {task_str} (即将到时!)"
-            else:
-                item_text = f"⏰ {time_str} - {task_str}"
-            
-            # 为最近的提醒添加特殊标记
-            if i == 0:
-                item_text = f"📍 {item_text}"
-            
-            item = QListWidgetItem(item_text)
-            
-            # 根据剩余时间设置不同的显示样式
-            if hasattr(reminder, 'time_remaining'):
-                remaining_seconds = reminder.time_remaining().total_seconds()
-                if remaining_seconds <= 60:  # 1分钟内
-                    item.setBackground(QColor(255, 235, 235))  # 浅红色背景
-                elif remaining_seconds <= 300:  # 5分钟内
-                    item.setBackground(QColor(255, 248, 220))  # 浅黄色背景
-            
-            self.reminder_list.addItem(item)
     
     def show_notification(self, title: str, message: str):
         """显示系统通知"""
@@ -571,16 +612,28 @@ class VoiceReminderGUI(QMainWindow):
             self.logger.error(f"显示非阻塞通知失败: {e}")
     
     def add_log_message(self, message: str):
-        """添加日志消息 - 后进先出（LIFO）顺序"""
+        """添加日志消息 - 按时间顺序追加到末尾"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        log_text = f"[{timestamp}] {message}"
-        # 将新消息插入到顶部
-        cursor = self.message_area.textCursor()
-        cursor.movePosition(cursor.Start)
-        cursor.insertText(log_text + "\n")
-        # 保持光标在顶部
-        cursor.movePosition(cursor.Start)
-        self.message_area.setTextCursor(cursor)
+        self._queue_log_line(f"[{timestamp}] {message}")
+    
+    def _queue_log_line(self, text: str):
+        """排队一行消息/日志，在下一帧统一追加(Qt线程)"""
+        self._pending_log_lines.append(text.rstrip("\n"))
+        if not self._log_timer.isActive():
+            self._log_timer.start()
+    
+    def _flush_log_lines(self):
+        """一次追加本帧的所有行；原本停在末尾时保持显示最新内容"""
+        if not self._pending_log_lines:
+            return
+        lines = list(self._pending_log_lines)
+        self._pending_log_lines.clear()
+        
+        scroll_bar = self.message_area.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+        self.message_area.appendPlainText("\n".join(lines))
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
     
     def closeEvent(self, event):
         """窗口关闭事件"""
@@ -596,13 +649,68 @@ class VoiceReminderGUI(QMainWindow):
         else:
             event.ignore()
 
+class GUIUpdateBus(QObject):
+    """界面更新总线
+    
+    Qt控件只能在Qt线程中修改。任意线程(语音处理、Web消息处理、定时器)通过
+    post 排队界面更新，总线用一个排队信号把它们转到Qt线程依次执行。同一个key
+    的更新在执行之前只保留最后一次(如连续多次重置欢迎界面只执行一次)，
+    不带key的更新(如追加消息)全部按顺序执行。
+    """
+    
+    updates_pending = pyqtSignal()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._updates: "OrderedDict[object, Callable[[], None]]" = OrderedDict()
+        self._sequence = itertools.count()
+        self._scheduled = False
+        self.coalesced_count = 0  # 被合并掉的更新数
+        self.updates_pending.connect(self._run_updates, Qt.QueuedConnection)
+    
+    def post(self, update: Callable[[], None], key: Optional[str] = None):
+        """排队界面更新(可在任意线程调用)
+        
+        相同key的更新会替换之前未执行的那一次，并按最新的提交顺序执行
+        """
+        with self._lock:
+            if key is None:
+                key = next(self._sequence)
+            elif key in self._updates:
+                del self._updates[key]
+                self.coalesced_count += 1
+            self._updates[key] = update
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.updates_pending.emit()
+    
+    def _run_updates(self):
+        """在Qt线程中执行排队的更新"""
+        with self._lock:
+            updates = list(self._updates.values())
+            self._updates.clear()
+            self._scheduled = False
+        for update in updates:
+            try:
+                update()
+            except Exception as e:
+                self.logger.error(f"界面更新失败: {e}")
+
 class GUIController:
-    """GUI控制器类 - 管理Qt5界面"""
+    """GUI控制器类 - 管理Qt5界面
+    
+    除 show/run 外的方法都可以在任意线程调用：界面修改经由 GUIUpdateBus 转到
+    Qt线程执行；提醒列表的增量由主界面自己排队并按帧合并。
+    """
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.app = None
         self.main_window = None
+        self.update_bus = None
         
         # 初始化Qt应用
         self._init_qt_app()
@@ -621,8 +729,14 @@ class GUIController:
         self.app.setApplicationName(GUI_CONFIG['WINDOW_TITLE'])
         self.app.setQuitOnLastWindowClosed(True)
         
-        # 创建主窗口
+        # 创建主窗口和界面更新总线(都属于Qt线程)
         self.main_window = VoiceReminderGUI()
+        self.update_bus = GUIUpdateBus(self.main_window)
+    
+    def _post(self, update: Callable[[], None], key: Optional[str] = None):
+        """把界面更新排队到Qt线程"""
+        if self.main_window:
+            self.update_bus.post(update, key)
     
     def set_callbacks(self, record_callback: Callable, clear_callback: Callable):
         """设置回调函数"""
@@ -639,37 +753,45 @@ class GUIController:
         if self.app:
             return self.app.exec_()
     
+    def call_when_ready(self, callback: Callable[[], None]):
+        """主循环开始处理事件后在Qt线程调用 callback(只调用一次)"""
+        self._post(callback)
+    
+    # 欢迎/录音/处理界面同时设置状态文字和按钮状态，只有最后一次有意义，共用一个key
     def show_welcome_screen(self):
         """显示欢迎界面"""
-        if self.main_window:
-            self.main_window.show_welcome_screen()
+        self._post(lambda: self.main_window.show_welcome_screen(), key='screen')
     
     def show_listening_screen(self):
         """显示录音界面"""
-        if self.main_window:
-            self.main_window.show_listening_screen()
+        self._post(lambda: self.main_window.show_listening_screen(), key='screen')
     
     def show_processing_screen(self):
         """显示处理界面"""
-        if self.main_window:
-            self.main_window.show_processing_screen()
+        self._post(lambda: self.main_window.show_processing_screen(), key='screen')
     
     def show_reminder_screen(self, reminder_data: Dict[str, Any]):
         """显示提醒界面"""
-        if self.main_window:
-            self.main_window.show_reminder_screen(reminder_data)
+        self._post(lambda: self.main_window.show_reminder_screen(reminder_data), key='status')
+    
+    def set_status(self, text: str):
+        """设置状态文字"""
+        self._post(lambda: self.main_window.status_label.setText(text), key='status')
     
     def show_message_screen(self, message: str, sender: str):
-        """显示消息界面"""
-        if self.main_window:
-            self.main_window.show_message_screen(message, sender)
+        """显示消息界面 - 每条消息都会显示，不合并"""
+        self._post(lambda: self.main_window.show_message_screen(message, sender))
     
     def update_reminder_list(self, reminders: list):
         """更新提醒列表"""
         if self.main_window:
             self.main_window.update_reminder_list(reminders)
     
+    def apply_reminder_changes(self, changes: list):
+        """应用提醒增量 - 排队到Qt线程，按帧合并"""
+        if self.main_window:
+            self.main_window.queue_reminder_changes(changes)
+    
     def add_log_message(self, message: str):
         """添加日志消息"""
-        if self.main_window:
-            self.main_window.add_log_message(message)
\ No newline at end of file
+        self._post(lambda: self.main_window.add_log_message(message))
\ No newline at end of file
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+多家庭模块 - 一个进程同时为多个家庭提供提醒、消息和语音播报服务
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from config import HOUSEHOLD_CONFIG, WEB_CONFIG
+from src.event_stream import EventBroadcaster
+from src.message_ingest import MessageIngestQueue
+from src.message_store import MessageStore
+from src.rate_limit import TokenBucketLimiter, DuplicateFilter
+from src.reminder import ReminderManager
+
+DEFAULT_HOUSEHOLD = 'default'
+
+# 家庭ID出现在URL和数据库文件名中，只允许小写字母、数字、下划线和连字符
+HOUSEHOLD_ID_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_-]{0,31}$')
+
+class Household:
+    """一个家庭的全部服务状态
+
+    提醒、消息历史、推送连接、消息处理队列、限流记录和语音输出目标都属于
+    单个家庭，家庭之间互不可见。本机默认家庭由主程序注入提醒管理器和回调；
+    其他家庭按 HOUSEHOLD_CONFIG 的上限创建，提醒由 HouseholdRegistry 的共享
+    调度线程驱动，播报通过 voice_output 发送到该家庭的设备。
+    """
+
+    def __init__(self, household_id: str, message_callback: Optional[Callable] = None,
+                 message_store: Optional[MessageStore] = None,
+                 reminder_manager: Optional[ReminderManager] = None,
+                 voice_output: Optional[Callable[[str], None]] = None,
+                 limits: Optional[Dict] = None,
+                 voice_interrupt: Optional[Callable[[], None]] = None):
+        """
+        voice_output: 该家庭的语音输出目标 voice_output(text)，用于到期提醒和
+                      远程添加提醒的播报；应尽快返回(如放入设备的发送队列)
+        voice_interrupt: 立即停止该家庭设备上正在进行的提醒播报；提供时更高优先级的
+                      提醒可以打断当前播报，不提供时当前播报照常播完，不会重复播报
+        limits:       资源上限，默认家庭传入 None 沿用单机配置
+        """
+        self.logger = logging.getLogger(__name__)
+        self.id = household_id
+        self.limits = limits or {}
+        self.created_time = datetime.now()
+
+        # 消息限流(按发送者和IP)与重复消息过滤
+        self.rate_limiter = TokenBucketLimiter(max_keys=self.limits.get('RATE_LIMIT_KEYS', 1024))
+        self.duplicate_filter = DuplicateFilter()
+
+        self.message_store = message_store if message_store is not None else MessageStore(
+            capacity=self.limits.get('MESSAGE_HISTORY_SIZE'), db_path=self._message_db_path())
+
+        self.events = EventBroadcaster(max_clients=self.limits.get('EVENT_MAX_CLIENTS'),
+                                       replay_size=self.limits.get('EVENT_REPLAY_SIZE'))
+
+        # 没有注入提醒管理器时自建一个，不启动独立监控线程
+        self._owns_reminder_manager = reminder_manager is None and limits is not None
+        if self._owns_reminder_manager:
+            reminder_manager = ReminderManager(
+                voice_callback=voice_output,
+                display_callback=self.publish_reminder_changes,
+                interrupt_callback=voice_interrupt,
+                max_reminders=self.limits.get('MAX_REMINDERS'),
+                start_monitor=False
+            )
+        self.reminder_manager = reminder_manager
+        self.intent_parser: Optional[Callable[[str], Optional[dict]]] = None  # 文字 -> {'task', 'time'}
+        self.announce_callback: Optional[Callable[[str], None]] = voice_output  # 非阻塞语音播报
+        self.audio_stats: Optional[Callable[[], dict]] = None  # 语音输出队列统计
+
+        self.ingest_queue = MessageIngestQueue(
+            message_callback,
+            max_pending=self.limits.get('INGEST_QUEUE_SIZE'),
+            max_results=self.limits.get('INGEST_RESULT_HISTORY'),
+            on_update=lambda job: self.events.publish('message', job)
+        ) if message_callback else None
+
+    def _message_db_path(self) -> Optional[str]:
+        if not self.limits:
+            return WEB_CONFIG['MESSAGE_DB']
+        directory = self.limits.get('MESSAGE_DB_DIR')
+        return os.path.join(directory, f"{self.id}.db") if directory else None
+
+    @property
+    def owns_reminder_manager(self) -> bool:
+        """提醒管理器是否由本家庭创建(由共享调度线程驱动)"""
+        return self._owns_reminder_manager
+
+    def build_snapshot(self) -> dict:
+        """推送连接的初始完整状态"""
+        reminders = []
+        if self.reminder_manager:
+            try:
+                reminders = [r.to_dict() for r in self.reminder_manager.get_active_reminders()]
+            except Exception as e:
+                self.logger.error(f"获取提醒快照失败: {e}")
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'message_count': len(self.message_store),
+            'reminders': reminders
+        }
+
+    def publish_reminder_changes(self, changes: list):
+        """推送提醒增量 - 倒计时刷新不推送，由网页根据提醒时间自行计算"""
+        items = [{'change': c.change_type.value, 'reminder': c.reminder.to_dict()}
+                 for c in changes if c.reminder is not None]
+        if items:
+            self.events.publish('reminders', {'changes': items})
+
+    def status(self) -> dict:
+        """家庭的资源占用情况"""
+        return {
+            'household': self.id,
+            'message_count': len(self.message_store),
+            'pending_messages': self.ingest_queue.pending_count() if self.ingest_queue else 0,
+            'event_clients': self.events.client_count(),
+            'active_reminders': len(self.reminder_manager.get_active_reminders()) if self.reminder_manager else 0,
+            **({'audio_output': self.audio_stats()} if self.audio_stats else {})
+        }
+
+    def shutdown(self):
+        """关闭家庭 - 断开推送连接，停止消息处理和自建的提醒管理器"""
+        self.events.close()
+        if self.ingest_queue:
+            self.ingest_queue.shutdown()
+        if self._owns_reminder_manager:
+            self.reminder_manager.shutdown()
+        self.message_store.close()
+
+class HouseholdRegistry:
+    """家庭注册表
+
+    按ID查找家庭，限制家庭总数。所有自建提醒管理器的家庭共用一个调度线程：
+    每隔 SCHEDULER_INTERVAL 秒只检查堆顶已到期的家庭，定期清理已完成的提醒，
+    家庭数量增加时线程数不变。
+    """
+
+    def __init__(self, max_households: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_households = max_households or HOUSEHOLD_CONFIG['MAX_HOUSEHOLDS']
+
+        self._lock = threading.Lock()
+        self._households: Dict[str, Household] = {}
+        self._scheduled: Dict[str, Household] = {}  # 由共享调度线程驱动的家庭
+
+        self._running = True
+        self._wakeup = threading.Event()
+        self._scheduler = threading.Thread(target=self._run_scheduler, name="household-scheduler", daemon=True)
+        self._scheduler.start()
+
+    def add(self, household: Household) -> bool:
+        """登记家庭，ID已存在或数量超过上限时返回False"""
+        with self._lock:
+            if household.id in self._households:
+                self.logger.warning(f"家庭已存在: {household.id}")
+                return False
+            # 默认家庭不计入上限
+            tenants = len(self._households) - (DEFAULT_HOUSEHOLD in self._households)
+            if household.id != DEFAULT_HOUSEHOLD and tenants >= self.max_households:
+                self.logger.warning(f"家庭数量超过上限({self.max_households})，拒绝 {household.id}")
+                return False
+            self._households[household.id] = household
+            if household.owns_reminder_manager:
+                self._scheduled[household.id] = household
+        return True
+
+    def create(self, household_id: str, message_callback: Optional[Callable] = None,
+               voice_output: Optional[Callable[[str], None]] = None,
+               limits: Optional[Dict] = None,
+               voice_interrupt: Optional[Callable[[], None]] = None) -> Optional[Household]:
+        """按 HOUSEHOLD_CONFIG 的上限创建并登记家庭，ID无效、已存在或数量超限时返回None"""
+        if not HOUSEHOLD_ID_PATTERN.match(household_id or '') or household_id == DEFAULT_HOUSEHOLD:
+            self.logger.warning(f"家庭ID无效: {household_id!r}")
+            return None
+        with self._lock:
+            if household_id in self._households:
+                self.logger.warning(f"家庭已存在: {household_id}")
+                return None
+        household = Household(household_id, message_callback=message_callback, voice_output=voice_output,
+                              limits=dict(HOUSEHOLD_CONFIG, **(limits or {})), voice_interrupt=voice_interrupt)
+        if not self.add(household):
+            household.shutdown()
+            return None
+        self.logger.info(f"家庭已创建: {household_id}")
+        return household
+
+    def get(self, household_id: str) -> Optional[Household]:
+        return self._households.get(household_id)
+
+    def remove(self, household_id: str) -> bool:
+        """移除并关闭家庭"""
+        with self._lock:
+            household = self._households.pop(household_id, None)
+            self._scheduled.pop(household_id, None)
+        if household is None:
+            return False
+        household.shutdown()
+        self.logger.info(f"家庭已移除: {household_id}")
+        return True
+
+    def all(self) -> List[Household]:
+        return list(self._households.values())
+
+    def __len__(self) -> int:
+        return len(self._households)
+
+    def shutdown(self):
+        """关闭所有家庭和共享调度线程"""
+        self._running = False
+        self._wakeup.set()
+        self._scheduler.join(timeout=2)
+        with self._lock:
+            households = list(self._households.values())
+            self._households.clear()
+            self._scheduled.clear()
+        for household in households:
+            try:
+                household.shutdown()
+            except Exception as e:
+                self.logger.error(f"关闭家庭 {household.id} 失败: {e}")
+
+    def _run_scheduler(self):
+        """共享调度线程主循环"""
+        last_cleanup = time.monotonic()
+        while self._running:
+            try:
+                cleanup = time.monotonic() - last_cleanup >= HOUSEHOLD_CONFIG['CLEANUP_INTERVAL']
+                if cleanup:
+                    last_cleanup = time.monotonic()
+
+                for household in list(self._scheduled.values()):
+                    manager = household.reminder_manager
+                    try:
+                        next_due = manager.get_next_due_time()
+                        if next_due is not None and next_due <= manager.clock():
+                            manager.check_and_trigger_due_reminders()
+                        if cleanup:
+                            manager.clear_completed_reminders()
+                    except Exception as e:
+                        self.logger.error(f"家庭 {household.id} 提醒调度异常: {e}")
+            except Exception as e:
+                self.logger.error(f"共享调度线程异常: {e}")
+            self._wakeup.wait(HOUSEHOLD_CONFIG['SCHEDULER_INTERVAL'])
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+消息接收队列模块 - 家庭消息的异步处理
+"""
+
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from config import WEB_CONFIG
+
+class MessageIngestQueue:
+    """消息接收队列
+
+    Web请求只负责把消息放入有界队列并立即返回，后台工作线程依次调用消息处理
+    回调(意图解析、添加提醒、语音播报)。每条消息的处理状态和结果按消息ID保存，
+    供 /api/messages/<id> 查询；状态每次变化时调用 on_update 推送给网页。
+    """
+
+    STATUS_QUEUED = 'queued'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    def __init__(self, handler: Callable[[str, str], Optional[Dict]],
+                 workers: int = None, max_pending: int = None, max_results: int = None,
+                 on_update: Optional[Callable[[Dict], None]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.handler = handler      # handler(message, sender) -> 处理结果字典
+        self.on_update = on_update  # on_update(job) - 处理状态变化通知
+        self.max_results = max_results or WEB_CONFIG['INGEST_RESULT_HISTORY']
+
+        self._queue = queue.Queue(maxsize=max_pending or WEB_CONFIG['INGEST_QUEUE_SIZE'])
+        self._jobs: "OrderedDict[int, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()  # 关闭后不再接收和处理消息
+
+        # 工作线程在第一条消息到达时才启动，没有消息的家庭不占用线程
+        self._worker_count = workers or WEB_CONFIG['INGEST_WORKERS']
+        self._workers = []
+
+    def submit(self, message_id: int, message: str, sender: str) -> Optional[Dict]:
+        """提交消息，队列已满或已关闭时返回None"""
+        job = {
+            'id': message_id,
+            'status': self.STATUS_QUEUED,
+            'submitted_at': datetime.now().isoformat(),
+            'completed_at': None,
+            'result': None,
+            'error': None
+        }
+        with self._lock:
+            if self._stopped.is_set():
+                return None
+            if not self._workers:
+                for n in range(self._worker_count):
+                    worker = threading.Thread(target=self._run, name=f"message-ingest-{n}", daemon=True)
+                    worker.start()
+                    self._workers.append(worker)
+            self._jobs[message_id] = job
+            # 只保留最近的处理记录
+            while len(self._jobs) > self.max_results:
+                self._jobs.popitem(last=False)
+        try:
+            self._queue.put_nowait((message_id, message, sender))
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(message_id, None)
+            self.logger.warning(f"消息队列已满，拒绝消息 {message_id}")
+            return None
+        self._notify(dict(job))
+        return dict(job)
+
+    def get(self, message_id: int) -> Optional[Dict]:
+        """获取消息处理状态"""
+        with self._lock:
+            job = self._jobs.get(message_id)
+            return dict(job) if job else None
+
+    def pending_count(self) -> int:
+        """排队中的消息数量"""
+        return self._queue.qsize()
+
+    def shutdown(self):
+        """停止工作线程 - 不等待排队的消息，它们标记为失败；正在处理的消息完成后线程退出"""
+        with self._lock:
+            self._stopped.set()
+        while True:
+            try:
+                message_id, _, _ = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._abandon(message_id)
+            self._queue.task_done()
+        for _ in self._workers:
+            try:
+                self._queue.put_nowait((None, None, None))
+            except queue.Full:
+                break  # 工作线程取下一条消息时会检查停止标志
+
+    def _abandon(self, message_id: int):
+        """关闭时未处理的消息标记为失败"""
+        self._update(message_id, status=self.STATUS_FAILED, error="消息服务已停止",
+                     completed_at=datetime.now().isoformat())
+
+    def _update(self, message_id: int, **fields):
+        with self._lock:
+            job = self._jobs.get(message_id)
+            if not job:
+                return
+            job.update(fields)
+            job = dict(job)
+        self._notify(job)
+
+    def _notify(self, job: Dict):
+        if self.on_update:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                self.logger.error(f"消息状态通知失败: {e}")
+
+    def _run(self):
+        """工作线程主循环"""
+        while True:
+            message_id, message, sender = self._queue.get()
+            if message_id is None:
+                return
+            if self._stopped.is_set():
+                self._abandon(message_id)
+                self._queue.task_done()
+                return
+            self._update(message_id, status=self.STATUS_PROCESSING)
+            try:
+                result = self.handler(message, sender)
+                self._update(message_id, status=self.STATUS_DONE, result=result,
+                             completed_at=datetime.now().isoformat())
+            except Exception as e:
+                self.logger.error(f"消息 {message_id} 处理失败: {e}")
+                self._update(message_id, status=self.STATUS_FAILED, error=str(e),
+                             completed_at=datetime.now().isoformat())
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+消息历史存储模块 - 定长环形缓冲区，可选SQLite持久化
+"""
+
+import bisect
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from config import WEB_CONFIG
+
+class MessageStore:
+    """家庭消息历史
+
+    内存中只保留最近 capacity 条消息，消息ID单调递增、永不复用(持久化时
+    重启后继续递增)。每次写入都会改变 version，用于生成ETag，客户端可据此
+    跳过未变化的查询。
+    """
+
+    def __init__(self, capacity: int = None, db_path: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.capacity = capacity or WEB_CONFIG['MESSAGE_HISTORY_SIZE']
+
+        self._lock = threading.Lock()
+        self._messages = deque(maxlen=self.capacity)
+        self._ids = deque(maxlen=self.capacity)  # 与 _messages 一一对应，用于二分查找
+        self._last_id = 0
+        self.version = 0
+        self._instance = uuid.uuid4().hex[:8]  # 区分进程实例，重启后version从0开始也不会与旧ETag冲突
+
+        self._db = None
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str):
+        """打开数据库并载入最近的消息，失败时只使用内存存储"""
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, sender TEXT NOT NULL, message TEXT NOT NULL, timestamp TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+            rows = self._db.execute(
+                "SELECT id, sender, message, timestamp FROM messages ORDER BY id DESC LIMIT ?",
+                (self.capacity,)
+            ).fetchall()
+            for message_id, sender, message, timestamp in reversed(rows):
+                self._messages.append({'message': message, 'sender': sender,
+                                       'timestamp': timestamp, 'id': message_id})
+                self._ids.append(message_id)
+            # AUTOINCREMENT 记录了历史最大ID，清空历史后重启也不会复用
+            sequence = self._db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'messages'").fetchone()
+            self._last_id = sequence[0] if sequence else 0
+            self.logger.info(f"已载入 {len(rows)} 条历史消息")
+        except sqlite3.Error as e:
+            self.logger.error(f"打开消息数据库失败，历史消息将不会保存: {e}")
+            self._db = None
+
+    def reserve_id(self) -> int:
+        """分配新的消息ID"""
+        with self._lock:
+            self._last_id += 1
+            return self._last_id
+
+    def add(self, message_data: Dict):
+        """保存消息，message_data 必须包含 reserve_id() 分配的 id"""
+        message_id = message_data['id']
+        with self._lock:
+            if not self._ids or self._ids[-1] < message_id:
+                self._messages.append(message_data)
+                self._ids.append(message_id)
+            else:
+                # 并发请求可能乱序写入，按ID插入到正确位置
+                position = bisect.bisect_left(self._ids, message_id)
+                if len(self._ids) == self.capacity:
+                    if position == 0:
+                        return
+                    self._messages.popleft()
+                    self._ids.popleft()
+                    position -= 1
+                self._messages.insert(position, message_data)
+                self._ids.insert(position, message_id)
+            self.version += 1
+
+            if self._db:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO messages (id, sender, message, timestamp) VALUES (?, ?, ?, ?)",
+                        (message_id, message_data['sender'], message_data['message'], message_data['timestamp'])
+                    )
+                    self._db.execute("DELETE FROM messages WHERE id <= ?", (message_id - self.capacity,))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    self.logger.error(f"保存消息失败: {e}")
+
+    def page(self, since_id: Optional[int] = None, before_id: Optional[int] = None,
+             limit: int = 10) -> Tuple[List[Dict], bool]:
+        """按游标分页查询，消息按ID升序返回
+
+        since_id  - 返回ID大于since_id的最早limit条(增量获取)
+        before_id - 返回ID小于before_id的最近limit条(向前翻页)
+        都不指定时返回最近limit条。第二个返回值表示游标方向上是否还有更多消息。
+        """
+        with self._lock:
+            messages = list(self._messages)
+            ids = list(self._ids)
+
+        if since_id is not None:
+            start = bisect.bisect_right(ids, since_id)
+            end = len(ids)
+            if before_id is not None:
+                end = bisect.bisect_left(ids, before_id)
+            result = messages[start:min(end, start + limit)]
+            return result, start + limit < end
+
+        end = len(ids) if before_id is None else bisect.bisect_left(ids, before_id)
+        start = max(0, end - limit)
+        return messages[start:end], start > 0
+
+    def get(self, message_id: int) -> Optional[Dict]:
+        with self._lock:
+            position = bisect.bisect_left(self._ids, message_id)
+            if position < len(self._ids) and self._ids[position] == message_id:
+                return self._messages[position]
+        return None
+
+    def latest(self, limit: int = 10) -> List[Dict]:
+        """最近limit条消息"""
+        return self.page(limit=limit)[0]
+
+    def etag(self, *query) -> str:
+        """当前内容与查询参数对应的ETag"""
+        parts = [self._instance, str(self.version)] + [str(q) for q in query]
+        return "-".join(parts)
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def clear(self):
+        """清空历史(消息ID继续递增)"""
+        with self._lock:
+            self._messages.clear()
+            self._ids.clear()
+            self.version += 1
+            if self._db:
+                try:
+                    self._db.execute("DELETE FROM messages")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    self.logger.error(f"清空消息数据库失败: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._db:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+限流模块 - 家庭消息接口的令牌桶限流和重复消息过滤
+"""
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from config import WEB_CONFIG
+
+class TokenBucketLimiter:
+    """按键(发送者、IP)的令牌桶限流
+
+    每个键的令牌以 rate 个/秒恢复，最多积累 burst 个。只记录最近活跃的
+    max_keys 个键，长时间不活跃的键令牌已满，淘汰后重新创建没有区别。
+    """
+
+    def __init__(self, rate: float = None, burst: int = None, max_keys: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate if rate is not None else WEB_CONFIG['RATE_LIMIT_PER_MINUTE'] / 60.0
+        self.burst = burst or WEB_CONFIG['RATE_LIMIT_BURST']
+        self.max_keys = max_keys
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # 键 -> [令牌数, 上次更新时间]
+
+    def _refill(self, key: str, now: float) -> list:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(self.burst), now]
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def acquire(self, keys: Iterable[str], cost: int = 1) -> float:
+        """所有键都有 cost 个令牌时各扣除 cost 个并返回0，否则不扣除并返回需要等待的秒数
+
+        cost 不能超过 burst，否则永远无法满足。
+        """
+        now = self.clock()
+        with self._lock:
+            buckets = [self._refill(key, now) for key in keys]
+            shortest = [(cost - tokens) / self.rate for tokens, _ in buckets if tokens < cost]
+            if shortest:
+                return max(shortest)
+            for bucket in buckets:
+                bucket[0] -= cost
+            return 0.0
+
+class DuplicateFilter:
+    """短时间窗口内的重复消息过滤
+
+    消息文本规范化(全半角、大小写、空白和标点)后取哈希，窗口内再次收到
+    相同内容时返回第一次的消息ID，不再进入语音播报流程。
+    """
+
+    _IGNORED = re.compile(r'[\s\W_]+', re.UNICODE)
+
+    def __init__(self, window: float = None, clock: Callable[[], float] = time.monotonic):
+        self.window = window if window is not None else WEB_CONFIG['DEDUP_WINDOW']
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._seen: "OrderedDict[str, tuple]" = OrderedDict()  # 哈希 -> (消息ID, 过期时间)，按过期时间排序
+
+    @classmethod
+    def fingerprint(cls, text: str) -> str:
+        normalized = cls._IGNORED.sub('', unicodedata.normalize('NFKC', text).lower())
+        return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+    def claim(self, text: str, message_id: int) -> Optional[int]:
+        """登记消息；窗口内已有相同消息时返回其ID，否则返回None"""
+        key = self.fingerprint(text)
+        now = self.clock()
+        with self._lock:
+            while self._seen:
+                oldest_key, (_, expires) = next(iter(self._seen.items()))
+                if expires > now:
+                    break
+                del self._seen[oldest_key]
+
+            if key in self._seen:
+                return self._seen[key][0]
+            self._seen[key] = (message_id, now + self.window)
+            return None
+
+    def forget(self, text: str):
+        """撤销登记(消息最终未被接收时)"""
+        with self._lock:
+            self._seen.pop(self.fingerprint(text), None)
@@ -5,19 +5,69 @@
 
 import threading
 import time
+import heapq
+import itertools
 import logging
+from collections import deque
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Callable
-from dataclasses import dataclass
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.date import DateTrigger
+from typing import List, Dict, Optional, Callable, Tuple
+from dataclasses import dataclass, field, replace
+from enum import Enum
 import uuid
 
-from config import REMINDER_CONFIG
+from config import REMINDER_CONFIG, ANNOUNCE_CONFIG
+from src.announcer import AnnouncementScheduler
 
-@dataclass
+# 重复提醒的周期，触发后自动创建下一次提醒
+RECURRENCE_INTERVALS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+
+def format_remaining(seconds: float) -> str:
+    """格式化剩余秒数 - 一小时以上精确到分钟，一小时以内精确到秒"""
+    if seconds <= 0:
+        return "已到期"
+    
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    
+    if hours > 0:
+        return f"{hours}小时{minutes}分钟"
+    elif minutes > 0:
+        return f"{minutes}分钟{seconds}秒"
+    else:
+        return f"{seconds}秒"
+
+class ReminderCategory(Enum):
+    """提醒类别 - 决定播报优先级"""
+    MEDICAL = "medical"          # 用药、测量等健康相关
+    APPOINTMENT = "appointment"  # 就诊、约会等有固定时间的安排
+    CHORE = "chore"              # 日常事务
+    
+    @property
+    def priority(self) -> int:
+        """播报优先级，数值越大越优先"""
+        return {ReminderCategory.MEDICAL: 2,
+                ReminderCategory.APPOINTMENT: 1,
+                ReminderCategory.CHORE: 0}[self]
+    
+    @property
+    def escalates(self) -> bool:
+        """未确认时是否需要重复播报"""
+        return self is ReminderCategory.MEDICAL
+    
+    @classmethod
+    def classify(cls, task: str) -> 'ReminderCategory':
+        """根据任务内容中的关键词判断类别"""
+        for category in (cls.MEDICAL, cls.APPOINTMENT):
+            if any(keyword in task for keyword in ANNOUNCE_CONFIG['CATEGORY_KEYWORDS'][category.value]):
+                return category
+        return cls.CHORE
+
+@dataclass(frozen=True)
 class Reminder:
-    """提醒数据类"""
+    """提醒数据类 - 不可变对象，修改时由管理器生成新实例"""
     id: str
     task: str
     scheduled_time: datetime
@@ -25,64 +75,247 @@ class Reminder:
     is_active: bool = True
     is_completed: bool = False
     original_text: str = ""
+    category: Optional[ReminderCategory] = None
+    recurrence: Optional[str] = None  # 重复周期，见 RECURRENCE_INTERVALS
+    clock: Callable[[], datetime] = field(default=datetime.now, repr=False, compare=False)  # 时间源，测试时可注入模拟时钟
     
     def __post_init__(self):
         if not self.id:
-            self.id = str(uuid.uuid4())
+            object.__setattr__(self, 'id', str(uuid.uuid4()))
+        if self.category is None:
+            object.__setattr__(self, 'category', ReminderCategory.classify(self.task))
     
     def time_remaining(self) -> timedelta:
         """获取剩余时间"""
         if self.is_completed or not self.is_active:
             return timedelta(0)
-        return max(self.scheduled_time - datetime.now(), timedelta(0))
+        return max(self.scheduled_time - self.clock(), timedelta(0))
     
     def is_due(self) -> bool:
         """检查是否到期"""
-        return datetime.now() >= self.scheduled_time and self.is_active and not self.is_completed
+        return self.clock() >= self.scheduled_time and self.is_active and not self.is_completed
     
     def format_time_remaining(self) -> str:
         """格式化剩余时间显示"""
-        remaining = self.time_remaining()
-        if remaining.total_seconds() <= 0:
-            return "已到期"
-        
-        hours, remainder = divmod(int(remaining.total_seconds()), 3600)
-        minutes, seconds = divmod(remainder, 60)
+        return format_remaining(self.time_remaining().total_seconds())
+    
+    def to_dict(self, with_countdown: bool = True) -> Dict:
+        """转换为可JSON序列化的字典
         
-        if hours > 0:
-            return f"{hours}小时{minutes}分钟"
-        elif minutes > 0:
-            return f"{minutes}分钟{seconds}秒"
-        else:
-            return f"{seconds}秒"
+        with_countdown 为False时不包含随时间变化的剩余时间，内容只随提醒本身变化
+        """
+        data = {
+            'id': self.id,
+            'task': self.task,
+            'scheduled_time': self.scheduled_time.isoformat(),
+            'created_time': self.created_time.isoformat(),
+            'is_active': self.is_active,
+            'is_completed': self.is_completed,
+            'category': self.category.value,
+            'original_text': self.original_text,
+            'recurrence': self.recurrence
+        }
+        if with_countdown:
+            data['time_remaining'] = self.format_time_remaining()
+        return data
+
+class ChangeType(Enum):
+    """提醒变更类型"""
+    ADDED = "added"        # 新增提醒
+    REMOVED = "removed"    # 提醒被移除
+    UPDATED = "updated"    # 提醒状态或时间变化(触发、取消、延迟)
+    TICK = "tick"          # 倒计时刷新，不携带提醒
+    ACKNOWLEDGED = "acknowledged"  # 老人已确认到期提醒(提醒本身不变)
+
+@dataclass(frozen=True)
+class ReminderChange:
+    """提醒变更事件 - 显示回调收到的增量"""
+    change_type: ChangeType
+    reminder: Optional[Reminder] = None
+    
+    @property
+    def reminder_id(self) -> Optional[str]:
+        return self.reminder.id if self.reminder else None
 
 class ReminderManager:
-    """提醒管理器"""
+    """提醒管理器
+
+    并发模型: 所有写操作持有单一写锁 ``_write_lock``，在锁内复制当前快照字典、
+    修改副本后整体发布(写时复制)，已发布的字典不再被修改；读操作直接读取
+    ``_snapshot`` 引用，无需加锁，也不会阻塞写线程。回调(语音播报、显示更新)
+    一律在锁外调用。
+    
+    到期调度: ``_due_heap`` 是按提醒时间排序的小顶堆，添加和延迟只需压入一条
+    新记录(O(log n))，取消或改期后的旧记录在弹出时惰性丢弃。监控线程睡眠到
+    堆顶时间或下一次倒计时刷新，弹出到期记录后触发提醒。
+    """
     
-    def __init__(self, voice_callback: Optional[Callable] = None, display_callback: Optional[Callable] = None):
+    def __init__(self, voice_callback: Optional[Callable] = None, display_callback: Optional[Callable] = None,
+                 interrupt_callback: Optional[Callable] = None, clock: Callable[[], datetime] = datetime.now,
+                 max_reminders: Optional[int] = None, start_monitor: bool = True):
+        """
+        clock: 时间源，默认系统时间；基准测试中注入模拟时钟
+        start_monitor: 为False时不启动监控线程，由调用方驱动 check_and_trigger_due_reminders
+        """
         self.logger = logging.getLogger(__name__)
-        self.reminders: List[Reminder] = []
-        self.scheduler = BackgroundScheduler()
+        self.clock = clock
+        self._write_lock = threading.Lock()
+        self._snapshot: Dict[str, Reminder] = {}  # 提醒ID -> 提醒，按添加顺序
+        self._active_count = 0  # 活跃提醒数量，随提交增量维护
+        self._due_heap: List[tuple] = []   # (提醒时间, 序号, 提醒ID)
+        self._heap_seq = itertools.count()
+        self._wakeup = threading.Event()   # 堆顶变化时唤醒监控线程
+        self._running = True
+        
+        # 数据版本号 - 提醒或确认状态每次变化都会递增，用于Web接口的ETag
+        self._versions = itertools.count(1)
+        self.version = 0
+        
+        # 确认记录: 已播报等待确认的提醒及确认耗时统计
+        self._ack_lock = threading.Lock()
+        self._awaiting_ack: Dict[str, Tuple[Reminder, datetime]] = {}
+        self._ack_records = deque(maxlen=REMINDER_CONFIG['ACK_HISTORY_SIZE'])
+        
         self.voice_callback = voice_callback  # 语音播报回调
         self.display_callback = display_callback  # 显示更新回调
-        self.max_reminders = REMINDER_CONFIG['MAX_REMINDERS']
         
-        # 启动调度器
-        self.scheduler.start()
+        # 到期提醒交给播报调度器按优先级合并播报，避免阻塞调度线程
+        self.announcer = AnnouncementScheduler(voice_callback, interrupt_callback) if voice_callback else None
+        self.max_reminders = max_reminders or REMINDER_CONFIG['MAX_REMINDERS']
         
         # 启动监控线程
-        self.monitor_thread = threading.Thread(target=self._monitor_reminders, daemon=True)
-        self.monitor_thread.start()
+        self.monitor_thread = None
+        if start_monitor:
+            self.monitor_thread = threading.Thread(target=self._monitor_reminders, daemon=True)
+            self.monitor_thread.start()
         
         self.logger.info("提醒管理器初始化完成")
     
-    def add_reminder(self, task: str, scheduled_time: datetime, original_text: str = "") -> str:
+    @property
+    def reminders(self) -> List[Reminder]:
+        """当前快照的列表副本(兼容旧接口)"""
+        return list(self._snapshot.values())
+    
+    def _commit(self, updates: Dict[str, Optional[Reminder]]):
+        """写时复制提交 - 值为None表示删除该提醒；调用方必须持有写锁"""
+        snapshot = dict(self._snapshot)
+        for reminder_id, reminder in updates.items():
+            previous = snapshot.get(reminder_id)
+            if previous is not None and previous.is_active and not previous.is_completed:
+                self._active_count -= 1
+            if reminder is None:
+                snapshot.pop(reminder_id, None)
+            else:
+                snapshot[reminder_id] = reminder
+                if reminder.is_active and not reminder.is_completed:
+                    self._active_count += 1
+        self._snapshot = snapshot
+        self.version = next(self._versions)
+    
+    def _update(self, reminder_id: str, **changes) -> Optional[Reminder]:
+        """以写时复制方式修改单个提醒 - 调用方必须持有写锁"""
+        current = self._snapshot.get(reminder_id)
+        if current is None:
+            return None
+        updated = replace(current, **changes)
+        self._commit({reminder_id: updated})
+        return updated
+    
+    def _schedule(self, reminder: Reminder):
+        """将提醒时间压入到期堆 - 调用方必须持有写锁"""
+        # 取消和改期留下的失效记录过多时整体重建，避免堆无限增长
+        if len(self._due_heap) > 2 * len(self._snapshot) + 64:
+            self._due_heap = [(r.scheduled_time, next(self._heap_seq), r.id)
+                              for r in self._snapshot.values() if r.is_active and not r.is_completed]
+            heapq.heapify(self._due_heap)
+        entry = (reminder.scheduled_time, next(self._heap_seq), reminder.id)
+        heapq.heappush(self._due_heap, entry)
+        if self._due_heap[0] is entry:
+            self._wakeup.set()
+    
+    def _pop_due(self, now: datetime) -> List[Reminder]:
+        """弹出所有到期且仍然有效的提醒 - 调用方必须持有写锁"""
+        due = {}
+        while self._due_heap and self._due_heap[0][0] <= now:
+            scheduled_time, _, reminder_id = heapq.heappop(self._due_heap)
+            reminder = self._snapshot.get(reminder_id)
+            # 时间不一致说明该记录已被延迟操作取代
+            if (reminder and reminder.is_active and not reminder.is_completed
+                    and reminder.scheduled_time == scheduled_time):
+                due[reminder_id] = reminder
+        return list(due.values())
+    
+    def get_next_due_time(self) -> Optional[datetime]:
+        """获取最近一个待触发提醒的时间"""
+        with self._write_lock:
+            return self._due_heap[0][0] if self._due_heap else None
+    
+    def _mark_announced(self, reminders: List[Reminder]):
+        """记录已触发、等待确认的提醒"""
+        triggered_at = self.clock()
+        with self._ack_lock:
+            for reminder in reminders:
+                self._awaiting_ack[reminder.id] = (reminder, triggered_at)
+            self.version = next(self._versions)
+    
+    def _finish_ack(self, reminder_id: str, action: Optional[str]) -> Optional[Reminder]:
+        """结束等待确认状态，action为None时只移除不记录(取消、清除)"""
+        with self._ack_lock:
+            entry = self._awaiting_ack.pop(reminder_id, None)
+            if entry and action:
+                reminder, triggered_at = entry
+                acknowledged_at = self.clock()
+                self._ack_records.append({
+                    'id': reminder.id,
+                    'task': reminder.task,
+                    'category': reminder.category.value,
+                    'action': action,
+                    'triggered_at': triggered_at.isoformat(),
+                    'acknowledged_at': acknowledged_at.isoformat(),
+                    'time_to_ack': round((acknowledged_at - triggered_at).total_seconds(), 3)
+                })
+            if entry:
+                self.version = next(self._versions)
+        # 停止重复播报，正在播报该提醒时立即打断
+        if self.announcer:
+            self.announcer.acknowledge(reminder_id)
+        return entry[0] if entry else None
+    
+    def _notify_display(self, change_type: ChangeType, reminders=()):
+        """通知显示更新 - 以增量事件列表的形式回调"""
+        if self.display_callback:
+            changes = [ReminderChange(change_type, r) for r in reminders] or [ReminderChange(change_type)]
+            self.display_callback(changes)
+    
+    def _next_occurrences(self, triggered: List[Reminder]) -> List[Reminder]:
+        """为已触发的重复提醒生成下一次提醒，跳过已经错过的周期"""
+        now = self.clock()
+        following = []
+        for reminder in triggered:
+            interval = RECURRENCE_INTERVALS.get(reminder.recurrence)
+            if interval is None:
+                continue
+            next_time = reminder.scheduled_time + interval
+            while next_time <= now:
+                next_time += interval
+            following.append(Reminder(
+                id=str(uuid.uuid4()),
+                task=reminder.task,
+                scheduled_time=next_time,
+                created_time=now,
+                original_text=reminder.original_text,
+                category=reminder.category,
+                recurrence=reminder.recurrence,
+                clock=self.clock
+            ))
+        return following
+    
+    def add_reminder(self, task: str, scheduled_time: datetime, original_text: str = "",
+                     recurrence: Optional[str] = None) -> str:
         """添加新提醒"""
         try:
-            # 检查提醒数量限制
-            active_count = len([r for r in self.reminders if r.is_active and not r.is_completed])
-            if active_count >= self.max_reminders:
-                self.logger.warning(f"提醒数量已达上限({self.max_reminders})")
+            if recurrence is not None and recurrence not in RECURRENCE_INTERVALS:
+                self.logger.error(f"不支持的重复周期: {recurrence}")
                 return None
             
             # 创建提醒
@@ -90,27 +323,26 @@ class ReminderManager:
                 id=str(uuid.uuid4()),
                 task=task,
                 scheduled_time=scheduled_time,
-                created_time=datetime.now(),
-                original_text=original_text
+                created_time=self.clock(),
+                original_text=original_text,
+                recurrence=recurrence,
+                clock=self.clock
             )
             
-            # 添加到列表
-            self.reminders.append(reminder)
-            
-            # 添加到调度器
-            self.scheduler.add_job(
-                func=self._trigger_reminder,
-                trigger=DateTrigger(run_date=scheduled_time),
-                args=[reminder.id],
-                id=reminder.id,
-                name=f"提醒: {task}"
-            )
+            with self._write_lock:
+                # 检查提醒数量限制(与添加在同一临界区内，避免并发添加超限)
+                if self._active_count >= self.max_reminders:
+                    self.logger.warning(f"提醒数量已达上限({self.max_reminders})")
+                    return None
+                
+                # 添加到快照和到期堆
+                self._commit({reminder.id: reminder})
+                self._schedule(reminder)
             
             self.logger.info(f"添加提醒成功: {task} at {scheduled_time}")
             
             # 更新显示
-            if self.display_callback:
-                self.display_callback()
+            self._notify_display(ChangeType.ADDED, [reminder])
             
             return reminder.id
             
@@ -118,26 +350,77 @@ class ReminderManager:
             self.logger.error(f"添加提醒失败: {e}")
             return None
     
+    def add_reminders(self, items: List[Dict]) -> Optional[List[str]]:
+        """批量添加提醒 - 全部添加或全部不添加
+        
+        items 中每项包含 task、scheduled_time，可选 original_text、recurrence；
+        成功时返回提醒ID列表(与items顺序一致)，超出数量上限或参数无效时返回None
+        """
+        try:
+            now = self.clock()
+            reminders = []
+            for item in items:
+                recurrence = item.get('recurrence')
+                if not item.get('task') or recurrence not in (None, *RECURRENCE_INTERVALS):
+                    self.logger.error(f"批量添加提醒参数无效: {item}")
+                    return None
+                reminders.append(Reminder(
+                    id=str(uuid.uuid4()),
+                    task=item['task'],
+                    scheduled_time=item['scheduled_time'],
+                    created_time=now,
+                    original_text=item.get('original_text', ""),
+                    recurrence=recurrence,
+                    clock=self.clock
+                ))
+            
+            with self._write_lock:
+                if self._active_count + len(reminders) > self.max_reminders:
+                    self.logger.warning(f"批量添加 {len(reminders)} 个提醒将超过上限({self.max_reminders})")
+                    return None
+                
+                # 一次提交，读者要么看到整批提醒，要么一个都看不到
+                self._commit({r.id: r for r in reminders})
+                for reminder in reminders:
+                    self._schedule(reminder)
+            
+            self.logger.info(f"批量添加提醒成功: {len(reminders)} 个")
+            self._notify_display(ChangeType.ADDED, reminders)
+            
+            return [r.id for r in reminders]
+            
+        except Exception as e:
+            self.logger.error(f"批量添加提醒失败: {e}")
+            return None
+    
     def _trigger_reminder(self, reminder_id: str):
-        """触发单个提醒"""
+        """立即触发单个提醒(不等待到期)"""
         try:
-            reminder = self.get_reminder(reminder_id)
-            if not reminder or not reminder.is_active:
-                return
+            with self._write_lock:
+                reminder = self._snapshot.get(reminder_id)
+                # 监控线程可能已经触发过该提醒，锁内判断保证只播报一次
+                if not reminder or not reminder.is_active or reminder.is_completed:
+                    return
+                
+                # 标记为已完成，堆中的记录在弹出时会被丢弃
+                reminder = self._update(reminder_id, is_completed=True)
+                following = self._next_occurrences([reminder])
+                if following:
+                    self._commit({r.id: r for r in following})
+                    for next_reminder in following:
+                        self._schedule(next_reminder)
             
             self.logger.info(f"触发提醒: {reminder.task}")
-            
-            # 标记为已完成
-            reminder.is_completed = True
+            self._mark_announced([reminder])
             
             # 语音播报
-            if self.voice_callback:
-                message = f"提醒时间到了！{reminder.task}"
-                self.voice_callback(message)
+            if self.announcer:
+                self.announcer.submit([reminder])
             
             # 更新显示
-            if self.display_callback:
-                self.display_callback()
+            self._notify_display(ChangeType.UPDATED, [reminder])
+            if following:
+                self._notify_display(ChangeType.ADDED, following)
             
         except Exception as e:
             self.logger.error(f"触发提醒失败: {e}")
@@ -145,31 +428,32 @@ class ReminderManager:
     def check_and_trigger_due_reminders(self):
         """检查并触发所有到期的提醒 - 支持多个提醒同时触发"""
         try:
-            due_reminders = []
-            for reminder in self.reminders:
-                if reminder.is_due():
-                    due_reminders.append(reminder)
+            with self._write_lock:
+                due_reminders = [replace(r, is_completed=True) for r in self._pop_due(self.clock())]
+                following = self._next_occurrences(due_reminders)
+                if due_reminders:
+                    updates = {r.id: r for r in due_reminders}
+                    updates.update((r.id, r) for r in following)
+                    self._commit(updates)
+                    for next_reminder in following:
+                        self._schedule(next_reminder)
             
             if due_reminders:
                 self.logger.info(f"发现 {len(due_reminders)} 个到期提醒")
                 
                 # 同时处理所有到期的提醒
                 for reminder in due_reminders:
-                    reminder.is_completed = True
                     self.logger.info(f"触发提醒: {reminder.task}")
+                self._mark_announced(due_reminders)
                 
-                # 合并语音播报消息
-                if self.voice_callback and due_reminders:
-                    if len(due_reminders) == 1:
-                        message = f"提醒时间到了！{due_reminders[0].task}"
-                    else:
-                        tasks = "、".join([r.task for r in due_reminders])
-                        message = f"有 {len(due_reminders)} 个提醒时间到了！包括：{tasks}"
-                    self.voice_callback(message)
+                # 语音播报 - 由播报调度器在合并窗口内合并为一条
+                if self.announcer:
+                    self.announcer.submit(due_reminders)
                 
                 # 更新显示
-                if self.display_callback:
-                    self.display_callback()
+                self._notify_display(ChangeType.UPDATED, due_reminders)
+                if following:
+                    self._notify_display(ChangeType.ADDED, following)
                 
                 return len(due_reminders)
             
@@ -181,14 +465,11 @@ class ReminderManager:
     
     def get_reminder(self, reminder_id: str) -> Optional[Reminder]:
         """获取指定提醒"""
-        for reminder in self.reminders:
-            if reminder.id == reminder_id:
-                return reminder
-        return None
+        return self._snapshot.get(reminder_id)
     
     def get_active_reminders(self) -> List[Reminder]:
         """获取所有活跃的提醒"""
-        return [r for r in self.reminders if r.is_active and not r.is_completed]
+        return [r for r in self._snapshot.values() if r.is_active and not r.is_completed]
     
     def get_current_reminder(self) -> Optional[Reminder]:
         """获取当前最近的提醒"""
@@ -196,31 +477,25 @@ class ReminderManager:
         if not active_reminders:
             return None
         
-        # 按时间排序，返回最近的
-        active_reminders.sort(key=lambda r: r.scheduled_time)
-        return active_reminders[0]
+        # 返回时间最近的提醒
+        return min(active_reminders, key=lambda r: r.scheduled_time)
     
     def cancel_reminder(self, reminder_id: str) -> bool:
         """取消提醒"""
         try:
-            reminder = self.get_reminder(reminder_id)
+            with self._write_lock:
+                # 标记为非活跃
+                reminder = self._update(reminder_id, is_active=False)
             if not reminder:
                 return False
             
-            # 标记为非活跃
-            reminder.is_active = False
-            
-            # 从调度器中移除
-            try:
-                self.scheduler.remove_job(reminder_id)
-            except:
-                pass  # 任务可能已经执行完毕
+            # 堆中的记录在弹出时丢弃；已在播报中的立即停止
+            self._finish_ack(reminder_id, None)
             
             self.logger.info(f"取消提醒: {reminder.task}")
             
             # 更新显示
-            if self.display_callback:
-                self.display_callback()
+            self._notify_display(ChangeType.UPDATED, [reminder])
             
             return True
             
@@ -228,40 +503,91 @@ class ReminderManager:
             self.logger.error(f"取消提醒失败: {e}")
             return False
     
+    def update_reminder(self, reminder_id: str, task: Optional[str] = None,
+                        scheduled_time: Optional[datetime] = None) -> Optional[Reminder]:
+        """修改提醒内容或时间 - 修改时间后重新进入待触发状态"""
+        try:
+            changes = {}
+            if task is not None:
+                changes['task'] = task
+                changes['category'] = ReminderCategory.classify(task)
+            if scheduled_time is not None:
+                changes['scheduled_time'] = scheduled_time
+                changes['is_completed'] = False
+            
+            with self._write_lock:
+                reminder = self._update(reminder_id, **changes) if changes else self._snapshot.get(reminder_id)
+                if reminder and scheduled_time is not None and reminder.is_active:
+                    self._schedule(reminder)
+            if not reminder:
+                return None
+            
+            if scheduled_time is not None:
+                # 改期后不再等待确认，也不再重复播报
+                self._finish_ack(reminder_id, None)
+            
+            self.logger.info(f"修改提醒: {reminder.task} at {reminder.scheduled_time}")
+            
+            if changes:
+                self._notify_display(ChangeType.UPDATED, [reminder])
+            
+            return reminder
+            
+        except Exception as e:
+            self.logger.error(f"修改提醒失败: {e}")
+            return None
+    
+    def delete_reminder(self, reminder_id: str) -> bool:
+        """删除提醒"""
+        try:
+            with self._write_lock:
+                reminder = self._snapshot.get(reminder_id)
+                if reminder:
+                    self._commit({reminder_id: None})
+            if not reminder:
+                return False
+            
+            self._finish_ack(reminder_id, None)
+            
+            self.logger.info(f"删除提醒: {reminder.task}")
+            
+            # 更新显示
+            self._notify_display(ChangeType.REMOVED, [reminder])
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"删除提醒失败: {e}")
+            return False
+    
+    def is_awaiting_ack(self, reminder_id: str) -> bool:
+        """提醒是否已播报、等待老人确认"""
+        with self._ack_lock:
+            return reminder_id in self._awaiting_ack
+    
     def snooze_reminder(self, reminder_id: str, minutes: int = None) -> bool:
-        """延迟提醒"""
+        """延迟提醒 - 到期堆中压入新时间即可，O(log n)"""
         try:
             if minutes is None:
                 minutes = REMINDER_CONFIG['DEFAULT_SNOOZE']
             
-            reminder = self.get_reminder(reminder_id)
+            # 计算新时间
+            new_time = self.clock() + timedelta(minutes=minutes)
+            
+            with self._write_lock:
+                reminder = self._update(reminder_id, scheduled_time=new_time, is_completed=False)
+                if reminder:
+                    self._schedule(reminder)
             if not reminder:
                 return False
             
-            # 计算新时间
-            new_time = datetime.now() + timedelta(minutes=minutes)
-            reminder.scheduled_time = new_time
-            reminder.is_completed = False
-            
-            # 重新添加到调度器
-            try:
-                self.scheduler.remove_job(reminder_id)
-            except:
-                pass
-            
-            self.scheduler.add_job(
-                func=self._trigger_reminder,
-                trigger=DateTrigger(run_date=new_time),
-                args=[reminder.id],
-                id=reminder.id,
-                name=f"提醒(延迟): {reminder.task}"
-            )
+            # 正在等待确认的提醒被延迟，记为一次"稍后提醒"响应
+            self._finish_ack(reminder_id, 'snooze')
             
             self.logger.info(f"延迟提醒 {minutes} 分钟: {reminder.task}")
             
             # 更新显示
-            if self.display_callback:
-                self.display_callback()
+            self._notify_display(ChangeType.UPDATED, [reminder])
             
             return True
             
@@ -272,16 +598,16 @@ class ReminderManager:
     def clear_completed_reminders(self):
         """清理已完成的提醒"""
         try:
-            before_count = len(self.reminders)
-            self.reminders = [r for r in self.reminders if not r.is_completed or r.is_active]
-            after_count = len(self.reminders)
+            with self._write_lock:
+                removed = [r for r in self._snapshot.values() if r.is_completed and not r.is_active]
+                if removed:
+                    self._commit({r.id: None for r in removed})
             
-            if before_count != after_count:
-                self.logger.info(f"清理了 {before_count - after_count} 个已完成的提醒")
+            if removed:
+                self.logger.info(f"清理了 {len(removed)} 个已完成的提醒")
                 
                 # 更新显示
-                if self.display_callback:
-                    self.display_callback()
+                self._notify_display(ChangeType.REMOVED, removed)
                     
         except Exception as e:
             self.logger.error(f"清理提醒失败: {e}")
@@ -289,22 +615,24 @@ class ReminderManager:
     def clear_all_reminders(self):
         """清除所有提醒"""
         try:
-            # 停止所有调度任务
-            for reminder in self.reminders:
-                try:
-                    self.scheduler.remove_job(reminder.id)
-                except:
-                    pass
-            
-            # 清空提醒列表
-            reminder_count = len(self.reminders)
-            self.reminders.clear()
-            
+            # 清空提醒快照
+            with self._write_lock:
+                removed = list(self._snapshot.values())
+                self._snapshot = {}
+                self._due_heap = []
+                self._active_count = 0
+                self.version = next(self._versions)
+            
+            # 停止所有等待确认的提醒的播报
+            for reminder in removed:
+                self._finish_ack(reminder.id, None)
+            
+            reminder_count = len(removed)
             self.logger.info(f"已清除所有提醒，共 {reminder_count} 个")
             
             # 更新显示
-            if self.display_callback:
-                self.display_callback()
+            if removed:
+                self._notify_display(ChangeType.REMOVED, removed)
                 
             return True
             
@@ -312,9 +640,48 @@ class ReminderManager:
             self.logger.error(f"清除所有提醒失败: {e}")
             return False
     
+    def acknowledge_reminder(self, reminder_id: Optional[str] = None) -> List[Reminder]:
+        """确认提醒 - 不指定ID时确认所有等待确认的提醒，返回被确认的提醒"""
+        if reminder_id is None:
+            with self._ack_lock:
+                reminder_ids = list(self._awaiting_ack)
+        else:
+            reminder_ids = [reminder_id]
+        
+        acknowledged = []
+        for rid in reminder_ids:
+            reminder = self._finish_ack(rid, 'ack')
+            if reminder:
+                acknowledged.append(reminder)
+                self.logger.info(f"提醒已确认: {reminder.task}")
+        if acknowledged:
+            self._notify_display(ChangeType.ACKNOWLEDGED, acknowledged)
+        return acknowledged
+    
+    def get_awaiting_ack(self) -> List[Reminder]:
+        """获取已触发但尚未确认的提醒"""
+        with self._ack_lock:
+            return [reminder for reminder, _ in self._awaiting_ack.values()]
+    
+    def get_ack_metrics(self) -> Dict:
+        """获取确认耗时统计 - 供家属/护工查看老人对提醒的响应情况"""
+        with self._ack_lock:
+            records = list(self._ack_records)
+            awaiting = len(self._awaiting_ack)
+        
+        times = sorted(r['time_to_ack'] for r in records)
+        return {
+            'count': len(records),
+            'awaiting_ack': awaiting,
+            'avg_time_to_ack': round(sum(times) / len(times), 3) if times else None,
+            'median_time_to_ack': times[len(times) // 2] if times else None,
+            'max_time_to_ack': times[-1] if times else None,
+            'records': records
+        }
+    
     def _monitor_reminders(self):
         """监控提醒状态的后台线程 - 支持多个提醒实时倒计时更新"""
-        while True:
+        while self._running:
             try:
                 # 每分钟清理一次已完成的提醒
                 if hasattr(self, '_last_cleanup_time'):
@@ -324,28 +691,25 @@ class ReminderManager:
                 else:
                     self._last_cleanup_time = time.time()
                 
-                # 检查并触发到期的提醒
-                triggered_count = self.check_and_trigger_due_reminders()
+                # 检查并触发到期的提醒(触发的提醒已作为UPDATED事件通知)
+                self.check_and_trigger_due_reminders()
                 
-                # 实时更新显示 - 每秒更新一次以支持多个倒计时
+                # 实时更新显示 - 倒计时只需一个不携带数据的TICK事件
                 if self.display_callback:
-                    active_reminders = self.get_active_reminders()
-                    if active_reminders or triggered_count > 0:
-                        # 检查是否有任何提醒需要更新显示
-                        needs_update = triggered_count > 0  # 如果有提醒被触发，必须更新
-                        
-                        if not needs_update:
-                            for reminder in active_reminders:
-                                remaining = reminder.time_remaining().total_seconds()
-                                # 在最后5分钟内更频繁更新，或者整分钟时更新
-                                if remaining <= 300 or remaining % 60 < 1:
-                                    needs_update = True
-                                    break
-                        
-                        if needs_update:
-                            self.display_callback()
+                    for reminder in self.get_active_reminders():
+                        remaining = reminder.time_remaining().total_seconds()
+                        # 在最后5分钟内每秒更新，或者整分钟时更新
+                        if remaining <= 300 or remaining % 60 < 1:
+                            self._notify_display(ChangeType.TICK)
+                            break
                 
-                time.sleep(1)  # 每秒检查一次，支持实时倒计时更新
+                # 睡眠到下一个提醒到期或下一次倒计时刷新，新提醒成为堆顶时提前唤醒
+                timeout = REMINDER_CONFIG['UPDATE_INTERVAL']
+                next_due = self.get_next_due_time()
+                if next_due is not None:
+                    timeout = min(timeout, max((next_due - self.clock()).total_seconds(), 0))
+                self._wakeup.wait(timeout)
+                self._wakeup.clear()
                 
             except Exception as e:
                 self.logger.error(f"监控线程异常: {e}")
@@ -353,26 +717,35 @@ class ReminderManager:
     
     def get_all_reminders(self) -> List[Reminder]:
         """获取所有提醒"""
-        return self.reminders.copy()
+        return list(self._snapshot.values())
     
     def get_status_summary(self) -> Dict:
-        """获取状态摘要 - 支持多个提醒状态"""
-        active_reminders = self.get_active_reminders()
-        current = self.get_current_reminder()
+        """获取状态摘要 - 支持多个提醒状态
+
+        基于同一份快照计算，保证各项统计之间相互一致。
+        """
+        snapshot = self._snapshot
+        active_reminders = sorted(
+            (r for r in snapshot.values() if r.is_active and not r.is_completed),
+            key=lambda r: r.scheduled_time
+        )
+        current = active_reminders[0] if active_reminders else None
         
         # 统计不同状态的提醒
         urgent_reminders = []
         critical_reminders = []
+        remaining_by_id = {}
         
         for reminder in active_reminders:
             remaining_seconds = reminder.time_remaining().total_seconds()
+            remaining_by_id[reminder.id] = remaining_seconds
             if remaining_seconds <= REMINDER_CONFIG['CRITICAL_THRESHOLD']:
                 critical_reminders.append(reminder)
             elif remaining_seconds <= REMINDER_CONFIG['URGENT_THRESHOLD']:
                 urgent_reminders.append(reminder)
         
         return {
-            'total_reminders': len(self.reminders),
+            'total_reminders': len(snapshot),
             'active_reminders': len(active_reminders),
             'urgent_reminders': len(urgent_reminders),
             'critical_reminders': len(critical_reminders),
@@ -387,8 +760,8 @@ class ReminderManager:
                     'task': r.task,
                     'time_remaining': r.format_time_remaining(),
                     'scheduled_time': r.scheduled_time.strftime('%H:%M'),
-                    'is_urgent': r.time_remaining().total_seconds() <= REMINDER_CONFIG['URGENT_THRESHOLD'],
-                    'is_critical': r.time_remaining().total_seconds() <= REMINDER_CONFIG['CRITICAL_THRESHOLD']
+                    'is_urgent': remaining_by_id[r.id] <= REMINDER_CONFIG['URGENT_THRESHOLD'],
+                    'is_critical': remaining_by_id[r.id] <= REMINDER_CONFIG['CRITICAL_THRESHOLD']
                 } for r in active_reminders
             ]
         }
@@ -396,11 +769,69 @@ class ReminderManager:
     def shutdown(self):
         """关闭管理器"""
         try:
-            self.scheduler.shutdown()
+            self._running = False
+            self._wakeup.set()
+            if self.announcer:
+                self.announcer.shutdown()
             self.logger.info("提醒管理器已关闭")
         except Exception as e:
             self.logger.error(f"关闭提醒管理器失败: {e}")
 
+def _run_stress_test(manager: 'ReminderManager', thread_count: int = 16, iterations: int = 500) -> Dict:
+    """并发压力测试 - 多线程同时执行添加/取消/延迟/触发/读取操作"""
+    import random
+    
+    errors = []
+    added_ids = []
+    ids_lock = threading.Lock()
+    manager.max_reminders = thread_count * iterations
+    
+    def worker(seed: int):
+        rng = random.Random(seed)
+        try:
+            for _ in range(iterations):
+                op = rng.random()
+                with ids_lock:
+                    target = rng.choice(added_ids) if added_ids else None
+                if op < 0.35 or target is None:
+                    reminder_id = manager.add_reminder(
+                        f"压力测试{seed}",
+                        datetime.now() + timedelta(seconds=rng.uniform(0, 2))
+                    )
+                    if reminder_id:
+                        with ids_lock:
+                            added_ids.append(reminder_id)
+                elif op < 0.5:
+                    manager.cancel_reminder(target)
+                elif op < 0.65:
+                    manager.snooze_reminder(target, minutes=rng.randint(1, 5))
+                elif op < 0.8:
+                    manager._trigger_reminder(target)
+                else:
+                    summary = manager.get_status_summary()
+                    if summary['active_reminders'] != len(summary['all_active_reminders']):
+                        errors.append(f"状态摘要不一致: {summary['active_reminders']}")
+                    snapshot = manager.get_all_reminders()
+                    if len({r.id for r in snapshot}) != len(snapshot):
+                        errors.append("快照中存在重复的提醒ID")
+        except Exception as e:
+            errors.append(f"线程{seed}异常: {e}")
+    
+    start = time.time()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(thread_count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    return {
+        'threads': thread_count,
+        'operations': thread_count * iterations,
+        'elapsed_seconds': round(time.time() - start, 3),
+        'reminders': len(manager.get_all_reminders()),
+        'errors': errors
+    }
+
 if __name__ == "__main__":
     # 测试代码
     import sys
@@ -412,8 +843,17 @@ if __name__ == "__main__":
     def test_voice_callback(message):
         print(f"[语音播报] {message}")
     
-    def test_display_callback():
-        print(f"[显示更新] {datetime.now()}")
+    def test_display_callback(changes):
+        print(f"[显示更新] {datetime.now()} {[c.change_type.value for c in changes]}")
+    
+    if '--stress' in sys.argv:
+        # 并发压力测试(在项目根目录运行): python -m src.reminder --stress
+        logging.getLogger().setLevel(logging.WARNING)
+        manager = ReminderManager()
+        result = _run_stress_test(manager)
+        manager.shutdown()
+        print(f"压力测试结果: {result}")
+        sys.exit(1 if result['errors'] else 0)
     
     manager = ReminderManager(test_voice_callback, test_display_callback)
     
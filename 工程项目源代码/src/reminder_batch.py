@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+批量提醒模块 - 解析 /api/reminders/batch 请求中的结构化提醒和文字提醒
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import WEB_CONFIG
+from src.reminder import RECURRENCE_INTERVALS
+
+RECURRENCE_NAMES = {'daily': '每天', 'weekly': '每周'}
+
+def parse_iso_time(value: str) -> datetime:
+    """解析ISO格式时间，带时区的时间转换为本地时间"""
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment
+
+def _parse_structured(item: Dict, now: datetime) -> Dict:
+    """校验结构化提醒，不合法时抛出ValueError"""
+    task = str(item.get('task') or '').strip()
+    if not task:
+        raise ValueError('缺少提醒内容(task)')
+    if not item.get('time'):
+        raise ValueError('缺少提醒时间(time)')
+    try:
+        scheduled_time = parse_iso_time(str(item['time']))
+    except ValueError:
+        raise ValueError(f"时间格式无效: {item['time']}，应为ISO格式如 2025-01-01T08:00")
+
+    recurrence = item.get('recurrence') or None
+    if recurrence is not None and (not isinstance(recurrence, str) or recurrence not in RECURRENCE_INTERVALS):
+        raise ValueError(f"不支持的重复周期: {recurrence}，可选: {', '.join(RECURRENCE_INTERVALS)}")
+
+    if scheduled_time <= now:
+        if recurrence is None:
+            raise ValueError(f"提醒时间已过: {item['time']}")
+        # 重复提醒从下一个未来的周期开始
+        interval = RECURRENCE_INTERVALS[recurrence]
+        while scheduled_time <= now:
+            scheduled_time += interval
+
+    return {'task': task, 'scheduled_time': scheduled_time, 'recurrence': recurrence,
+            'original_text': str(item.get('original_text') or '')}
+
+def is_text_entry(entry) -> bool:
+    """是否为需要大模型解析的文字提醒(字符串或 {'text': ...})"""
+    return not (isinstance(entry, dict) and 'text' not in entry)
+
+def parse_batch(entries: List, intent_parser: Optional[Callable[[str], Optional[Dict]]],
+                now: datetime) -> Tuple[List[Dict], List[Dict]]:
+    """解析批量提醒
+
+    entries 的每一项可以是结构化提醒 {'task', 'time', 'recurrence'} 或一行文字
+    (字符串或 {'text': ...})。结构化提醒直接校验，文字提醒并发交给 intent_parser
+    (大模型)解析。返回 (提醒列表, 错误列表)，错误项包含在entries中的序号。
+    """
+    logger = logging.getLogger(__name__)
+    items: List[Optional[Dict]] = [None] * len(entries)
+    errors = []
+    text_entries = []
+
+    for index, entry in enumerate(entries):
+        if isinstance(entry, dict) and 'text' not in entry:
+            try:
+                items[index] = _parse_structured(entry, now)
+            except ValueError as e:
+                errors.append({'index': index, 'error': str(e)})
+            continue
+
+        text = (entry.get('text') if isinstance(entry, dict) else entry)
+        text = str(text or '').strip()
+        if not text:
+            errors.append({'index': index, 'error': '提醒内容为空'})
+        elif intent_parser is None:
+            errors.append({'index': index, 'error': '文字提醒解析不可用，请使用结构化格式'})
+        else:
+            text_entries.append((index, text))
+
+    if text_entries:
+        def parse(text):
+            try:
+                return intent_parser(text)
+            except Exception as e:
+                logger.error(f"解析提醒文字失败: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=WEB_CONFIG['BATCH_PARSE_WORKERS']) as pool:
+            results = list(pool.map(parse, [text for _, text in text_entries]))
+
+        for (index, text), result in zip(text_entries, results):
+            if not result:
+                errors.append({'index': index, 'error': f"无法识别为提醒: {text}"})
+            elif result['time'] <= now:
+                errors.append({'index': index, 'error': f"提醒时间已过: {text}"})
+            else:
+                items[index] = {'task': result['task'], 'scheduled_time': result['time'],
+                                'recurrence': None, 'original_text': text}
+
+    errors.sort(key=lambda e: e['index'])
+    return [item for item in items if item is not None], errors
+
+def format_batch_summary(sender: str, items: List[Dict]) -> str:
+    """整批提醒的语音摘要 - 只播报一次"""
+    ordered = sorted(items, key=lambda item: item['scheduled_time'])
+    first = ordered[0]
+    unique_tasks = list(dict.fromkeys(item['task'] for item in ordered))
+    tasks = "、".join(unique_tasks[:5]) + ("等" if len(unique_tasks) > 5 else "")
+    if len(ordered) == 1:
+        message = f"{sender}为您设置了一个提醒：{first['task']}"
+    else:
+        message = f"{sender}为您设置了{len(ordered)}个提醒，包括{tasks}"
+
+    recurrence = RECURRENCE_NAMES.get(first['recurrence'], '')
+    message += f"。第一个提醒在{first['scheduled_time'].strftime('%m月%d日%H点%M分')}"
+    if recurrence:
+        message += f"，{recurrence}重复"
+    return message
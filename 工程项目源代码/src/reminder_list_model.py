@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+提醒列表模型 - 按提醒ID维护的Qt列表模型，只通知发生变化的行
+"""
+
+import bisect
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+from PyQt5.QtGui import QColor
+
+from src.reminder import ChangeType, Reminder, ReminderChange, format_remaining
+
+# 样式级别 -> 背景色，级别0使用列表默认背景
+LEVEL_BACKGROUNDS = {
+    1: QColor(255, 248, 220),  # 5分钟内 - 浅黄色背景
+    2: QColor(255, 235, 235),  # 1分钟内 - 浅红色背景
+}
+
+class ReminderListModel(QAbstractListModel):
+    """提醒列表模型
+
+    行按 (提醒时间, 提醒ID) 排序，通过二分查找定位。每行的显示文本和样式级别
+    缓存起来，同时记录文本下一次会变化的时间(一小时以上的倒计时每分钟变化一次，
+    一小时以内每秒变化一次)，倒计时刷新时只重新计算到了变化时间的行，只对内容
+    确实变化的行发出 dataChanged。视图只为可见行调用 data()，提醒数量增加时
+    每帧的绘制开销不变。
+    """
+
+    ReminderIdRole = Qt.UserRole
+
+    def __init__(self, clock: Callable[[], datetime] = datetime.now, parent=None):
+        super().__init__(parent)
+        self.clock = clock
+        self._keys: List[tuple] = []               # (提醒时间, 提醒ID)，与行一一对应
+        self._reminders: Dict[str, Reminder] = {}  # 提醒ID -> 提醒
+        self._rendered: Dict[str, tuple] = {}      # 提醒ID -> (文本, 样式级别)
+        self._refresh_at: Dict[str, datetime] = {} # 提醒ID -> 显示文本下一次变化的时间
+        self._head_id: Optional[str] = None
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._keys)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._keys):
+            return None
+        reminder_id = self._keys[index.row()][1]
+        if role == Qt.DisplayRole:
+            return self._rendered[reminder_id][0]
+        if role == Qt.BackgroundRole:
+            return LEVEL_BACKGROUNDS.get(self._rendered[reminder_id][1])
+        if role == self.ReminderIdRole:
+            return reminder_id
+        return None
+
+    def reminder_at(self, row: int) -> Optional[Reminder]:
+        """获取指定行的提醒"""
+        if 0 <= row < len(self._keys):
+            return self._reminders[self._keys[row][1]]
+        return None
+
+    def head(self) -> Optional[Reminder]:
+        """最近的提醒"""
+        return self.reminder_at(0)
+
+    def row_of(self, reminder_id: str) -> int:
+        """提醒所在的行，不存在时返回-1"""
+        reminder = self._reminders.get(reminder_id)
+        if reminder is None:
+            return -1
+        return bisect.bisect_left(self._keys, (reminder.scheduled_time, reminder_id))
+
+    def apply_changes(self, changes: Dict[str, ReminderChange], reset: bool = False, tick: bool = False) -> bool:
+        """应用合并后的增量，返回是否有行发生变化
+
+        reset 为True时以 changes 中的提醒整体替换列表；tick 为True时检查所有
+        倒计时，否则只重绘增量涉及的行。
+        """
+        now = self.clock()
+        if reset:
+            self.beginResetModel()
+            self._keys, self._reminders = [], {}
+            self._rendered, self._refresh_at = {}, {}
+            for reminder_id, change in changes.items():
+                if self._is_listed(change):
+                    self._reminders[reminder_id] = change.reminder
+                    self._keys.append((change.reminder.scheduled_time, reminder_id))
+            self._keys.sort()
+            self._head_id = self._keys[0][1] if self._keys else None
+            for reminder_id in self._reminders:
+                self._render(reminder_id, now)
+            self.endResetModel()
+            return True
+
+        structural = False
+        dirty = set()
+        for reminder_id, change in changes.items():
+            if not self._is_listed(change):
+                structural |= self._remove(reminder_id)
+                continue
+
+            reminder = change.reminder
+            previous = self._reminders.get(reminder_id)
+            if previous is None or previous.scheduled_time != reminder.scheduled_time:
+                # 新增或时间变化: 按时间顺序插入到正确位置
+                self._remove(reminder_id)
+                self._insert(reminder, now)
+                structural = True
+            else:
+                self._reminders[reminder_id] = reminder
+            dirty.add(reminder_id)
+
+        # 最近提醒变化时，新旧两行的标记都需要重绘
+        head_id = self._keys[0][1] if self._keys else None
+        if head_id != self._head_id:
+            dirty.update(rid for rid in (head_id, self._head_id) if rid in self._reminders)
+            self._head_id = head_id
+
+        changed_rows = []
+        for reminder_id in dirty:
+            if self._render(reminder_id, now):
+                changed_rows.append(self.row_of(reminder_id))
+        if tick:
+            for reminder_id, refresh_at in self._refresh_at.items():
+                if refresh_at <= now and reminder_id not in dirty and self._render(reminder_id, now):
+                    changed_rows.append(self.row_of(reminder_id))
+        self._emit_data_changed(changed_rows)
+        return structural or bool(changed_rows)
+
+    @staticmethod
+    def _is_listed(change: ReminderChange) -> bool:
+        reminder = change.reminder
+        return (change.change_type != ChangeType.REMOVED and reminder is not None
+                and reminder.is_active and not reminder.is_completed)
+
+    def _insert(self, reminder: Reminder, now: datetime):
+        key = (reminder.scheduled_time, reminder.id)
+        row = bisect.bisect_left(self._keys, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._keys.insert(row, key)
+        self._reminders[reminder.id] = reminder
+        self._render(reminder.id, now)
+        self.endInsertRows()
+
+    def _remove(self, reminder_id: str) -> bool:
+        row = self.row_of(reminder_id)
+        if row < 0:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._keys[row]
+        del self._reminders[reminder_id]
+        self._rendered.pop(reminder_id, None)
+        self._refresh_at.pop(reminder_id, None)
+        self.endRemoveRows()
+        return True
+
+    def _render(self, reminder_id: str, now: datetime) -> bool:
+        """重新计算一行的文本和样式级别，返回是否与之前不同"""
+        reminder = self._reminders[reminder_id]
+        remaining = (reminder.scheduled_time - now).total_seconds()
+
+        # 格式化显示文本，包含倒计时
+        time_str = reminder.scheduled_time.strftime('%H:%M')
+        if remaining > 0:
+            text = f"⏰ {time_str} - {reminder.task} (剩余: {format_remaining(remaining)})"
+            # 到下一个整分钟(一小时以上)或整秒时文本才会变化
+            step = remaining - (int(remaining) // 60 * 60 if remaining >= 3600 else int(remaining))
+            self._refresh_at[reminder_id] = now + timedelta(seconds=step)
+        else:
+            text = f"🔔 {time_str} - {reminder.task} (即将到时!)"
+            self._refresh_at[reminder_id] = datetime.max
+
+        # 为最近的提醒添加特殊标记
+        if reminder_id == self._head_id:
+            text = f"📍 {text}"
+
+        # 根据剩余时间设置不同的显示样式
+        if remaining <= 60:  # 1分钟内
+            level = 2
+        elif remaining <= 300:  # 5分钟内
+            level = 1
+        else:
+            level = 0
+
+        rendered = (text, level)
+        if self._rendered.get(reminder_id) == rendered:
+            return False
+        self._rendered[reminder_id] = rendered
+        return True
+
+    def _emit_data_changed(self, rows: List[int]):
+        """按连续的行区间发出 dataChanged"""
+        if not rows:
+            return
+        rows.sort()
+        roles = [Qt.DisplayRole, Qt.BackgroundRole]
+        start = previous = rows[0]
+        for row in rows[1:] + [None]:
+            if row is not None and row == previous + 1:
+                previous = row
+                continue
+            self.dataChanged.emit(self.index(start), self.index(previous), roles)
+            if row is not None:
+                start = previous = row
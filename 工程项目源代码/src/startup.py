@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+启动编排模块 - 按依赖关系并行初始化系统组件并记录启动时间线
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+@dataclass
+class StartupStep:
+    """一个启动步骤及其在时间线上的记录"""
+    name: str
+    func: Callable[[], None]
+    depends: Set[str] = field(default_factory=set)
+    main_thread: bool = False      # 必须在调用 run() 的线程中执行(例如创建Qt对象)
+    status: str = "pending"        # pending / done / failed / skipped
+    thread: str = ""
+    started_at: float = 0.0        # 相对编排开始的秒数
+    finished_at: float = 0.0
+
+class StartupOrchestrator:
+    """启动编排器
+
+    依赖都已完成的步骤立即开始：普通步骤提交到线程池并行执行，标记为
+    main_thread 的步骤在调用 run() 的线程中执行。某一步失败时，依赖它的步骤
+    不再执行，已开始的步骤执行完后抛出第一个异常。
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.steps: Dict[str, StartupStep] = {}
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    def add(self, name: str, func: Callable[[], None], depends=(), main_thread: bool = False):
+        """登记一个启动步骤"""
+        if name in self.steps:
+            raise ValueError(f"启动步骤重复: {name}")
+        self.steps[name] = StartupStep(name, func, set(depends), main_thread)
+
+    def run(self):
+        """执行所有步骤，返回后所有步骤都已完成"""
+        unknown = {dep for step in self.steps.values() for dep in step.depends} - set(self.steps)
+        if unknown:
+            raise ValueError(f"启动步骤依赖不存在: {', '.join(sorted(unknown))}")
+
+        self.started = time.perf_counter()
+        self._condition = threading.Condition()
+        self._pending = dict(self.steps)
+        self._done: Set[str] = set()
+        self._running = 0
+        self._error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='startup') as self._pool:
+            with self._condition:
+                self._dispatch()
+                while True:
+                    inline = None
+                    if self._error is None:
+                        inline = next((step for step in self._pending.values()
+                                       if step.main_thread and step.depends <= self._done), None)
+                    if inline:
+                        del self._pending[inline.name]
+                        self._running += 1
+                        self._condition.release()
+                        try:
+                            self._execute(inline)
+                        finally:
+                            self._condition.acquire()
+                        continue
+                    if self._running == 0:
+                        break
+                    self._condition.wait()
+
+        self.elapsed = time.perf_counter() - self.started
+        if self._error is None and self._pending:
+            self._error = ValueError(f"启动步骤存在循环依赖: {', '.join(sorted(self._pending))}")
+        if self._error is not None:
+            for step in self._pending.values():
+                step.status = "skipped"
+            raise self._error
+
+    def _dispatch(self):
+        """把依赖都已完成的普通步骤提交到线程池(调用时持有锁)"""
+        if self._error is not None:
+            return
+        for step in [s for s in self._pending.values() if not s.main_thread and s.depends <= self._done]:
+            del self._pending[step.name]
+            self._running += 1
+            self._pool.submit(self._execute, step)
+
+    def _execute(self, step: StartupStep):
+        """执行一个步骤，完成后立即提交因此就绪的步骤并唤醒主线程"""
+        try:
+            self._run_step(step)
+        except Exception as e:
+            with self._condition:
+                self._error = self._error or e
+        else:
+            with self._condition:
+                self._done.add(step.name)
+        with self._condition:
+            self._running -= 1
+            self._dispatch()
+            self._condition.notify_all()
+
+    def _run_step(self, step: StartupStep):
+        step.thread = threading.current_thread().name
+        step.started_at = time.perf_counter() - self.started
+        try:
+            step.func()
+            step.status = "done"
+        except Exception as e:
+            step.status = "failed"
+            self.logger.error(f"启动步骤 {step.name} 失败: {e}")
+            raise
+        finally:
+            step.finished_at = time.perf_counter() - self.started
+
+    def timeline(self) -> List[Dict]:
+        """按开始时间排列的启动时间线(毫秒)"""
+        steps = sorted(self.steps.values(), key=lambda s: (s.status == "skipped", s.started_at))
+        return [{
+            'step': step.name,
+            'status': step.status,
+            'thread': step.thread,
+            'depends': sorted(step.depends),
+            'start_ms': round(step.started_at * 1000, 1),
+            'duration_ms': round((step.finished_at - step.started_at) * 1000, 1)
+        } for step in steps]
+
+    def format_timeline(self) -> str:
+        """启动时间线的文本表格，用于写入日志"""
+        lines = [f"启动时间线 (共 {self.elapsed * 1000:.1f} ms):"]
+        for entry in self.timeline():
+            lines.append(f"  {entry['start_ms']:>8.1f} ms  +{entry['duration_ms']:>7.1f} ms  "
+                         f"{entry['step']:<20} {entry['status']:<8} {entry['thread']}")
+        return "\n".join(lines)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+系统状态机模块 - 语音提醒系统的状态、事件、转换表和取消令牌
+"""
+
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+class SystemState(Enum):
+    """系统状态"""
+    IDLE = "idle"                        # 空闲，可以开始录音
+    LISTENING = "listening"              # 正在录音和识别
+    PROCESSING = "processing"            # 正在解析意图和确认播报
+
+class SystemEvent(Enum):
+    """触发状态转换的事件"""
+    RECORD = "record"                    # 请求开始录音
+    SPEECH_CAPTURED = "speech_captured"  # 语音已识别为文字
+    FINISHED = "finished"                # 语音操作结束(成功或失败)
+    STOP = "stop"                        # 用户停止当前操作
+
+# (当前状态, 事件) -> 新状态；表中没有的组合会被忽略，例如处理中再次按下录音
+SYSTEM_TRANSITIONS: Dict[Tuple[SystemState, SystemEvent], SystemState] = {
+    (SystemState.IDLE, SystemEvent.RECORD): SystemState.LISTENING,
+    (SystemState.LISTENING, SystemEvent.SPEECH_CAPTURED): SystemState.PROCESSING,
+    (SystemState.LISTENING, SystemEvent.FINISHED): SystemState.IDLE,
+    (SystemState.LISTENING, SystemEvent.STOP): SystemState.IDLE,
+    (SystemState.PROCESSING, SystemEvent.FINISHED): SystemState.IDLE,
+    (SystemState.PROCESSING, SystemEvent.STOP): SystemState.IDLE,
+}
+
+# 语音操作进行中的状态 - 进入时创建取消令牌，STOP 离开时取消
+OPERATION_STATES = {SystemState.LISTENING, SystemState.PROCESSING}
+
+class OperationCancelled(Exception):
+    """操作已被取消"""
+
+class CancellationToken:
+    """取消令牌 - 一次语音操作的所有步骤共用一个令牌
+
+    工作线程在每次网络请求、录音或播放之前调用 raise_if_cancelled()；正在进行的
+    阻塞操作通过 add_callback() 登记中止方法(关闭连接、停止播放)，取消时立即调用。
+    cancel() 可在任意线程调用，只生效一次。
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        """取消操作，在调用线程中依次执行登记的中止方法"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logging.getLogger(__name__).error(f"取消回调执行失败: {e}")
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """登记取消时调用的方法(已取消时立即调用)，返回注销函数"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        """已取消时抛出 OperationCancelled"""
+        if self._event.is_set():
+            raise OperationCancelled()
+
+    def wait(self, timeout: float) -> bool:
+        """等待取消或超时，返回是否已取消(可代替 time.sleep)"""
+        return self._event.wait(timeout)
+
+@contextmanager
+def on_cancel(token: Optional[CancellationToken], callback: Callable[[], None]):
+    """with 块执行期间令牌被取消时调用 callback，令牌为None时不做任何事"""
+    if token is None:
+        yield
+        return
+    remove = token.add_callback(callback)
+    try:
+        yield
+    finally:
+        remove()
+
+def run_cancellable(func: Callable[..., Any], token: Optional[CancellationToken], *args, **kwargs) -> Any:
+    """执行无法从外部中止的阻塞调用(例如SDK内部的HTTP请求)
+
+    调用在单独的线程中进行，令牌被取消时立即抛出 OperationCancelled，不再等待；
+    调用在后台继续完成，结果丢弃。令牌为None时直接在当前线程调用。
+    """
+    if token is None:
+        return func(*args, **kwargs)
+    token.raise_if_cancelled()
+
+    done = threading.Event()
+    outcome = {}
+
+    def call():
+        try:
+            outcome['result'] = func(*args, **kwargs)
+        except BaseException as e:
+            outcome['error'] = e
+        finally:
+            done.set()
+
+    threading.Thread(target=call, name='cancellable-call', daemon=True).start()
+    with on_cancel(token, done.set):
+        done.wait()
+    token.raise_if_cancelled()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+@dataclass(frozen=True)
+class Transition:
+    """一次已发生的状态转换"""
+    source: SystemState
+    event: SystemEvent
+    target: SystemState
+    token: Optional[CancellationToken]  # 转换后当前语音操作的令牌，不在操作中时为None
+    payload: Any = None
+
+class StateMachine:
+    """系统状态机
+
+    post() 可在任意线程调用：事件先进入队列，由当前没有在处理事件的调用方按
+    顺序逐个处理(运行到完成)，转换监听器中再次 post 的事件排在后面处理，不会
+    嵌套。查表和修改状态在锁内原子完成，取消令牌和监听器在锁外执行，不应阻塞。
+
+    进入语音操作状态时创建新的取消令牌；STOP 离开操作状态时取消令牌。工作线程
+    发出的事件带上自己的令牌，令牌不是当前操作的(已取消或已开始新的操作)时忽略，
+    避免过期的操作结果影响新的操作。
+    """
+
+    def __init__(self, transitions: Dict[Tuple[SystemState, SystemEvent], SystemState] = None,
+                 initial: SystemState = SystemState.IDLE):
+        self.logger = logging.getLogger(__name__)
+        self.transitions = dict(transitions or SYSTEM_TRANSITIONS)
+        self._state = initial
+        self._token: Optional[CancellationToken] = None
+        self._lock = threading.Lock()
+        self._queue: deque = deque()
+        self._draining = False
+        self._listeners: List[Callable[[Transition], None]] = []
+        self.ignored_events = 0
+
+    @property
+    def state(self) -> SystemState:
+        with self._lock:
+            return self._state
+
+    @property
+    def token(self) -> Optional[CancellationToken]:
+        """当前语音操作的取消令牌"""
+        with self._lock:
+            return self._token
+
+    def add_listener(self, listener: Callable[[Transition], None]):
+        """注册转换监听器 - 每次状态转换后按注册顺序调用"""
+        self._listeners.append(listener)
+
+    def post(self, event: SystemEvent, token: Optional[CancellationToken] = None, payload: Any = None):
+        """发送事件 - token 不为None时只在它仍是当前操作的令牌时生效"""
+        with self._lock:
+            self._queue.append((event, token, payload))
+            if self._draining:
+                return
+            self._draining = True
+
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._draining = False
+                    return
+                transition, cancelled = self._apply(*self._queue.popleft())
+            if cancelled:
+                cancelled.cancel()  # 中止方法可能关闭连接或停止播放，不在锁内执行
+            if transition:
+                self._notify(transition)
+
+    def _apply(self, event: SystemEvent, token: Optional[CancellationToken], payload: Any) -> tuple:
+        """查表并原子地修改状态(调用时持有锁)
+
+        返回 (转换, 需要取消的令牌)，事件被忽略时转换为None。
+        """
+        source = self._state
+        target = self.transitions.get((source, event))
+        if target is None or (token is not None and token is not self._token):
+            self.ignored_events += 1
+            self.logger.debug(f"忽略事件 {event.value} (当前状态 {source.value})")
+            return None, None
+
+        cancelled = None
+        if target in OPERATION_STATES and source not in OPERATION_STATES:
+            self._token = CancellationToken()
+        elif target not in OPERATION_STATES and source in OPERATION_STATES:
+            if event == SystemEvent.STOP:
+                cancelled = self._token
+            self._token = None
+
+        self._state = target
+        self.logger.info(f"状态转换: {source.value} -> {target.value} ({event.value})")
+        return Transition(source, event, target, self._token, payload), cancelled
+
+    def _notify(self, transition: Transition):
+        for listener in self._listeners:
+            try:
+                listener(transition)
+            except Exception as e:
+                self.logger.error(f"状态转换处理失败: {e}")
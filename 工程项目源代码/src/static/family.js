@@ -0,0 +1,228 @@
+const form = document.getElementById('messageForm');
+const messageArea = document.getElementById('messageArea');
+const sendBtn = document.getElementById('sendBtn');
+const messageInput = document.getElementById('message');
+const charCount = document.getElementById('charCount');
+const statusDiv = document.getElementById('status');
+
+// 其他家庭的页面在 /h/<家庭ID>/ 下，接口地址加上同样的前缀
+const apiBase = (location.pathname.match(/^\/h\/[^/]+/) || [''])[0];
+
+// 字符计数
+messageInput.addEventListener('input', function() {
+    const count = this.value.length;
+    charCount.textContent = count;
+
+    if (count > 180) {
+        charCount.style.color = '#dc3545';
+    } else if (count > 150) {
+        charCount.style.color = '#ffc107';
+    } else {
+        charCount.style.color = '#666';
+    }
+});
+
+// 表单提交
+form.addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const formData = new FormData(form);
+    const data = {
+        sender: formData.get('sender'),
+        message: formData.get('message')
+    };
+
+    if (!data.message.trim()) {
+        showMessage('请输入消息内容', 'error');
+        return;
+    }
+
+    sendBtn.disabled = true;
+    sendBtn.textContent = '发送中...';
+
+    try {
+        const response = await fetch(`${apiBase}/api/send_message`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(data)
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            showMessage(result.duplicate ? result.message : '消息发送成功！', 'success');
+            form.reset();
+            charCount.textContent = '0';
+            charCount.style.color = '#666';
+            if (result.status_url && !window.EventSource) {
+                pollMessageStatus(result.status_url);
+            }
+            sentMessageIds.add(result.data.id);
+        } else {
+            showMessage(result.error || '发送失败', 'error');
+        }
+    } catch (error) {
+        showMessage('网络错误，请检查连接', 'error');
+    } finally {
+        sendBtn.disabled = false;
+        sendBtn.textContent = '📤 发送消息';
+    }
+});
+
+// 本页面发送的消息ID，只显示这些消息的处理结果
+const sentMessageIds = new Set();
+
+// 显示消息处理结果
+function showMessageResult(job) {
+    if (job.status === 'done') {
+        if (job.result && job.result.type === 'reminder') {
+            showMessage(`已为老人添加提醒：${job.result.task}（${job.result.scheduled_time}）`, 'success');
+        } else {
+            showMessage('消息已播报给老人', 'success');
+        }
+    } else if (job.status === 'failed') {
+        showMessage('消息处理失败', 'error');
+    }
+}
+
+// 不支持推送的浏览器查询消息处理结果
+async function pollMessageStatus(url, attempt = 0) {
+    try {
+        const response = await fetch(url);
+        const result = await response.json();
+        if (!result.success) {
+            return;
+        }
+        const job = result.data;
+        if (job.status === 'done' || job.status === 'failed') {
+            showMessageResult(job);
+        } else if (attempt < 30) {
+            setTimeout(() => pollMessageStatus(url, attempt + 1), 1000);
+        }
+    } catch (error) {
+        // 查询失败不影响已发送的消息
+    }
+}
+
+function showMessage(text, type) {
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `message ${type}`;
+    messageDiv.textContent = text;
+
+    messageArea.innerHTML = '';
+    messageArea.appendChild(messageDiv);
+
+    setTimeout(() => {
+        messageDiv.remove();
+    }, 5000);
+}
+
+// 定期检查系统状态
+async function checkStatus() {
+    try {
+        const response = await fetch(`${apiBase}/api/status`);
+        const result = await response.json();
+
+        if (result.success) {
+            statusDiv.textContent = `系统状态: 正常运行 | 消息数: ${result.data.message_count}`;
+            statusDiv.style.color = '#28a745';
+        } else {
+            statusDiv.textContent = '系统状态: 异常';
+            statusDiv.style.color = '#dc3545';
+        }
+    } catch (error) {
+        statusDiv.textContent = '系统状态: 连接失败';
+        statusDiv.style.color = '#dc3545';
+    }
+}
+
+// 提醒列表，按提醒ID维护
+const reminders = new Map();
+const changeLabels = {triggered: '时间到了', acknowledged: '老人已确认'};
+
+function renderReminders() {
+    const list = document.getElementById('reminderList');
+    const items = [...reminders.values()].sort((a, b) => a.scheduled_time.localeCompare(b.scheduled_time));
+    list.innerHTML = '';
+    if (!items.length) {
+        list.innerHTML = '<li class="empty">暂无提醒</li>';
+        return;
+    }
+    for (const r of items) {
+        const li = document.createElement('li');
+        const task = document.createElement('span');
+        const info = document.createElement('span');
+        task.textContent = r.task;
+        info.textContent = r.label || r.scheduled_time.slice(11, 16);
+        if (r.label) {
+            li.className = 'done';
+        }
+        li.append(task, info);
+        list.appendChild(li);
+    }
+}
+
+function applyReminderChange(change) {
+    const r = change.reminder;
+    if (change.change === 'removed' || !r.is_active) {
+        reminders.delete(r.id);
+    } else if (change.change === 'acknowledged') {
+        reminders.set(r.id, {...r, label: changeLabels.acknowledged});
+    } else if (r.is_completed) {
+        reminders.set(r.id, {...r, label: changeLabels.triggered});
+    } else {
+        reminders.set(r.id, r);
+    }
+}
+
+// 推送连接: 提醒变化、消息处理结果实时到达，不再定时轮询
+function connectEvents() {
+    const source = new EventSource(`${apiBase}/api/events`);
+
+    source.addEventListener('snapshot', (e) => {
+        const data = JSON.parse(e.data);
+        reminders.clear();
+        data.reminders.forEach(r => reminders.set(r.id, r));
+        renderReminders();
+        statusDiv.textContent = `系统状态: 正常运行 | 消息数: ${data.message_count}`;
+        statusDiv.style.color = '#28a745';
+    });
+    source.addEventListener('reminders', (e) => {
+        JSON.parse(e.data).changes.forEach(applyReminderChange);
+        renderReminders();
+    });
+    source.addEventListener('message', (e) => {
+        const job = JSON.parse(e.data);
+        if (sentMessageIds.has(job.id)) {
+            showMessageResult(job);
+        }
+    });
+    source.addEventListener('speech', (e) => {
+        const data = JSON.parse(e.data);
+        if (data.state === 'started') {
+            statusDiv.textContent = `正在播报: ${data.text}`;
+        } else {
+            statusDiv.textContent = '系统状态: 正常运行';
+        }
+        statusDiv.style.color = '#28a745';
+    });
+    source.onopen = () => {
+        statusDiv.textContent = '系统状态: 正常运行';
+        statusDiv.style.color = '#28a745';
+    };
+    source.onerror = () => {
+        // 浏览器会自动重连，并通过 Last-Event-ID 补发断线期间的事件
+        statusDiv.textContent = '系统状态: 连接中断，正在重连...';
+        statusDiv.style.color = '#dc3545';
+    };
+}
+
+if (window.EventSource) {
+    connectEvents();
+} else {
+    // 每30秒检查一次状态
+    setInterval(checkStatus, 30000);
+    checkStatus();
+}
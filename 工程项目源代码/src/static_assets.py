@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+静态资源模块 - 家庭消息页面的预渲染、预压缩和缓存控制
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # 可选依赖，未安装时只提供gzip
+    brotli = None
+
+from flask import Response, request
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+# 带内容指纹的资源内容不会变化，可长期缓存；页面本身每次都需要用ETag验证
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+@dataclass(frozen=True)
+class Asset:
+    """一个预处理好的资源，各编码版本在启动时生成"""
+    content_type: str
+    cache_control: str
+    etag: str
+    bodies: Dict[str, bytes]  # 编码 -> 内容，identity 为原始内容
+
+class StaticAssets:
+    """静态资源集合
+
+    启动时读取 static 目录下的页面和资源文件：CSS/JS 文件名加上内容哈希
+    (family.css -> family.3f2a9c1d.css)，页面中的引用随之替换；每个资源只
+    压缩一次(gzip，安装了brotli时再加br)，请求时按 Accept-Encoding 直接返回
+    对应版本，If-None-Match 命中时返回304。
+    """
+
+    ENCODINGS = ('br', 'gzip')
+
+    def __init__(self, static_dir: str = STATIC_DIR, index: str = 'index.html'):
+        self.logger = logging.getLogger(__name__)
+        self._assets: Dict[str, Asset] = {}
+
+        urls = {}
+        for name in sorted(os.listdir(static_dir)):
+            if name == index:
+                continue
+            with open(os.path.join(static_dir, name), 'rb') as f:
+                body = f.read()
+            stem, ext = os.path.splitext(name)
+            fingerprinted = f"{stem}.{hashlib.sha256(body).hexdigest()[:8]}{ext}"
+            urls[f"/static/{name}"] = f"/static/{fingerprinted}"
+            self._assets[urls[f"/static/{name}"]] = self._build(name, body, IMMUTABLE_CACHE)
+
+        with open(os.path.join(static_dir, index), 'r', encoding='utf-8') as f:
+            html = f.read()
+        html = re.sub(r'(?:href|src)="(/static/[^"]+)"',
+                      lambda m: m.group(0).replace(m.group(1), urls.get(m.group(1), m.group(1))), html)
+        self._assets['/'] = self._build(index, html.encode('utf-8'), REVALIDATE_CACHE)
+
+        self.logger.info(f"静态资源已加载: {len(self._assets)} 个"
+                         f"{'' if brotli else '(未安装brotli，仅提供gzip压缩)'}")
+
+    def _build(self, name: str, body: bytes, cache_control: str) -> Asset:
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+
+        bodies = {'identity': body}
+        bodies['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli:
+            bodies['br'] = brotli.compress(body, quality=11)
+        # 只保留确实更小的压缩版本
+        bodies = {k: v for k, v in bodies.items() if k == 'identity' or len(v) < len(body)}
+
+        return Asset(content_type, cache_control, hashlib.sha256(body).hexdigest()[:16], bodies)
+
+    def paths(self):
+        return list(self._assets)
+
+    def response(self, path: str) -> Optional[Response]:
+        """按当前请求生成响应，资源不存在时返回None"""
+        asset = self._assets.get(path)
+        if asset is None:
+            return None
+
+        encoding = 'identity'
+        for candidate in self.ENCODINGS:
+            if candidate in asset.bodies and candidate in request.accept_encodings:
+                encoding = candidate
+                break
+        # 不同编码的内容不同，强ETag需要区分
+        etag = asset.etag if encoding == 'identity' else f"{asset.etag}-{encoding}"
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(asset.bodies[encoding], content_type=asset.content_type)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = asset.cache_control
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
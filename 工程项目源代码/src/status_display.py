@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+无界面状态显示模块 - 不依赖Qt的界面控制器
+
+无界面(headless/kiosk)模式下替代 GUIController：接口相同，状态和提醒只保存
+在内存中，日志写入系统日志。可选的 FramebufferRenderer 把当前时间、下一个提醒
+和倒计时绘制到离屏图片或 /dev/fb0 一类的帧缓冲，适合只带一块小屏幕的设备。
+绘制需要安装Pillow(可选依赖)，未安装或未配置输出时只运行系统本身。
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image, ImageChops, ImageDraw, ImageFont
+except ImportError:  # 可选依赖，未安装时不绘制状态画面
+    Image = None
+
+from config import DISPLAY_CONFIG, REMINDER_CONFIG
+from src.reminder import ChangeType, Reminder, ReminderChange, format_remaining
+
+# 样式级别 -> 背景色，与GUI提醒列表的配色一致
+LEVEL_BACKGROUNDS = {
+    0: (255, 255, 255),
+    1: (255, 248, 220),  # 5分钟内 - 浅黄色
+    2: (255, 235, 235),  # 1分钟内 - 浅红色
+}
+
+def _framebuffer_geometry(path: str) -> Optional[Tuple[int, int, int, int]]:
+    """从sysfs读取帧缓冲设备的 (宽, 高, 每像素位数, 每行字节数)，不是帧缓冲设备时返回None"""
+    sysfs = os.path.join('/sys/class/graphics', os.path.basename(path))
+    try:
+        with open(os.path.join(sysfs, 'virtual_size')) as f:
+            width, height = (int(v) for v in f.read().strip().split(','))
+        with open(os.path.join(sysfs, 'bits_per_pixel')) as f:
+            bits_per_pixel = int(f.read().strip())
+        try:
+            with open(os.path.join(sysfs, 'stride')) as f:
+                stride = int(f.read().strip())
+        except OSError:
+            stride = width * bits_per_pixel // 8
+        return width, height, bits_per_pixel, stride
+    except (OSError, ValueError):
+        return None
+
+class FramebufferRenderer:
+    """状态画面渲染器
+
+    按配置的帧率检查画面内容(时间、状态、下一个提醒、倒计时)，只有内容变化时才
+    重新绘制并输出。输出路径以 .png 结尾时保存为离屏图片(先写临时文件再替换，
+    读取方不会看到半帧)；其他路径按帧缓冲的原始像素格式从头写入，普通文件即可
+    作为虚拟帧缓冲用于测试。/dev/fbN 设备未指定尺寸时从sysfs读取尺寸和像素格式。
+    """
+
+    PIXEL_FORMATS = {'RGB565': 2, 'BGRA': 4}
+
+    def __init__(self, output: str, state: Callable[[], Dict[str, Any]],
+                 width: int = None, height: int = None, fps: float = None,
+                 pixel_format: str = None, font_file: str = None,
+                 clock: Callable[[], datetime] = datetime.now):
+        if Image is None:
+            raise RuntimeError("绘制状态画面需要安装Pillow")
+        self.logger = logging.getLogger(__name__)
+        self.output = output
+        self.state = state
+        self.clock = clock
+        self.fps = fps or DISPLAY_CONFIG['FPS']
+        self.is_image = output.lower().endswith('.png')
+
+        width = width or DISPLAY_CONFIG['WIDTH']
+        height = height or DISPLAY_CONFIG['HEIGHT']
+        pixel_format = pixel_format or DISPLAY_CONFIG['PIXEL_FORMAT']
+        geometry = None if self.is_image else _framebuffer_geometry(output)
+        if geometry:
+            fb_width, fb_height, bits_per_pixel, self.stride = geometry
+            width, height = width or fb_width, height or fb_height
+            pixel_format = pixel_format or ('BGRA' if bits_per_pixel == 32 else 'RGB565')
+        self.width, self.height = width or 320, height or 240
+        self.pixel_format = pixel_format or 'RGB565'
+        if self.pixel_format not in self.PIXEL_FORMATS:
+            raise ValueError(f"不支持的像素格式: {self.pixel_format}")
+        if not geometry:
+            self.stride = self.width * self.PIXEL_FORMATS[self.pixel_format]
+
+        font_file = font_file or DISPLAY_CONFIG['FONT_FILE']
+        self.fonts = {name: self._load_font(font_file, max(8, int(self.height * scale)))
+                      for name, scale in (('large', 0.2), ('medium', 0.1), ('small', 0.075))}
+
+        self.frames_drawn = 0
+        self.last_frame_seconds = 0.0
+        self._last_content = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _load_font(self, font_file: Optional[str], size: int):
+        if font_file:
+            try:
+                return ImageFont.truetype(font_file, size)
+            except OSError as e:
+                self.logger.warning(f"加载字体失败，使用默认字体(不含中文字形): {e}")
+        return ImageFont.load_default(size)
+
+    def start(self):
+        """启动渲染线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._render_loop, name='status-display', daemon=True)
+        self._thread.start()
+        self.logger.info(f"状态画面输出到 {self.output} ({self.width}x{self.height} {self.pixel_format}, {self.fps}帧/秒)")
+
+    def stop(self):
+        """停止渲染线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _render_loop(self):
+        interval = 1.0 / self.fps
+        while not self._stop_event.is_set():
+            try:
+                self.render_frame()
+            except Exception as e:
+                self.logger.error(f"绘制状态画面失败: {e}")
+            self._stop_event.wait(interval)
+
+    def render_frame(self, force: bool = False) -> bool:
+        """检查画面内容，变化时绘制并输出一帧，返回是否输出"""
+        content = self._compose()
+        if content == self._last_content and not force:
+            return False
+        started = datetime.now()
+        image = self._draw(content)
+        self._write(image)
+        self._last_content = content
+        self.frames_drawn += 1
+        self.last_frame_seconds = (datetime.now() - started).total_seconds()
+        return True
+
+    def _compose(self) -> tuple:
+        """把当前状态整理成画面上的文字和背景级别"""
+        now = self.clock()
+        state = self.state()
+        reminder: Optional[Reminder] = state.get('next_reminder')
+        if reminder:
+            remaining = (reminder.scheduled_time - now).total_seconds()
+            task = f"{reminder.scheduled_time.strftime('%H:%M')} {reminder.task}"
+            countdown = f"剩余 {format_remaining(remaining)}" if remaining > 0 else "即将到时!"
+            if remaining <= REMINDER_CONFIG['CRITICAL_THRESHOLD']:
+                level = 2
+            elif remaining <= REMINDER_CONFIG['URGENT_THRESHOLD']:
+                level = 1
+            else:
+                level = 0
+        else:
+            task, countdown, level = "暂无提醒", "--:--", 0
+        return (now.strftime('%H:%M:%S'), state.get('status', ''), task, countdown,
+                f"共{state.get('reminder_count', 0)}个提醒", level)
+
+    def _draw(self, content: tuple):
+        clock_text, status, task, countdown, count, level = content
+        image = Image.new('RGB', (self.width, self.height), LEVEL_BACKGROUNDS[level])
+        draw = ImageDraw.Draw(image)
+        margin = max(2, self.width // 40)
+        y = margin
+        for text, font, color in ((clock_text, 'large', (33, 37, 41)),
+                                  (status, 'small', (73, 80, 87)),
+                                  (task, 'medium', (33, 37, 41)),
+                                  (countdown, 'large', (220, 53, 69) if level else (13, 110, 253)),
+                                  (count, 'small', (108, 117, 125))):
+            draw.text((margin, y), text, font=self.fonts[font], fill=color)
+            y += int(self.fonts[font].size * 1.35)
+        return image
+
+    def _write(self, image):
+        if self.is_image:
+            temp_path = f"{self.output}.tmp"
+            image.save(temp_path, format='PNG')
+            os.replace(temp_path, self.output)
+            return
+
+        data = self._pack(image)
+        row_bytes = self.width * self.PIXEL_FORMATS[self.pixel_format]
+        if self.stride != row_bytes:
+            padding = bytes(self.stride - row_bytes)
+            data = b''.join(data[row:row + row_bytes] + padding
+                            for row in range(0, len(data), row_bytes))
+        mode = 'r+b' if os.path.exists(self.output) else 'wb'
+        with open(self.output, mode) as f:
+            f.write(data)
+
+    def _pack(self, image) -> bytes:
+        """转换为帧缓冲的原始像素格式(小端)"""
+        if self.pixel_format == 'BGRA':
+            return image.tobytes('raw', 'BGRX')
+        # RGB565: 高字节 RRRRRGGG，低字节 GGGBBBBB，两部分的位不重叠，可以直接相加
+        red, green, blue = image.split()
+        high = ImageChops.add(red.point(lambda v: v & 0xF8), green.point(lambda v: v >> 5))
+        low = ImageChops.add(green.point(lambda v: (v & 0x1C) << 3), blue.point(lambda v: v >> 3))
+        return Image.merge('LA', (low, high)).tobytes()
+
+class StatusDisplayController:
+    """无界面控制器 - 与 GUIController 接口相同，不加载Qt
+
+    所有方法都可以在任意线程调用。run() 阻塞到 stop() 被调用为止，
+    代替Qt主循环。
+    """
+
+    def __init__(self, output: Optional[str] = None, clock: Callable[[], datetime] = datetime.now):
+        self.logger = logging.getLogger(__name__)
+        self.clock = clock
+        self.record_callback: Optional[Callable] = None
+        self.clear_callback: Optional[Callable] = None
+
+        self._lock = threading.Lock()
+        self._status = "系统就绪"
+        self._reminders: Dict[str, Reminder] = {}
+        self._stopped = threading.Event()
+
+        self.renderer: Optional[FramebufferRenderer] = None
+        output = output if output is not None else DISPLAY_CONFIG['OUTPUT']
+        if output:
+            try:
+                self.renderer = FramebufferRenderer(output, self.snapshot, clock=clock)
+            except (RuntimeError, ValueError) as e:
+                self.logger.warning(f"状态画面不可用，只运行无界面模式: {e}")
+
+        self.logger.info("无界面控制器初始化完成")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前状态文字、下一个提醒和提醒数量"""
+        with self._lock:
+            reminders = list(self._reminders.values())
+            status = self._status
+        return {
+            'status': status,
+            'next_reminder': min(reminders, key=lambda r: (r.scheduled_time, r.id)) if reminders else None,
+            'reminder_count': len(reminders)
+        }
+
+    def set_callbacks(self, record_callback: Callable, clear_callback: Callable):
+        """设置回调函数 - 无界面模式下由硬件按钮等外部输入调用"""
+        self.record_callback = record_callback
+        self.clear_callback = clear_callback
+
+    def show(self):
+        """开始输出状态画面"""
+        if self.renderer:
+            self.renderer.start()
+
+    def run(self):
+        """阻塞到 stop() 被调用"""
+        while not self._stopped.wait(0.5):
+            pass
+        return 0
+
+    def call_when_ready(self, callback: Callable[[], None]):
+        """无界面模式没有需要等待的主循环，直接调用 callback"""
+        callback()
+
+    def stop(self):
+        """停止状态画面并结束 run()"""
+        if self.renderer:
+            self.renderer.stop()
+        self._stopped.set()
+
+    def show_welcome_screen(self):
+        """显示欢迎界面"""
+        self.set_status("系统就绪")
+
+    def show_listening_screen(self):
+        """显示录音界面"""
+        self.set_status("正在录音...")
+
+    def show_processing_screen(self):
+        """显示处理界面"""
+        self.set_status("正在处理语音...")
+
+    def show_reminder_screen(self, reminder_data: Dict[str, Any]):
+        """显示提醒界面"""
+        self.set_status(f"提醒: {reminder_data['task']}")
+
+    def set_status(self, text: str):
+        """设置状态文字"""
+        with self._lock:
+            self._status = text
+
+    def show_message_screen(self, message: str, sender: str):
+        """显示消息界面"""
+        self.set_status(f"{sender}: {message}")
+        self.logger.info(f"收到来自{sender}的消息: {message}")
+
+    def update_reminder_list(self, reminders: list):
+        """更新提醒列表 - 以给定列表整体替换当前内容"""
+        with self._lock:
+            self._reminders = {r.id: r for r in reminders if r.is_active and not r.is_completed}
+
+    def apply_reminder_changes(self, changes: List[ReminderChange]):
+        """应用提醒增量 - 倒计时由渲染器按时钟计算，忽略刷新事件"""
+        with self._lock:
+            for change in changes:
+                if change.change_type in (ChangeType.TICK, ChangeType.ACKNOWLEDGED):
+                    continue
+                reminder = change.reminder
+                if (change.change_type == ChangeType.REMOVED or reminder is None
+                        or not reminder.is_active or reminder.is_completed):
+                    self._reminders.pop(change.reminder_id, None)
+                else:
+                    self._reminders[reminder.id] = reminder
+
+    def add_log_message(self, message: str):
+        """添加日志消息 - 写入系统日志"""
+        self.logger.info(message)
@@ -3,48 +3,46 @@
 语音助手模块 - 处理语音识别、自然语言理解和语音合成
 """
 
-from aip import AipSpeech
-import openai
-import pygame
 import io
 import json
 import re
 import logging
-import pyaudio
+import time
 import wave
 import tempfile
 import os
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple
 
-from config import (DEEPSEEK_API_KEY, DEEPSEEK_MODEL, DEEPSEEK_BASE_URL,
-                   BAIDU_APP_ID, BAIDU_API_KEY, BAIDU_SECRET_KEY,
-                   XUNFEI_APP_ID, XUNFEI_API_KEY, XUNFEI_API_SECRET,
-                   TTS_CONFIG, AUDIO_CONFIG)
+import config
+from config import DEEPSEEK_MODEL, DEEPSEEK_BASE_URL, TTS_CONFIG, AUDIO_CONFIG
 from src.xunfei_tts import XunfeiTTS
+from src.state_machine import CancellationToken, OperationCancelled, run_cancellable
+from src.audio_output import AudioOutputArbiter, SpeechPriority, UtteranceStatus
 
 class VoiceAssistant:
+    """语音助手
+    
+    百度语音识别(aip)、讯飞语音合成、DeepSeek客户端(openai)、录音(pyaudio)
+    和播放(pygame)都在第一次使用时才导入和初始化(API密钥也在这时读取)，构造
+    本身不加载这些库。warm_up() 可以在系统启动完成后于后台线程提前初始化，
+    避免第一次录音或播报时等待。
+    """
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self._backend_lock = threading.RLock()
         
-        # 初始化百度语音识别
+        # 百度语音识别、讯飞语音合成、录音、播放和DeepSeek客户端 - 第一次使用时初始化
         self.aip_speech = None
-        self._init_baidu_speech()
-        
-        # 初始化科大讯飞语音合成
-        self.xunfei_tts = XunfeiTTS(XUNFEI_APP_ID, XUNFEI_API_KEY, XUNFEI_API_SECRET)
-        
-        # 初始化音频录制
-        self.audio = pyaudio.PyAudio()
-        
-        # 初始化pygame用于音频播放
-        pygame.mixer.init()
+        self._xunfei_tts = None
+        self._audio = None
+        self._pygame = None
+        self._openai_client = None
         
-        # 初始化DeepSeek客户端
-        self.openai_client = openai.OpenAI(
-            api_key=DEEPSEEK_API_KEY,
-            base_url=DEEPSEEK_BASE_URL
-        )
+        # 所有播报经同一个播放线程按优先级输出
+        self.output = AudioOutputArbiter(self._synthesize, lambda: self.pygame)
         
         # 移除jieba初始化，使用优化的LLM语义识别
         
@@ -53,19 +51,87 @@ class VoiceAssistant:
     def _init_baidu_speech(self):
         """初始化百度语音识别客户端"""
         try:
-            self.aip_speech = AipSpeech(BAIDU_APP_ID, BAIDU_API_KEY, BAIDU_SECRET_KEY)
+            from aip import AipSpeech
+            self.aip_speech = AipSpeech(config.BAIDU_APP_ID, config.BAIDU_API_KEY, config.BAIDU_SECRET_KEY)
             self.logger.info("百度语音识别客户端初始化成功")
         except Exception as e:
             self.logger.error(f"百度语音识别客户端初始化失败: {e}")
     
+    @property
+    def xunfei_tts(self) -> XunfeiTTS:
+        """科大讯飞语音合成客户端"""
+        with self._backend_lock:
+            if self._xunfei_tts is None:
+                self._xunfei_tts = XunfeiTTS(config.XUNFEI_APP_ID, config.XUNFEI_API_KEY, config.XUNFEI_API_SECRET)
+            return self._xunfei_tts
+    
+    @property
+    def audio(self):
+        """录音用的PyAudio实例"""
+        with self._backend_lock:
+            if self._audio is None:
+                import pyaudio
+                self._audio = pyaudio.PyAudio()
+            return self._audio
+    
+    @property
+    def pygame(self):
+        """已初始化音频播放(mixer)的pygame模块"""
+        with self._backend_lock:
+            if self._pygame is None:
+                import pygame
+                pygame.mixer.init()
+                self._pygame = pygame
+            return self._pygame
+    
+    @property
+    def openai_client(self):
+        """DeepSeek客户端(OpenAI兼容接口)"""
+        with self._backend_lock:
+            if self._openai_client is None:
+                import openai
+                self._openai_client = openai.OpenAI(
+                    api_key=config.DEEPSEEK_API_KEY,
+                    base_url=DEEPSEEK_BASE_URL
+                )
+            return self._openai_client
+    
+    def warm_up(self):
+        """提前初始化所有语音相关的库，单项失败只记录日志，第一次使用时会再次尝试"""
+        for name, init in (("语音播放", lambda: self.pygame),
+                           ("录音设备", lambda: self.audio),
+                           ("百度语音识别", self._ensure_baidu_speech),
+                           ("讯飞语音合成", lambda: self.xunfei_tts),
+                           ("大语言模型客户端", lambda: self.openai_client)):
+            started = time.perf_counter()
+            try:
+                if init() is None:
+                    raise RuntimeError("初始化失败")
+                self.logger.info(f"{name}预热完成，耗时 {(time.perf_counter() - started) * 1000:.0f} ms")
+            except Exception as e:
+                self.logger.error(f"{name}预热失败: {e}")
+    
+    @staticmethod
+    def _check_cancelled(cancel_token: Optional[CancellationToken]):
+        """操作已取消时抛出 OperationCancelled - 每次网络请求之前调用"""
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+    
+    def _ensure_baidu_speech(self):
+        """百度语音识别客户端未初始化时初始化"""
+        with self._backend_lock:
+            if self.aip_speech is None:
+                self._init_baidu_speech()
+        return self.aip_speech
+    
     # 移除jieba相关方法，使用优化的LLM语义识别
     
-    def _record_audio(self, duration: int = 5) -> Optional[str]:
-        """录制音频并保存为临时文件"""
+    def _record_audio(self, duration: int = 5, cancel_token: Optional[CancellationToken] = None) -> Optional[str]:
+        """录制音频并保存为临时文件 - 每读一块检查一次取消，取消后关闭录音流并抛出 OperationCancelled"""
         try:
             # 音频参数
             chunk = AUDIO_CONFIG['CHUNK_SIZE']
-            format = pyaudio.paInt16
+            format = self.audio.get_format_from_width(2)  # 16位采样
             channels = AUDIO_CONFIG['CHANNELS']
             rate = AUDIO_CONFIG['SAMPLE_RATE']
             
@@ -81,12 +147,16 @@ class VoiceAssistant:
             self.logger.info("开始录音...")
             frames = []
             
-            for _ in range(0, int(rate / chunk * duration)):
-                data = stream.read(chunk)
-                frames.append(data)
-            
-            stream.stop_stream()
-            stream.close()
+            try:
+                for _ in range(0, int(rate / chunk * duration)):
+                    if cancel_token is not None and cancel_token.cancelled:
+                        self.logger.info("录音已取消")
+                        raise OperationCancelled()
+                    data = stream.read(chunk)
+                    frames.append(data)
+            finally:
+                stream.stop_stream()
+                stream.close()
             
             # 保存为临时文件
             temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
@@ -100,33 +170,46 @@ class VoiceAssistant:
             self.logger.info("录音完成")
             return temp_file.name
             
+        except OperationCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"录音失败: {e}")
             return None
     
-    def listen_for_speech(self, timeout: int = 5) -> Optional[str]:
-        """监听语音输入并转换为文本 - 增强错误处理和重试机制"""
+    def listen_for_speech(self, timeout: int = 5, cancel_token: Optional[CancellationToken] = None,
+                          recorded_audio: Optional[bytes] = None) -> Optional[str]:
+        """监听语音输入并转换为文本 - 增强错误处理和重试机制，取消后抛出 OperationCancelled
+
+        recorded_audio 为已经录好的WAV数据(连续监听模式唤醒后的一句话)时不再录音，直接识别。
+        """
         max_retries = 3
         
         for attempt in range(max_retries):
+            self._check_cancelled(cancel_token)
             try:
-                # 录制音频
-                audio_file = self._record_audio(timeout)
-                if not audio_file:
-                    return None
-                
-                # 读取音频文件
-                with open(audio_file, 'rb') as f:
-                    audio_data = f.read()
+                if recorded_audio is None:
+                    # 录制音频
+                    audio_file = self._record_audio(timeout, cancel_token)
+                    if not audio_file:
+                        return None
+                    
+                    # 读取音频文件
+                    with open(audio_file, 'rb') as f:
+                        audio_data = f.read()
+                    os.unlink(audio_file)
+                else:
+                    audio_data = recorded_audio
                 
                 # 检查音频文件大小
                 if len(audio_data) < 1000:  # 音频文件太小
                     self.logger.warning(f"音频文件过小 ({len(audio_data)} bytes)，可能录音失败")
-                    os.unlink(audio_file)
-                    if attempt == max_retries - 1:
+                    if attempt == max_retries - 1 or recorded_audio is not None:
                         return None
                     continue
                 
+                # 取消后不再发起识别请求
+                self._check_cancelled(cancel_token)
+                
                 # 使用百度语音识别
                 self.logger.info(f"正在识别语音... (尝试 {attempt + 1})")
                 
@@ -134,15 +217,15 @@ class VoiceAssistant:
                 if attempt > 0:
                     self.logger.info("重新初始化百度语音客户端")
                     self._init_baidu_speech()
+                else:
+                    self._ensure_baidu_speech()
                 
-                result = self.aip_speech.asr(audio_data, 'wav', AUDIO_CONFIG['SAMPLE_RATE'], {
+                # 识别请求无法从外部中止，取消时不再等待响应
+                result = run_cancellable(self.aip_speech.asr, cancel_token, audio_data, 'wav', AUDIO_CONFIG['SAMPLE_RATE'], {
                     'dev_pid': 1537,  # 中文普通话
                     'cuid': 'voice_assistant_' + str(int(datetime.now().timestamp())),  # 添加唯一标识
                 })
                 
-                # 清理临时文件
-                os.unlink(audio_file)
-                
                 # 详细的结果处理
                 self.logger.info(f"百度API响应: {result}")
                 
@@ -169,6 +252,8 @@ class VoiceAssistant:
                         return None
                     continue
                     
+            except OperationCancelled:
+                raise
             except KeyError as e:
                 self.logger.error(f"语音识别KeyError (尝试 {attempt + 1}): {e}")
                 if 'access_token' in str(e):
@@ -186,82 +271,73 @@ class VoiceAssistant:
         self.logger.error("语音识别多次重试后仍然失败")
         return None
     
-    def speak(self, text: str):
-        """语音播报文本 - 播放完成后自动删除音频文件"""
-        audio_file = None
+    def speak(self, text: str, cancel_token: Optional[CancellationToken] = None,
+              priority: SpeechPriority = SpeechPriority.INTERACTIVE):
+        """语音播报文本 - 交给语音输出调度器排队播放，阻塞到播放结束
+
+        各线程的播报由同一个播放线程按优先级依次播放，不会互相覆盖；
+        操作已取消时不再合成和播放。
+        """
+        if cancel_token is not None and cancel_token.cancelled:
+            self.logger.info(f"操作已取消，跳过播报: {text}")
+            return
+        self.logger.info(f"语音播报: {text}")
+        utterance = self.output.submit(text, priority, cancel_token)
+        utterance.wait()
+        
+        if utterance.status == UtteranceStatus.PLAYED:
+            self.logger.info(f"音频播放完成，排队 {(utterance.started_at - utterance.submitted_at) * 1000:.0f} ms")
+        elif utterance.status == UtteranceStatus.CANCELLED:
+            self.logger.info(f"播报已取消: {text}")
+        elif utterance.status == UtteranceStatus.INTERRUPTED:
+            self.logger.info(f"音频播放被打断: {text}")
+        else:
+            self.logger.error(f"语音播报失败: {utterance.status.value} {utterance.error or ''}")
+    
+    def _synthesize(self, text: str, cancel_token: Optional[CancellationToken] = None) -> Optional[str]:
+        """合成播报音频，返回音频文件路径 - 在语音输出调度器的合成线程中调用"""
         try:
-            self.logger.info(f"语音播报: {text}")
-            
             # 使用科大讯飞语音合成
             audio_file = self.xunfei_tts.synthesis(
                 text,
                 voice=TTS_CONFIG['VOICE'],
                 speed=TTS_CONFIG['SPEED'],
                 pitch=TTS_CONFIG['PITCH'],
-                volume=TTS_CONFIG['VOLUME']
+                volume=TTS_CONFIG['VOLUME'],
+                cancel_token=cancel_token
             )
-            
-            if audio_file and os.path.exists(audio_file):
-                # 检查文件大小，确保音频文件有效
-                file_size = os.path.getsize(audio_file)
-                if file_size < 1000:  # 音频文件太小，可能无效
-                    self.logger.warning(f"音频文件过小 ({file_size} bytes)，可能合成失败")
-                    raise Exception(f"音频文件过小: {file_size} bytes")
-                
-                self.logger.info(f"开始播放音频文件: {audio_file} (大小: {file_size} bytes)")
-                
-                # 播放音频文件
-                try:
-                    pygame.mixer.music.load(audio_file)
-                    pygame.mixer.music.play()
-                    
-                    # 等待播放完成
-                    while pygame.mixer.music.get_busy():
-                        pygame.time.wait(100)
-                        
-                    self.logger.info("音频播放完成")
-                except pygame.error as pe:
-                    self.logger.error(f"pygame播放错误: {pe}")
-                    raise Exception(f"音频播放失败: {pe}")
-                
-            else:
-                error_msg = "科大讯飞语音合成失败" if not audio_file else f"音频文件不存在: {audio_file}"
-                self.logger.error(error_msg)
-                raise Exception(error_msg)
-                
-        except Exception as e:
-            self.logger.error(f"语音播报失败: {e}")
-            # 可以在这里添加备用TTS方案
-            # self._fallback_tts(text)
-        finally:
-            # 确保音频文件被删除（带重试机制）
-            if audio_file and os.path.exists(audio_file):
-                import time
-                max_retries = 3
-                for attempt in range(max_retries):
-                    try:
-                        # 确保pygame释放文件句柄
-                        try:
-                            pygame.mixer.music.stop()
-                            pygame.mixer.music.unload()
-                        except:
-                            pass  # 忽略pygame清理错误
-                        time.sleep(0.1)  # 短暂等待
-                        
-                        os.unlink(audio_file)
-                        self.logger.info(f"已删除临时音频文件: {audio_file}")
-                        break
-                    except Exception as e:
-                        if attempt == max_retries - 1:
-                            self.logger.warning(f"删除临时音频文件失败 (尝试 {attempt + 1}): {e}")
-                        else:
-                            time.sleep(0.2)  # 等待后重试
+        except OperationCancelled:
+            return None
+        
+        if not audio_file or not os.path.exists(audio_file):
+            self.logger.error("科大讯飞语音合成失败" if not audio_file else f"音频文件不存在: {audio_file}")
+            return None
+        
+        # 检查文件大小，确保音频文件有效
+        file_size = os.path.getsize(audio_file)
+        if file_size < 1000:  # 音频文件太小，可能无效
+            self.logger.warning(f"音频文件过小 ({file_size} bytes)，可能合成失败")
+            os.unlink(audio_file)
+            return None
+        return audio_file
     
-    def parse_intent(self, text: str) -> Optional[Dict]:
-        """解析提醒意图和时间 - 使用增强可靠性的LLM语义识别"""
+    def stop_speaking(self, priority: Optional[SpeechPriority] = None):
+        """立即停止当前播报并清空等待中的播报 - 可在任意线程调用
+
+        priority 不为None时只停止该优先级的播报。
+        """
+        self.output.interrupt(priority)
+    
+    def shutdown(self):
+        """停止语音输出调度器"""
+        self.output.shutdown()
+    
+    def parse_intent(self, text: str, cancel_token: Optional[CancellationToken] = None) -> Optional[Dict]:
+        """解析提醒意图和时间 - 使用增强可靠性的LLM语义识别，取消后抛出 OperationCancelled"""
         max_retries = 3
         
         for attempt in range(max_retries):
+            self._check_cancelled(cancel_token)
             try:
                 # 构建增强可靠性的LLM提示词
                 prompt = f"""
@@ -329,7 +405,9 @@ class VoiceAssistant:
                 请严格按照JSON格式返回，不要添加任何解释文字。
                 """
                 
-                response = self.openai_client.chat.completions.create(
+                # 大模型请求无法从外部中止，取消时不再等待响应
+                response = run_cancellable(
+                    self.openai_client.chat.completions.create, cancel_token,
                     model=DEEPSEEK_MODEL,
                     messages=[
                         {"role": "system", "content": "你是一个高精度的语音助手，专门解析老年人的提醒需求。必须严格按照JSON格式输出。"},
@@ -357,6 +435,8 @@ class VoiceAssistant:
                     self.logger.warning(f"解析结果验证失败，尝试重试 (尝试 {attempt + 1})")
                     continue
                     
+            except OperationCancelled:
+                raise
             except json.JSONDecodeError as e:
                 self.logger.error(f"JSON解析失败 (尝试 {attempt + 1}): {e}, 原始响应: {result_text if 'result_text' in locals() else 'N/A'}")
                 if attempt == max_retries - 1:
@@ -818,17 +898,26 @@ class VoiceAssistant:
         time_str = reminder_time.strftime("%H:%M")
         return f"好的，我会在{day_str}{time_str}提醒您{task}。"
     
-    def process_voice_command(self) -> Optional[Dict]:
-        """处理完整的语音命令流程"""
+    def process_voice_command(self, cancel_token: Optional[CancellationToken] = None,
+                              on_transcribed: Optional[Callable[[str], None]] = None,
+                              recorded_audio: Optional[bytes] = None) -> Optional[Dict]:
+        """处理完整的语音命令流程
+        
+        cancel_token 被取消后不再发起新的识别、大模型或合成请求，抛出 OperationCancelled；
+        on_transcribed 在语音识别出文字后调用；recorded_audio 为已录好的WAV数据时不再录音。
+        """
         # 1. 监听语音
-        text = self.listen_for_speech()
+        text = self.listen_for_speech(cancel_token=cancel_token, recorded_audio=recorded_audio)
         if not text:
             return None
+        if on_transcribed:
+            on_transcribed(text)
 
         # 2. 解析意图
-        intent_result = self.parse_intent(text)
+        intent_result = self.parse_intent(text, cancel_token=cancel_token)
+        self._check_cancelled(cancel_token)
         if not intent_result:
-            self.speak("抱歉，我没有理解您的意思，请再说一遍。")
+            self.speak("抱歉，我没有理解您的意思，请再说一遍。", cancel_token)
             return None
 
         # 3. 处理不同意图
@@ -854,7 +943,7 @@ class VoiceAssistant:
                     intent_result['task'], 
                     reminder_time
                 )
-                self.speak(confirmation)
+                self.speak(confirmation, cancel_token)
                 
                 return {
                     'type': 'reminder',
@@ -863,17 +952,34 @@ class VoiceAssistant:
                 
             except Exception as e:
                 self.logger.error(f"处理提醒设置失败: {e}")
-                self.speak("抱歉，设置提醒时出现了问题。")
+                self.speak("抱歉，设置提醒时出现了问题。", cancel_token)
                 return None
         
         else:
             # 其他类型的对话
-            self.speak("我主要负责帮您设置提醒，请告诉我需要提醒什么事情。")
+            self.speak("我主要负责帮您设置提醒，请告诉我需要提醒什么事情。", cancel_token)
             return {
                 'type': 'chat',
                 'data': {'message': intent_result.get('message', text)}
             }
     
+    def parse_reminder(self, text: str) -> Optional[Dict]:
+        """将一行文字解析为提醒(不播报)，返回 {'task', 'time'}，不是提醒时返回None"""
+        intent_result = self.parse_intent(text)
+        if not intent_result or intent_result.get('intent') != 'set_reminder':
+            return None
+        try:
+            reminder_time = self.calculate_reminder_time(
+                intent_result['time_value'],
+                intent_result['time_unit'],
+                intent_result.get('hour'),
+                intent_result.get('minute')
+            )
+        except Exception as e:
+            self.logger.error(f"计算提醒时间失败: {e}")
+            return None
+        return {'task': intent_result['task'], 'time': reminder_time}
+    
     def process_child_message(self, message: str, sender: str = "子女") -> Optional[Dict]:
         """处理子女发送的消息，识别是否包含时间提醒项目"""
         try:
@@ -907,7 +1013,7 @@ class VoiceAssistant:
                         reminder_time
                     )
                     repeat_message = f"收到{sender}的提醒消息：{intent_result['task']}。{confirmation}"
-                    self.speak(repeat_message)
+                    self.speak(repeat_message, priority=SpeechPriority.MESSAGE)
                     
                     self.logger.info(f"从{sender}消息中成功提取提醒: {intent_result['task']}")
                     
@@ -920,12 +1026,12 @@ class VoiceAssistant:
                 except Exception as e:
                     self.logger.error(f"处理{sender}消息中的提醒失败: {e}")
                     error_message = f"收到{sender}的消息，但设置提醒时出现了问题。"
-                    self.speak(error_message)
+                    self.speak(error_message, priority=SpeechPriority.MESSAGE)
                     return None
             else:
                 # 普通消息，没有提醒内容
                 normal_message = f"收到{sender}的消息：{message}"
-                self.speak(normal_message)
+                self.speak(normal_message, priority=SpeechPriority.MESSAGE)
                 
                 return {
                     'type': 'message',
@@ -0,0 +1,474 @@
+# -*- coding: utf-8 -*-
+"""
+唤醒词模块 - 连续监听模式的本地语音检测和唤醒词识别
+
+不访问网络，也不依赖额外的库：按音量检测语音段(VAD)，语音段结束后用其开头部分与
+预先录制的唤醒词样本按帧特征做动态时间规整(DTW)比较。识别出唤醒词之后的一句话
+才会交给语音识别。
+
+用法:
+    python -m src.wake_word --enroll 3      # 录制3个唤醒词样本
+    python -m src.wake_word --listen        # 实时显示每句话与样本的距离，用于调整阈值
+"""
+
+import io
+import os
+import math
+import time
+import wave
+import logging
+import threading
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from operator import mul
+from typing import Callable, List, Optional, Tuple
+
+from config import AUDIO_CONFIG, WAKE_WORD_CONFIG
+
+FEATURE_FRAME_MS = 20    # 特征帧长(毫秒)
+START_SLACK_FRAMES = 10  # 唤醒词可以在语音段开始后这么多帧内开始(端点检测的误差)
+MAX_STRETCH = 1.6        # 唤醒词语速与样本相比的最大伸缩比例
+MIN_COMMAND_SECONDS = 0.3  # 唤醒词之后的语音至少这么长才视为同一句中的指令
+
+# WakeWordGate.feed() 返回的事件
+WAKE = 'wake'        # 识别出唤醒词
+COMMAND = 'command'  # 唤醒后的一句话(WAV数据)
+TIMEOUT = 'timeout'  # 唤醒后没有等到指令
+
+def pcm_to_samples(data: bytes) -> array:
+    """16位PCM数据转为采样数组"""
+    samples = array('h')
+    samples.frombytes(data[:len(data) - len(data) % 2])
+    return samples
+
+def samples_to_wav(samples: array, rate: int) -> bytes:
+    """采样数组转为WAV文件内容(语音识别的输入格式)"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+def read_wav(path: str) -> Tuple[array, int]:
+    """读取16位单声道WAV文件，返回 (采样数组, 采样率)"""
+    with wave.open(path, 'rb') as wf:
+        if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+            raise ValueError(f"只支持16位单声道WAV: {path}")
+        return pcm_to_samples(wf.readframes(wf.getnframes())), wf.getframerate()
+
+def rms(samples) -> float:
+    """均方根音量"""
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(map(mul, samples, samples)) / len(samples))
+
+def frame_features(samples: array, rate: int, norm_frames: Optional[int] = None) -> List[Tuple[float, ...]]:
+    """每20ms一帧的特征: (相对对数能量, 一阶差分能量比, 二阶差分能量比, 过零率)
+
+    差分相当于简单的高通滤波，差分能量比反映频谱倾斜(元音、辅音的区别)，与音量无关；
+    对数能量减去前 norm_frames 帧中的最大值，只保留音量的起伏。
+    """
+    size = rate * FEATURE_FRAME_MS // 1000
+    frames = []
+    for start in range(0, len(samples) - size + 1, size):
+        x = samples[start:start + size]
+        d1 = [b - a for a, b in zip(x, x[1:])]
+        d2 = [b - a for a, b in zip(d1, d1[1:])]
+        e0 = math.log(sum(map(mul, x, x)) / size + 1.0)
+        e1 = math.log(sum(map(mul, d1, d1)) / size + 1.0)
+        e2 = math.log(sum(map(mul, d2, d2)) / size + 1.0)
+        crossings = sum(1 for a, b in zip(x, x[1:]) if (a < 0) != (b < 0))
+        frames.append((e0, e1 - e0, e2 - e1, crossings * 10.0 / size))
+    if not frames:
+        return []
+    peak = max(f[0] for f in frames[:norm_frames or len(frames)])
+    return [((e0 - peak) * 0.5, t1, t2, z) for e0, t1, t2, z in frames]
+
+def subsequence_distance(template: List[Tuple[float, ...]], frames: List[Tuple[float, ...]]) -> Tuple[float, int]:
+    """样本与 frames 开头部分的DTW距离(结束位置不固定)
+
+    返回 (平均帧距离, 匹配结束后的帧号)；frames 太短时距离为无穷大。
+    """
+    n = len(template)
+    m = min(len(frames), int(n * MAX_STRETCH) + START_SLACK_FRAMES)
+    if n == 0 or m < n / MAX_STRETCH:
+        return math.inf, 0
+
+    inf = math.inf
+    # 第0行: 匹配可以从前 START_SLACK_FRAMES 帧中的任意一帧开始
+    prev = [0.0 if j <= START_SLACK_FRAMES else inf for j in range(m + 1)]
+    for i in range(1, n + 1):
+        t0, t1, t2, t3 = template[i - 1]
+        cur = [inf] * (m + 1)
+        for j in range(1, m + 1):
+            f0, f1, f2, f3 = frames[j - 1]
+            cost = math.sqrt((t0 - f0) ** 2 + (t1 - f1) ** 2 + (t2 - f2) ** 2 + (t3 - f3) ** 2)
+            best = prev[j - 1]
+            if prev[j] < best:
+                best = prev[j]
+            if cur[j - 1] < best:
+                best = cur[j - 1]
+            cur[j] = cost + best
+        prev = cur
+
+    # 按路径长度归一化，选择最佳的结束位置
+    first_end = max(1, int(n / MAX_STRETCH))
+    distance, end = min((prev[j] / (n + j), j) for j in range(first_end, m + 1))
+    return distance, end
+
+def trim_silence(samples: array, rate: int, ratio: float = 0.1) -> array:
+    """去掉样本录音首尾音量低于峰值 ratio 倍的部分"""
+    size = rate * FEATURE_FRAME_MS // 1000
+    levels = [rms(samples[i:i + size]) for i in range(0, len(samples), size)]
+    if not levels:
+        return samples
+    floor = max(levels) * ratio
+    voiced = [i for i, level in enumerate(levels) if level >= floor]
+    return samples[voiced[0] * size:(voiced[-1] + 1) * size]
+
+@dataclass
+class WakeMatch:
+    """一次唤醒词匹配结果"""
+    distance: float   # 与最接近的样本的平均帧距离
+    end_sample: int   # 唤醒词在语音段中结束的位置(采样点)
+    template: str     # 最接近的样本名称
+
+class WakeWordDetector:
+    """唤醒词识别 - 语音段开头与每个样本比较，取距离最小的"""
+
+    def __init__(self, template_dir: str = None, threshold: float = None, rate: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.template_dir = template_dir or WAKE_WORD_CONFIG['TEMPLATE_DIR']
+        self.threshold = threshold if threshold is not None else WAKE_WORD_CONFIG['THRESHOLD']
+        self.rate = rate or AUDIO_CONFIG['SAMPLE_RATE']
+        self.templates: List[Tuple[str, List[Tuple[float, ...]]]] = []
+
+    def load_templates(self) -> int:
+        """读取样本目录中的WAV文件，返回样本数"""
+        self.templates = []
+        if not os.path.isdir(self.template_dir):
+            return 0
+        for name in sorted(os.listdir(self.template_dir)):
+            if not name.lower().endswith('.wav'):
+                continue
+            try:
+                samples, rate = read_wav(os.path.join(self.template_dir, name))
+                if rate != self.rate:
+                    raise ValueError(f"采样率 {rate} 与配置的 {self.rate} 不一致")
+                self.add_template(name, samples)
+            except Exception as e:
+                self.logger.error(f"读取唤醒词样本 {name} 失败: {e}")
+        self.logger.info(f"已加载 {len(self.templates)} 个唤醒词样本")
+        return len(self.templates)
+
+    def add_template(self, name: str, samples: array):
+        """添加一个唤醒词样本(首尾静音会被去掉)"""
+        features = frame_features(trim_silence(samples, self.rate), self.rate)
+        if features:
+            self.templates.append((name, features))
+
+    @property
+    def max_template_frames(self) -> int:
+        return max((len(features) for _, features in self.templates), default=0)
+
+    def best_match(self, samples: array) -> Optional[WakeMatch]:
+        """与所有样本比较，返回距离最小的结果(不检查阈值)"""
+        if not self.templates:
+            return None
+        window = int(self.max_template_frames * MAX_STRETCH) + START_SLACK_FRAMES
+        frame_size = self.rate * FEATURE_FRAME_MS // 1000
+        frames = frame_features(samples[:window * frame_size], self.rate, norm_frames=self.max_template_frames)
+        best = None
+        for name, template in self.templates:
+            distance, end = subsequence_distance(template, frames)
+            if best is None or distance < best.distance:
+                best = WakeMatch(distance, end * frame_size, name)
+        return best
+
+    def match(self, samples: array) -> Optional[WakeMatch]:
+        """语音段以唤醒词开头时返回匹配结果，否则返回None"""
+        best = self.best_match(samples)
+        if best and best.distance <= self.threshold:
+            return best
+        return None
+
+class EnergyVAD:
+    """按音量的语音活动检测 - 背景噪声电平自适应，每次输入一块PCM数据
+
+    音量超过 max(VAD_MIN_RMS, 噪声电平 x VAD_RATIO) 的块视为语音；语音开始前保留
+    两块数据，避免截掉起始的辅音。
+    """
+
+    def __init__(self, rate: int = None, chunk: int = None, ratio: float = None, min_rms: float = None,
+                 silence_ms: int = None, max_seconds: float = None):
+        self.rate = rate or AUDIO_CONFIG['SAMPLE_RATE']
+        self.chunk = chunk or AUDIO_CONFIG['CHUNK_SIZE']
+        self.ratio = ratio or WAKE_WORD_CONFIG['VAD_RATIO']
+        self.min_rms = min_rms if min_rms is not None else WAKE_WORD_CONFIG['VAD_MIN_RMS']
+        chunk_ms = self.chunk * 1000 / self.rate
+        self.silence_chunks = max(1, round((silence_ms or WAKE_WORD_CONFIG['SILENCE_MS']) / chunk_ms))
+        self.max_chunks = int((max_seconds or WAKE_WORD_CONFIG['MAX_SEGMENT_SECONDS']) * 1000 / chunk_ms)
+        self.noise = self.min_rms / self.ratio
+        self.reset()
+
+    def reset(self):
+        self._pre_roll: deque = deque(maxlen=2)
+        self._segment: List[bytes] = []
+        self._speech_chunks = 0
+        self._silent_chunks = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._segment)
+
+    @property
+    def threshold(self) -> float:
+        return max(self.min_rms, self.noise * self.ratio)
+
+    def is_speech(self, samples) -> bool:
+        return rms(samples) > self.threshold
+
+    def feed(self, data: bytes) -> Optional[bytes]:
+        """输入一块数据，一句话结束时返回这句话的PCM数据"""
+        level = rms(pcm_to_samples(data))
+        speech = level > self.threshold
+        if not self._segment:
+            if not speech:
+                self.noise = self.noise * 0.95 + level * 0.05
+                self._pre_roll.append(data)
+                return None
+            self._segment = list(self._pre_roll)
+            self._pre_roll.clear()
+
+        self._segment.append(data)
+        if speech:
+            self._speech_chunks += 1
+            self._silent_chunks = 0
+        else:
+            self._silent_chunks += 1
+        if self._silent_chunks < self.silence_chunks and len(self._segment) < self.max_chunks:
+            return None
+
+        segment, speech_chunks = b''.join(self._segment), self._speech_chunks
+        self._segment, self._speech_chunks, self._silent_chunks = [], 0, 0
+        return segment if speech_chunks >= 2 else None  # 单独的一块通常是碰撞声
+
+class WakeWordGate:
+    """唤醒词门控 - 只处理数据，不读写设备，便于用录音文件离线测试
+
+    feed() 逐块输入PCM数据，返回事件列表 [(WAKE, None), (COMMAND, WAV数据), (TIMEOUT, None)]。
+    语音段结束后才与唤醒词比较；唤醒词后没有停顿直接说出的内容与唤醒词在同一语音段中，
+    直接作为指令，否则在 COMMAND_TIMEOUT 秒内等待下一句话。
+    """
+
+    def __init__(self, detector: WakeWordDetector, vad: EnergyVAD = None, command_timeout: float = None):
+        self.detector = detector
+        self.vad = vad or EnergyVAD(rate=detector.rate)
+        timeout = command_timeout or WAKE_WORD_CONFIG['COMMAND_TIMEOUT']
+        self.timeout_chunks = int(timeout * self.vad.rate / self.vad.chunk)
+        self._awaiting_command = False
+        self._waited = 0
+        self.segments = 0   # 检测到的语音段数
+        self.wakes = 0      # 识别出的唤醒词次数
+        self.commands = 0   # 交给语音识别的指令数
+
+    def reset(self):
+        """丢弃未结束的语音段和等待中的指令"""
+        self.vad.reset()
+        self._awaiting_command = False
+
+    def feed(self, data: bytes) -> List[Tuple[str, Optional[bytes]]]:
+        segment = self.vad.feed(data)
+        if self._awaiting_command:
+            self._waited += 1
+            if segment:
+                self._awaiting_command = False
+                return [self._command(pcm_to_samples(segment))]
+            if self._waited >= self.timeout_chunks and not self.vad.in_speech:
+                self._awaiting_command = False
+                return [(TIMEOUT, None)]
+            return []
+
+        if segment is None:
+            return []
+        self.segments += 1
+        samples = pcm_to_samples(segment)
+        match = self.detector.match(samples)
+        if match is None:
+            return []
+
+        self.wakes += 1
+        rest = samples[match.end_sample:]
+        if self._speech_seconds(rest) >= MIN_COMMAND_SECONDS:
+            return [(WAKE, None), self._command(rest)]
+        self._awaiting_command = True
+        self._waited = 0
+        return [(WAKE, None)]
+
+    def _speech_seconds(self, samples: array) -> float:
+        chunk = self.vad.chunk
+        voiced = sum(1 for i in range(0, len(samples) - chunk + 1, chunk) if self.vad.is_speech(samples[i:i + chunk]))
+        return voiced * chunk / self.vad.rate
+
+    def _command(self, samples: array) -> Tuple[str, bytes]:
+        self.commands += 1
+        return COMMAND, samples_to_wav(samples, self.vad.rate)
+
+class ContinuousListener:
+    """连续监听 - 后台线程持续读取麦克风并通过唤醒词门控
+
+    on_wake() 在识别出唤醒词时调用，on_command(wav) 在唤醒后收到一句话时调用，
+    等不到指令时以None调用。is_enabled() 返回False时(系统正在录音、处理等)关闭录音流，
+    让出录音设备。回调在监听线程中执行，不应阻塞。
+    """
+
+    def __init__(self, audio, detector: WakeWordDetector, on_wake: Callable[[], None],
+                 on_command: Callable[[Optional[bytes]], None], is_enabled: Callable[[], bool] = None):
+        self.logger = logging.getLogger(__name__)
+        self.audio = audio
+        self.gate = WakeWordGate(detector)
+        self.on_wake = on_wake
+        self.on_command = on_command
+        self.is_enabled = is_enabled or (lambda: True)
+        self._stop_event = threading.Event()
+        self._released = threading.Event()
+        self._released.set()
+        self._thread: Optional[threading.Thread] = None
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """开始监听"""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='wake-word', daemon=True)
+        self._thread.start()
+        self.logger.info("连续监听已开始")
+
+    def stop(self, timeout: float = 1.0):
+        """停止监听并关闭录音流"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self.logger.info(f"连续监听已停止: {self.stats()}")
+
+    def wait_released(self, timeout: float) -> bool:
+        """等待监听线程关闭录音流，返回录音设备是否已释放"""
+        return self._released.wait(timeout)
+
+    def stats(self) -> dict:
+        """监听统计: 处理的音频时长、CPU占用和各类事件次数"""
+        return {
+            'audio_seconds': round(self.audio_seconds, 1),
+            'cpu_seconds': round(self.cpu_seconds, 3),
+            'cpu_percent': round(self.cpu_seconds / self.audio_seconds * 100, 2) if self.audio_seconds else 0.0,
+            'segments': self.gate.segments,
+            'wakes': self.gate.wakes,
+            'commands': self.gate.commands
+        }
+
+    def _run(self):
+        rate, chunk = self.gate.vad.rate, self.gate.vad.chunk
+        stream = None
+        try:
+            while not self._stop_event.is_set():
+                if not self.is_enabled():
+                    if stream:
+                        stream = self._close(stream)
+                        self.gate.reset()
+                    self._stop_event.wait(0.05)
+                    continue
+                if stream is None:
+                    self._released.clear()
+                    stream = self.audio.open(format=self.audio.get_format_from_width(2), channels=1, rate=rate,
+                                             input=True, frames_per_buffer=chunk)
+
+                started = time.thread_time()
+                data = stream.read(chunk, exception_on_overflow=False)
+                events = self.gate.feed(data)
+                self.cpu_seconds += time.thread_time() - started
+                self.audio_seconds += chunk / rate
+                for kind, payload in events:
+                    self._dispatch(kind, payload)
+        except Exception as e:
+            self.logger.error(f"连续监听失败: {e}")
+        finally:
+            if stream:
+                self._close(stream)
+
+    def _close(self, stream) -> None:
+        try:
+            stream.stop_stream()
+            stream.close()
+        except Exception as e:
+            self.logger.error(f"关闭录音流失败: {e}")
+        self._released.set()
+
+    def _dispatch(self, kind: str, payload: Optional[bytes]):
+        try:
+            if kind == WAKE:
+                self.logger.info("检测到唤醒词")
+                self.on_wake()
+            else:
+                self.on_command(payload)
+        except Exception as e:
+            self.logger.error(f"唤醒词回调失败: {e}")
+
+def _open_microphone(rate: int, chunk: int):
+    import pyaudio
+    audio = pyaudio.PyAudio()
+    stream = audio.open(format=pyaudio.paInt16, channels=1, rate=rate, input=True, frames_per_buffer=chunk)
+    return audio, stream
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="唤醒词样本录制和测试")
+    parser.add_argument('--enroll', type=int, default=0, help="录制的样本数")
+    parser.add_argument('--listen', action='store_true', help="实时显示每句话与样本的距离")
+    parser.add_argument('--dir', default=WAKE_WORD_CONFIG['TEMPLATE_DIR'], help="样本目录")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rate, chunk = AUDIO_CONFIG['SAMPLE_RATE'], AUDIO_CONFIG['CHUNK_SIZE']
+    audio, stream = _open_microphone(rate, chunk)
+    vad = EnergyVAD(rate, chunk)
+    try:
+        if args.enroll:
+            os.makedirs(args.dir, exist_ok=True)
+            for index in range(args.enroll):
+                print(f"[{index + 1}/{args.enroll}] 请说唤醒词...")
+                segment = None
+                while segment is None:
+                    segment = vad.feed(stream.read(chunk, exception_on_overflow=False))
+                path = os.path.join(args.dir, f"wake_{int(time.time())}_{index + 1}.wav")
+                with open(path, 'wb') as f:
+                    f.write(samples_to_wav(trim_silence(pcm_to_samples(segment), rate), rate))
+                print(f"已保存: {path}")
+
+        if args.listen:
+            detector = WakeWordDetector(args.dir)
+            if not detector.load_templates():
+                sys.exit("没有唤醒词样本，请先用 --enroll 录制")
+            print(f"阈值 {detector.threshold}，按 Ctrl+C 结束")
+            while True:
+                segment = vad.feed(stream.read(chunk, exception_on_overflow=False))
+                if segment:
+                    best = detector.best_match(pcm_to_samples(segment))
+                    mark = "唤醒" if best.distance <= detector.threshold else "    "
+                    print(f"{mark} 距离 {best.distance:.3f} ({best.template})")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream.stop_stream()
+        stream.close()
+        audio.terminate()
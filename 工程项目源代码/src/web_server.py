@@ -5,45 +5,124 @@ Web服务器模块 - 提供Web接口接收家庭消息
 
 import logging
 import json
+import math
+import uuid
+import hashlib
 from datetime import datetime
 from typing import Optional, Callable
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Response, request, jsonify, make_response, abort, g
 from flask_cors import CORS
 import threading
 
 from config import WEB_CONFIG
+from src.household import Household, HouseholdRegistry, DEFAULT_HOUSEHOLD
+from src.message_store import MessageStore
+from src.static_assets import StaticAssets
+from src.reminder_batch import parse_batch, parse_iso_time, format_batch_summary, is_text_entry
+from src.wsgi_server import create_backend
+
+def _default_household_attribute(name: str, doc: str) -> property:
+    """默认家庭属性的快捷访问(兼容单家庭时的接口，如 web_server.reminder_manager)"""
+    return property(lambda self: getattr(self.default_household, name),
+                    lambda self, value: setattr(self.default_household, name, value), doc=doc)
 
 class WebServer:
-    """Web服务器类"""
+    """Web服务器类
+    
+    不带前缀的地址访问本机默认家庭；/h/<家庭ID>/ 下是同样的页面和接口，
+    访问 add_household 登记的其他家庭，各家庭的数据和资源上限互相独立。
+    """
+    
+    message_store = _default_household_attribute('message_store', "消息历史")
+    events = _default_household_attribute('events', "事件推送 - 提醒变化、消息处理状态、语音播报")
+    ingest_queue = _default_household_attribute('ingest_queue', "消息处理队列 - 回调在后台线程执行，请求立即返回")
+    rate_limiter = _default_household_attribute('rate_limiter', "消息限流(按发送者和IP)")
+    duplicate_filter = _default_household_attribute('duplicate_filter', "重复消息过滤")
+    reminder_manager = _default_household_attribute('reminder_manager', "提醒接口 - 由主程序设置")
+    intent_parser = _default_household_attribute('intent_parser', "文字 -> {'task', 'time'}，所有家庭共用")
+    announce_callback = _default_household_attribute('announce_callback', "非阻塞语音播报")
+    audio_stats = _default_household_attribute('audio_stats', "语音输出队列统计 - 队列深度、各优先级等待时间")
     
-    def __init__(self, message_callback: Optional[Callable] = None):
+    def __init__(self, message_callback: Optional[Callable] = None,
+                 message_store: Optional[MessageStore] = None):
         self.logger = logging.getLogger(__name__)
-        self.app = Flask(__name__)
+        self.app = Flask(__name__, static_folder=None)  # 静态资源由 StaticAssets 预处理后提供
         CORS(self.app)  # 允许跨域请求
         
         self.message_callback = message_callback
+        self.server = None
         self.server_thread = None
+        self.port = None
+        self._instance = uuid.uuid4().hex[:8]  # 区分进程实例，重启后版本号重新计数也不会与旧ETag冲突
         self.running = False
         
-        # 消息历史
-        self.message_history = []
+        # 推送连接在整个连接期间占用一个工作线程 - 固定线程数的后端需要限制所有家庭的推送连接总数
+        self.event_stream_limit: Optional[int] = None
+        self._event_streams = 0
+        self._event_lock = threading.Lock()
+        
+        # 页面和静态资源 - 启动时渲染、压缩一次，所有家庭共用
+        self.assets = StaticAssets()
+        
+        # 家庭 - 本机默认家庭(消息历史默认持久化到 WEB_CONFIG['MESSAGE_DB'])和其他家庭
+        self.households = HouseholdRegistry()
+        self.default_household = Household(DEFAULT_HOUSEHOLD, message_callback, message_store)
+        self.households.add(self.default_household)
         
         # 设置路由
         self._setup_routes()
+        self._setup_reminder_routes()
         
         self.logger.info("Web服务器初始化完成")
     
+    def _route(self, rule: str, **options):
+        """注册家庭范围的路由 - rule 访问默认家庭，/h/<household_id>{rule} 访问指定家庭"""
+        def decorator(view):
+            self.app.add_url_rule(rule, view_func=view, **options)
+            self.app.add_url_rule(f"/h/<household_id>{rule}", view_func=view, **options)
+            return view
+        return decorator
+    
+    def _url(self, path: str) -> str:
+        """当前家庭下的接口地址"""
+        return f"{g.household_prefix}{path}"
+    
     def _setup_routes(self):
         """设置路由"""
         
-        @self.app.route('/')
+        @self.app.url_value_preprocessor
+        def pop_household_id(endpoint, values):
+            g.household_id = (values or {}).pop('household_id', None)
+        
+        @self.app.before_request
+        def resolve_household():
+            """确定请求所属的家庭，不存在时返回404"""
+            household_id = getattr(g, 'household_id', None)
+            g.household = self.households.get(household_id or DEFAULT_HOUSEHOLD)
+            g.household_prefix = f"/h/{household_id}" if household_id else ''
+            if g.household is None:
+                return jsonify({
+                    'success': False,
+                    'error': '家庭不存在'
+                }), 404
+        
+        @self._route('/')
         def index():
             """主页"""
-            return render_template_string(self._get_html_template())
+            return self.assets.response('/')
         
-        @self.app.route('/api/send_message', methods=['POST'])
+        @self.app.route('/static/<path:filename>')
+        def static_asset(filename):
+            """带内容指纹的静态资源"""
+            response = self.assets.response(f'/static/{filename}')
+            if response is None:
+                abort(404)
+            return response
+        
+        @self._route('/api/send_message', methods=['POST'])
         def send_message():
             """发送消息API"""
+            household = g.household
             try:
                 data = request.get_json()
                 
@@ -68,34 +147,62 @@ class WebServer:
                         'error': '消息长度不能超过200字符'
                     }), 400
                 
+                # 限流 - 同一发送者或同一IP发送过于频繁
+                limited = self._check_rate_limit(sender)
+                if limited:
+                    return limited
+                
                 # 记录消息
                 message_data = {
                     'message': message,
                     'sender': sender,
                     'timestamp': datetime.now().isoformat(),
-                    'id': len(self.message_history) + 1
+                    'id': household.message_store.reserve_id()
                 }
+                response_data = dict(message_data)
                 
-                self.message_history.append(message_data)
+                # 短时间内的重复消息(如重复点击、客户端重试)直接返回第一次的结果
+                duplicate_id = household.duplicate_filter.claim(message, message_data['id'])
+                if duplicate_id is not None:
+                    self.logger.info(f"忽略重复消息 - 发送者: {sender}, 内容: {message}")
+                    return jsonify({
+                        'success': True,
+                        'duplicate': True,
+                        'message': '相同的消息刚刚已发送',
+                        'data': household.message_store.get(duplicate_id) or {'id': duplicate_id},
+                        'status_url': self._url(f"/api/messages/{duplicate_id}")
+                    })
                 
-                # 保持历史记录在合理范围内
-                if len(self.message_history) > 50:
-                    self.message_history = self.message_history[-50:]
+                # 交给后台队列处理，队列已满时拒绝，不记录历史
+                if household.ingest_queue:
+                    job = household.ingest_queue.submit(message_data['id'], message, sender)
+                    if job is None:
+                        household.duplicate_filter.forget(message)
+                        response = jsonify({
+                            'success': False,
+                            'error': '消息处理繁忙，请稍后再试'
+                        })
+                        response.headers['Retry-After'] = str(WEB_CONFIG['INGEST_RETRY_AFTER'])
+                        return response, 503
+                    response_data['status'] = job['status']
+                
+                household.message_store.add(message_data)
                 
                 self.logger.info(f"收到消息 - 发送者: {sender}, 内容: {message}")
                 
-                # 调用回调函数
-                if self.message_callback:
-                    try:
-                        self.message_callback(message, sender)
-                    except Exception as e:
-                        self.logger.error(f"消息回调处理失败: {e}")
+                if not household.ingest_queue:
+                    return jsonify({
+                        'success': True,
+                        'message': '消息发送成功',
+                        'data': response_data
+                    })
                 
                 return jsonify({
                     'success': True,
-                    'message': '消息发送成功',
-                    'data': message_data
-                })
+                    'message': '消息已接收，正在处理',
+                    'data': response_data,
+                    'status_url': self._url(f"/api/messages/{message_data['id']}")
+                }), 202
                 
             except Exception as e:
                 self.logger.error(f"发送消息失败: {e}")
@@ -104,23 +211,37 @@ class WebServer:
                     'error': '服务器内部错误'
                 }), 500
         
-        @self.app.route('/api/messages', methods=['GET'])
+        @self._route('/api/messages', methods=['GET'])
         def get_messages():
-            """获取消息历史"""
+            """获取消息历史 - 支持 since_id(增量)/before_id(向前翻页) 游标和ETag"""
+            household = g.household
             try:
-                # 获取最近的消息
                 limit = request.args.get('limit', 10, type=int)
-                limit = min(limit, 50)  # 最多返回50条
+                limit = max(1, min(limit, WEB_CONFIG['MESSAGE_PAGE_LIMIT']))
+                since_id = request.args.get('since_id', type=int)
+                before_id = request.args.get('before_id', type=int)
                 
-                recent_messages = self.message_history[-limit:] if self.message_history else []
+                # 内容未变化时直接返回304，不查询也不序列化
+                etag = household.message_store.etag(since_id, before_id, limit)
+                if request.if_none_match.contains(etag):
+                    response = make_response('', 304)
+                    response.set_etag(etag)
+                    return response
                 
-                return jsonify({
+                messages, has_more = household.message_store.page(since_id, before_id, limit)
+                
+                response = jsonify({
                     'success': True,
                     'data': {
-                        'messages': recent_messages,
-                        'total': len(self.message_history)
+                        'messages': messages,
+                        'total': len(household.message_store),
+                        'has_more': has_more,
+                        'last_id': household.message_store.last_id
                     }
                 })
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
                 
             except Exception as e:
                 self.logger.error(f"获取消息历史失败: {e}")
@@ -129,16 +250,58 @@ class WebServer:
                     'error': '服务器内部错误'
                 }), 500
         
-        @self.app.route('/api/status', methods=['GET'])
+        @self._route('/api/messages/<int:message_id>', methods=['GET'])
+        def get_message_status(message_id):
+            """获取单条消息的处理状态和解析结果"""
+            household = g.household
+            job = household.ingest_queue.get(message_id) if household.ingest_queue else None
+            if not job:
+                return jsonify({
+                    'success': False,
+                    'error': '消息不存在或处理记录已过期'
+                }), 404
+            
+            return jsonify({
+                'success': True,
+                'data': job
+            })
+        
+        @self._route('/api/events', methods=['GET'])
+        def event_stream():
+            """推送提醒变化、消息处理状态和语音播报(Server-Sent Events)"""
+            household = g.household
+            last_event_id = request.headers.get('Last-Event-ID', type=int)
+            subscription = None
+            if self._acquire_event_stream():
+                subscription = household.events.subscribe(last_event_id, snapshot=household.build_snapshot)
+                if subscription is None:
+                    self._release_event_stream()
+            if subscription is None:
+                response = jsonify({
+                    'success': False,
+                    'error': '连接数已达上限'
+                })
+                response.headers['Retry-After'] = str(WEB_CONFIG['EVENT_HEARTBEAT'])
+                return response, 503
+            
+            response = Response(household.events.stream(subscription), mimetype='text/event-stream', headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'  # 经过nginx反向代理时禁用缓冲
+            })
+            response.call_on_close(self._release_event_stream)
+            return response
+        
+        @self._route('/api/status', methods=['GET'])
         def get_status():
             """获取系统状态"""
+            household = g.household
             try:
                 return jsonify({
                     'success': True,
                     'data': {
                         'status': 'running',
                         'timestamp': datetime.now().isoformat(),
-                        'message_count': len(self.message_history)
+                        **household.status()
                     }
                 })
             except Exception as e:
@@ -162,329 +325,453 @@ class WebServer:
                 'error': '服务器内部错误'
             }), 500
     
-    def _get_html_template(self) -> str:
-        """获取HTML模板"""
-        return """
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>语音助手 - 家庭消息</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: 'Microsoft YaHei', Arial, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            padding: 20px;
-        }
-        
-        .container {
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            padding: 40px;
-            max-width: 500px;
-            width: 100%;
-        }
-        
-        .header {
-            text-align: center;
-            margin-bottom: 30px;
-        }
-        
-        .header h1 {
-            color: #333;
-            font-size: 28px;
-            margin-bottom: 10px;
-        }
-        
-        .header p {
-            color: #666;
-            font-size: 16px;
-        }
-        
-        .form-group {
-            margin-bottom: 20px;
-        }
-        
-        label {
-            display: block;
-            margin-bottom: 8px;
-            color: #333;
-            font-weight: 500;
-        }
-        
-        input, textarea {
-            width: 100%;
-            padding: 12px 16px;
-            border: 2px solid #e1e5e9;
-            border-radius: 10px;
-            font-size: 16px;
-            transition: border-color 0.3s;
-        }
-        
-        input:focus, textarea:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        
-        textarea {
-            resize: vertical;
-            min-height: 120px;
-        }
-        
-        .btn {
-            width: 100%;
-            padding: 15px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border: none;
-            border-radius: 10px;
-            font-size: 18px;
-            font-weight: 500;
-            cursor: pointer;
-            transition: transform 0.2s;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-        }
-        
-        .btn:disabled {
-            opacity: 0.6;
-            cursor: not-allowed;
-            transform: none;
-        }
-        
-        .message {
-            padding: 12px 16px;
-            border-radius: 8px;
-            margin-bottom: 15px;
-            font-size: 14px;
-        }
-        
-        .message.success {
-            background: #d4edda;
-            color: #155724;
-            border: 1px solid #c3e6cb;
-        }
-        
-        .message.error {
-            background: #f8d7da;
-            color: #721c24;
-            border: 1px solid #f5c6cb;
-        }
-        
-        .char-count {
-            text-align: right;
-            font-size: 12px;
-            color: #666;
-            margin-top: 5px;
-        }
-        
-        .status {
-            text-align: center;
-            margin-top: 20px;
-            padding: 10px;
-            background: #f8f9fa;
-            border-radius: 8px;
-            font-size: 14px;
-            color: #666;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🏠 家庭消息</h1>
-            <p>向语音助手发送消息</p>
-        </div>
-        
-        <form id="messageForm">
-            <div class="form-group">
-                <label for="sender">发送者姓名:</label>
-                <input type="text" id="sender" name="sender" placeholder="请输入您的姓名" maxlength="20" required>
-            </div>
-            
-            <div class="form-group">
-                <label for="message">消息内容:</label>
-                <textarea id="message" name="message" placeholder="请输入要发送的消息..." maxlength="200" required></textarea>
-                <div class="char-count">
-                    <span id="charCount">0</span>/200
-                </div>
-            </div>
-            
-            <button type="submit" class="btn" id="sendBtn">
-                📤 发送消息
-            </button>
-        </form>
-        
-        <div id="messageArea"></div>
-        
-        <div class="status" id="status">
-            系统状态: 正常运行
-        </div>
-    </div>
+    def _acquire_event_stream(self) -> bool:
+        """占用一个推送连接名额，已达到工作线程允许的上限时返回False"""
+        with self._event_lock:
+            if self.event_stream_limit is not None and self._event_streams >= self.event_stream_limit:
+                return False
+            self._event_streams += 1
+            return True
     
-    <script>
-        const form = document.getElementById('messageForm');
-        const messageArea = document.getElementById('messageArea');
-        const sendBtn = document.getElementById('sendBtn');
-        const messageInput = document.getElementById('message');
-        const charCount = document.getElementById('charCount');
-        const statusDiv = document.getElementById('status');
-        
-        // 字符计数
-        messageInput.addEventListener('input', function() {
-            const count = this.value.length;
-            charCount.textContent = count;
-            
-            if (count > 180) {
-                charCount.style.color = '#dc3545';
-            } else if (count > 150) {
-                charCount.style.color = '#ffc107';
-            } else {
-                charCount.style.color = '#666';
-            }
-        });
-        
-        // 表单提交
-        form.addEventListener('submit', async function(e) {
-            e.preventDefault();
-            
-            const formData = new FormData(form);
-            const data = {
-                sender: formData.get('sender'),
-                message: formData.get('message')
-            };
-            
-            if (!data.message.trim()) {
-                showMessage('请输入消息内容', 'error');
-                return;
-            }
-            
-            sendBtn.disabled = true;
-            sendBtn.textContent = '发送中...';
-            
-            try {
-                const response = await fetch('/api/send_message', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify(data)
-                });
-                
-                const result = await response.json();
-                
-                if (result.success) {
-                    showMessage('消息发送成功！', 'success');
-                    form.reset();
-                    charCount.textContent = '0';
-                    charCount.style.color = '#666';
-                } else {
-                    showMessage(result.error || '发送失败', 'error');
-                }
-            } catch (error) {
-                showMessage('网络错误，请检查连接', 'error');
-            } finally {
-                sendBtn.disabled = false;
-                sendBtn.textContent = '📤 发送消息';
-            }
-        });
-        
-        function showMessage(text, type) {
-            const messageDiv = document.createElement('div');
-            messageDiv.className = `message ${type}`;
-            messageDiv.textContent = text;
-            
-            messageArea.innerHTML = '';
-            messageArea.appendChild(messageDiv);
-            
-            setTimeout(() => {
-                messageDiv.remove();
-            }, 5000);
-        }
-        
-        // 定期检查系统状态
-        async function checkStatus() {
-            try {
-                const response = await fetch('/api/status');
-                const result = await response.json();
-                
-                if (result.success) {
-                    statusDiv.textContent = `系统状态: 正常运行 | 消息数: ${result.data.message_count}`;
-                    statusDiv.style.color = '#28a745';
-                } else {
-                    statusDiv.textContent = '系统状态: 异常';
-                    statusDiv.style.color = '#dc3545';
-                }
-            } catch (error) {
-                statusDiv.textContent = '系统状态: 连接失败';
-                statusDiv.style.color = '#dc3545';
-            }
-        }
-        
-        // 每30秒检查一次状态
-        setInterval(checkStatus, 30000);
-        checkStatus();
-    </script>
-</body>
-</html>
-        """
+    def _release_event_stream(self):
+        with self._event_lock:
+            self._event_streams -= 1
     
-    def start(self, host: str = None, port: int = None, debug: bool = False):
-        """启动Web服务器"""
+    def start(self, host: str = None, port: int = None, debug: bool = False, backend: str = None):
+        """启动Web服务器
+        
+        backend 为服务后端名称(threaded/waitress)，默认使用 WEB_CONFIG['SERVER_BACKEND']；
+        port 为0时由系统分配端口，实际端口见 self.port
+        """
         if self.running:
             self.logger.warning("Web服务器已在运行")
             return
         
         host = host or WEB_CONFIG['HOST']
-        port = port or WEB_CONFIG['PORT']
-        debug = debug or WEB_CONFIG['DEBUG']
+        port = WEB_CONFIG['PORT'] if port is None else port
+        self.app.debug = debug or WEB_CONFIG['DEBUG']
+        
+        try:
+            self.server = create_backend(self.app, host, port, backend)
+        except Exception as e:
+            self.logger.error(f"Web服务器启动失败: {e}")
+            return
+        self.port = self.server.port
+        
+        # 固定线程数的后端为普通接口保留 EVENT_RESERVED_THREADS 个线程，推送连接最多占用其余线程
+        if self.server.worker_threads is not None:
+            self.event_stream_limit = max(self.server.worker_threads - WEB_CONFIG['EVENT_RESERVED_THREADS'], 0)
+            if self.event_stream_limit == 0:
+                self.logger.warning(f"工作线程数 {self.server.worker_threads} 不超过保留线程数，推送连接将被拒绝")
         
         def run_server():
             try:
-                self.logger.info(f"启动Web服务器: http://{host}:{port}")
-                self.app.run(host=host, port=port, debug=debug, use_reloader=False)
+                self.server.serve_forever()
             except Exception as e:
-                self.logger.error(f"Web服务器启动失败: {e}")
+                self.logger.error(f"Web服务器运行异常: {e}")
         
         self.running = True
-        self.server_thread = threading.Thread(target=run_server, daemon=True)
+        self.server_thread = threading.Thread(target=run_server, name="web-server", daemon=True)
         self.server_thread.start()
         
-        self.logger.info("Web服务器启动完成")
+        self.logger.info(f"Web服务器启动完成: http://{host}:{self.port} (后端: {self.server.name})")
+    
+    def _setup_reminder_routes(self):
+        """设置提醒接口路由 - 家属/护工远程查看、添加、修改、取消和延迟提醒
+        
+        集合资源的ETag为提醒数据版本号，单个提醒的ETag由其内容计算；
+        GET 支持 If-None-Match(未变化时返回304)，PATCH/DELETE 支持 If-Match(并发修改时返回412)。
+        """
+        
+        @self.app.before_request
+        def require_reminder_manager():
+            if request.path.startswith(f"{g.household_prefix}/api/reminders") and not g.household.reminder_manager:
+                return jsonify({
+                    'success': False,
+                    'error': '提醒服务未启用'
+                }), 503
+        
+        @self._route('/api/reminders', methods=['GET'])
+        def list_reminders():
+            """获取提醒列表 - status=active(默认)只返回待触发的提醒，status=all返回全部"""
+            household = g.household
+            status = request.args.get('status', 'active')
+            if status not in ('active', 'all'):
+                return jsonify({
+                    'success': False,
+                    'error': 'status 只能是 active 或 all'
+                }), 400
+            
+            etag = f"{self._instance}-{household.reminder_manager.version}-{status}"
+            if request.if_none_match.contains(etag):
+                return self._not_modified(etag)
+            
+            reminders = (household.reminder_manager.get_active_reminders() if status == 'active'
+                         else household.reminder_manager.get_all_reminders())
+            reminders.sort(key=lambda r: r.scheduled_time)
+            response = jsonify({
+                'success': True,
+                'data': {
+                    'reminders': [self._reminder_data(r) for r in reminders],
+                    'version': household.reminder_manager.version
+                }
+            })
+            return self._with_etag(response, etag)
+        
+        @self._route('/api/reminders/summary', methods=['GET'])
+        def reminder_summary():
+            """获取提醒状态摘要(与设备屏幕显示一致)
+            
+            摘要中的剩余时间精确到秒、紧急程度随时间变化，内容每秒都可能不同，因此不提供
+            ETag；需要条件请求时使用不含剩余时间的 /api/reminders。
+            """
+            response = jsonify({
+                'success': True,
+                'data': g.household.reminder_manager.get_status_summary()
+            })
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+        
+        @self._route('/api/reminders', methods=['POST'])
+        def create_reminder():
+            """添加单个提醒 - {task, time, recurrence} 不经过大模型，{text} 由大模型解析"""
+            household = g.household
+            try:
+                data = request.get_json(silent=True) or {}
+                sender = str(data.get('sender') or '家人').strip()
+                
+                limited = self._check_rate_limit(sender)
+                if limited:
+                    return limited
+                
+                entry = {'text': data['text']} if data.get('text') else data
+                items, errors = parse_batch([entry], self._intent_parser(household), datetime.now())
+                if errors:
+                    return jsonify({
+                        'success': False,
+                        'error': errors[0]['error']
+                    }), 400
+                
+                item = items[0]
+                reminder_id = household.reminder_manager.add_reminder(
+                    task=item['task'],
+                    scheduled_time=item['scheduled_time'],
+                    original_text=item['original_text'],
+                    recurrence=item['recurrence']
+                )
+                if not reminder_id:
+                    return jsonify({
+                        'success': False,
+                        'error': '提醒数量超过上限'
+                    }), 409
+                
+                self.logger.info(f"{sender} 远程添加提醒: {item['task']}")
+                if household.announce_callback and data.get('announce', True):
+                    household.announce_callback(format_batch_summary(sender, items))
+                
+                reminder = household.reminder_manager.get_reminder(reminder_id)
+                response = jsonify({
+                    'success': True,
+                    'data': self._reminder_data(reminder)
+                })
+                response.status_code = 201
+                response.headers['Location'] = self._url(f"/api/reminders/{reminder_id}")
+                return self._with_etag(response, self._reminder_etag(reminder))
+                
+            except Exception as e:
+                self.logger.error(f"添加提醒失败: {e}")
+                return jsonify({
+                    'success': False,
+                    'error': '服务器内部错误'
+                }), 500
+        
+        @self._route('/api/reminders/batch', methods=['POST'])
+        def add_reminders_batch():
+            """批量添加提醒 - 结构化提醒不经过大模型，整批一次提交，只播报一条摘要"""
+            household = g.household
+            try:
+                data = request.get_json(silent=True) or {}
+                sender = str(data.get('sender') or '家人').strip()
+                entries = data.get('items') or []
+                if not isinstance(entries, list):
+                    return jsonify({
+                        'success': False,
+                        'error': 'items 必须是列表'
+                    }), 400
+                entries = list(entries)
+                # 也可以用 text 字段一次提交多行文字，每行一个提醒
+                entries += [line for line in str(data.get('text') or '').splitlines() if line.strip()]
+                
+                if not entries:
+                    return jsonify({
+                        'success': False,
+                        'error': '提醒列表不能为空'
+                    }), 400
+                if len(entries) > WEB_CONFIG['BATCH_MAX_ITEMS']:
+                    return jsonify({
+                        'success': False,
+                        'error': f"单次最多添加{WEB_CONFIG['BATCH_MAX_ITEMS']}个提醒"
+                    }), 400
+                
+                # 每行文字提醒都是一次大模型请求，按行消耗限流令牌；结构化提醒只算整个请求一次
+                text_count = sum(1 for entry in entries if is_text_entry(entry))
+                burst = household.rate_limiter.burst
+                if text_count > burst:
+                    return jsonify({
+                        'success': False,
+                        'error': f"单次最多提交{burst}行文字提醒，更多提醒请使用结构化格式"
+                    }), 400
+                
+                limited = self._check_rate_limit(sender, max(text_count, 1))
+                if limited:
+                    return limited
+                
+                items, errors = parse_batch(entries, self._intent_parser(household), datetime.now())
+                if errors:
+                    # 任何一项有误都不添加，避免只设置了一部分
+                    return jsonify({
+                        'success': False,
+                        'error': '部分提醒无法添加，请修改后重新提交',
+                        'errors': errors
+                    }), 400
+                
+                reminder_ids = household.reminder_manager.add_reminders(items)
+                if reminder_ids is None:
+                    return jsonify({
+                        'success': False,
+                        'error': '提醒数量超过上限'
+                    }), 409
+                
+                self.logger.info(f"{sender} 批量添加了 {len(reminder_ids)} 个提醒")
+                if household.announce_callback and data.get('announce', True):
+                    household.announce_callback(format_batch_summary(sender, items))
+                
+                return jsonify({
+                    'success': True,
+                    'message': f'已添加{len(reminder_ids)}个提醒',
+                    'data': [
+                        self._reminder_data(household.reminder_manager.get_reminder(reminder_id))
+                        for reminder_id in reminder_ids
+                    ]
+                }), 201
+                
+            except Exception as e:
+                self.logger.error(f"批量添加提醒失败: {e}")
+                return jsonify({
+                    'success': False,
+                    'error': '服务器内部错误'
+                }), 500
+        
+        @self._route('/api/reminders/<reminder_id>', methods=['GET'])
+        def get_reminder(reminder_id):
+            """获取单个提醒"""
+            household = g.household
+            reminder = household.reminder_manager.get_reminder(reminder_id)
+            if not reminder:
+                return self._reminder_not_found()
+            
+            etag = self._reminder_etag(reminder)
+            if request.if_none_match.contains(etag):
+                return self._not_modified(etag)
+            return self._with_etag(jsonify({
+                'success': True,
+                'data': self._reminder_data(reminder)
+            }), etag)
+        
+        @self._route('/api/reminders/<reminder_id>', methods=['PATCH'])
+        def update_reminder(reminder_id):
+            """修改提醒
+            
+            支持的字段: task(修改内容)、time(ISO格式，改期)、snooze(延迟分钟数)、
+            acknowledged=true(代老人确认)、active=false(取消)
+            """
+            household = g.household
+            try:
+                reminder = household.reminder_manager.get_reminder(reminder_id)
+                if not reminder:
+                    return self._reminder_not_found()
+                failed = self._check_if_match(reminder)
+                if failed:
+                    return failed
+                
+                data = request.get_json(silent=True) or {}
+                scheduled_time = None
+                if data.get('time'):
+                    try:
+                        scheduled_time = parse_iso_time(str(data['time']))
+                    except ValueError:
+                        return jsonify({
+                            'success': False,
+                            'error': f"时间格式无效: {data['time']}"
+                        }), 400
+                    if scheduled_time <= datetime.now():
+                        return jsonify({
+                            'success': False,
+                            'error': '提醒时间已过'
+                        }), 400
+                snooze = data.get('snooze')
+                if snooze is not None and (not isinstance(snooze, int) or isinstance(snooze, bool) or snooze <= 0):
+                    return jsonify({
+                        'success': False,
+                        'error': 'snooze 必须是正整数(分钟)'
+                    }), 400
+                task = str(data['task']).strip() if data.get('task') else None
+                
+                if data.get('active') is False:
+                    household.reminder_manager.cancel_reminder(reminder_id)
+                if data.get('acknowledged') is True:
+                    household.reminder_manager.acknowledge_reminder(reminder_id)
+                if snooze is not None:
+                    household.reminder_manager.snooze_reminder(reminder_id, minutes=snooze)
+                if task or scheduled_time:
+                    household.reminder_manager.update_reminder(reminder_id, task=task, scheduled_time=scheduled_time)
+                
+                reminder = household.reminder_manager.get_reminder(reminder_id)
+                if not reminder:
+                    return self._reminder_not_found()
+                self.logger.info(f"远程修改提醒 {reminder.task}: {data}")
+                return self._with_etag(jsonify({
+                    'success': True,
+                    'data': self._reminder_data(reminder)
+                }), self._reminder_etag(reminder))
+                
+            except Exception as e:
+                self.logger.error(f"修改提醒失败: {e}")
+                return jsonify({
+                    'success': False,
+                    'error': '服务器内部错误'
+                }), 500
+        
+        @self._route('/api/reminders/<reminder_id>', methods=['DELETE'])
+        def delete_reminder(reminder_id):
+            """删除提醒"""
+            household = g.household
+            reminder = household.reminder_manager.get_reminder(reminder_id)
+            if not reminder:
+                return self._reminder_not_found()
+            failed = self._check_if_match(reminder)
+            if failed:
+                return failed
+            
+            if not household.reminder_manager.delete_reminder(reminder_id):
+                return self._reminder_not_found()
+            self.logger.info(f"远程删除提醒: {reminder.task}")
+            return '', 204
+    
+    def _reminder_data(self, reminder) -> dict:
+        """提醒的接口表示 - 不含随时间变化的剩余时间，客户端根据提醒时间计算"""
+        data = reminder.to_dict(with_countdown=False)
+        data['awaiting_ack'] = g.household.reminder_manager.is_awaiting_ack(reminder.id)
+        return data
+    
+    def _reminder_etag(self, reminder) -> str:
+        content = json.dumps(self._reminder_data(reminder), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+    
+    def _check_if_match(self, reminder):
+        """If-Match 与当前提醒不一致时返回412响应"""
+        if request.headers.get('If-Match') and not request.if_match.contains(self._reminder_etag(reminder)):
+            return jsonify({
+                'success': False,
+                'error': '提醒已被修改，请刷新后重试'
+            }), 412
+        return None
+    
+    def _check_rate_limit(self, sender: str, cost: int = 1):
+        """同一发送者或同一IP请求过于频繁时返回429响应 - cost 为本次请求消耗的令牌数"""
+        retry_after = g.household.rate_limiter.acquire([f"sender:{sender}", f"ip:{request.remote_addr}"], cost)
+        if retry_after > 0:
+            self.logger.warning(f"请求过于频繁 - 发送者: {sender}, IP: {request.remote_addr}")
+            response = jsonify({
+                'success': False,
+                'error': '发送过于频繁，请稍后再试'
+            })
+            response.headers['Retry-After'] = str(math.ceil(retry_after))
+            return response, 429
+        return None
+    
+    def _intent_parser(self, household: Household) -> Optional[Callable[[str], Optional[dict]]]:
+        """文字提醒解析与家庭无关，未单独设置时使用默认家庭的解析器"""
+        return household.intent_parser or self.default_household.intent_parser
+    
+    @staticmethod
+    def _with_etag(response, etag: str):
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    @staticmethod
+    def _not_modified(etag: str):
+        response = make_response('', 304)
+        response.set_etag(etag)
+        return response
+    
+    @staticmethod
+    def _reminder_not_found():
+        return jsonify({
+            'success': False,
+            'error': '提醒不存在'
+        }), 404
+    
+    def publish_reminder_changes(self, changes: list):
+        """推送默认家庭的提醒增量"""
+        self.default_household.publish_reminder_changes(changes)
+    
+    def publish_event(self, event: str, data: dict):
+        """向默认家庭推送自定义事件(如语音播报状态)"""
+        self.events.publish(event, data)
+    
+    def add_household(self, household_id: str, message_callback: Optional[Callable] = None,
+                      voice_output: Optional[Callable[[str], None]] = None,
+                      limits: Optional[dict] = None,
+                      voice_interrupt: Optional[Callable[[], None]] = None) -> Optional[Household]:
+        """登记一个家庭，之后通过 /h/<household_id>/ 访问
+        
+        message_callback(message, sender) 处理该家庭收到的消息，voice_output(text)
+        为该家庭的语音输出目标，voice_interrupt() 停止该家庭正在进行的提醒播报
+        (不提供时提醒不会互相打断)；limits 覆盖 HOUSEHOLD_CONFIG 中的资源上限。
+        ID无效、已存在或家庭数量超过上限时返回None。
+        """
+        return self.households.create(household_id, message_callback=message_callback,
+                                      voice_output=voice_output, limits=limits,
+                                      voice_interrupt=voice_interrupt)
+    
+    def remove_household(self, household_id: str) -> bool:
+        """移除家庭，断开其推送连接并停止其提醒和消息处理"""
+        if household_id == DEFAULT_HOUSEHOLD:
+            return False
+        return self.households.remove(household_id)
     
     def stop(self):
-        """停止Web服务器"""
+        """停止Web服务器 - 停止接收新请求，等待进行中的请求完成"""
+        # 先关闭推送连接，否则长连接会一直占用请求线程
+        for household in self.households.all():
+            household.events.close()
+        if self.running and self.server:
+            try:
+                self.server.stop()
+            except Exception as e:
+                self.logger.error(f"Web服务器停止失败: {e}")
+            if self.server_thread:
+                self.server_thread.join(timeout=WEB_CONFIG['SHUTDOWN_TIMEOUT'])
         self.running = False
-        # Flask开发服务器没有优雅关闭的方法，在生产环境中应使用WSGI服务器
+        self.households.shutdown()
         self.logger.info("Web服务器停止")
     
     def get_message_history(self, limit: int = 10) -> list:
         """获取消息历史"""
-        return self.message_history[-limit:] if self.message_history else []
+        return self.message_store.latest(limit)
     
     def clear_message_history(self):
         """清空消息历史"""
-        self.message_history.clear()
+        self.message_store.clear()
         self.logger.info("消息历史已清空")
 
 if __name__ == "__main__":
     # 测试代码
     import sys
     import os
+    import time
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     
     logging.basicConfig(level=logging.INFO)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+WSGI服务后端模块 - 为Web服务器提供可停止的多线程HTTP服务
+"""
+
+import logging
+import threading
+import time
+from typing import Callable
+
+from werkzeug.serving import ThreadedWSGIServer, WSGIRequestHandler
+
+from config import WEB_CONFIG
+
+class _KeepAliveRequestHandler(WSGIRequestHandler):
+    """支持HTTP/1.1长连接的请求处理器，空闲连接超时后关闭"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_request(self, code="-", size="-"):
+        # 访问日志降到DEBUG级别，避免高并发时刷屏
+        logging.getLogger(__name__).debug(f"{self.address_string()} {self.requestline} {code}")
+
+class ThreadedBackend:
+    """基于Werkzeug的多线程服务后端(无需额外依赖)
+
+    每个连接一个线程，适合长连接/推送类请求。stop() 停止接收新连接，
+    并在超时时间内等待进行中的请求完成。
+    """
+
+    name = 'threaded'
+    worker_threads = None  # 每个连接一个线程，不限制
+
+    def __init__(self, app: Callable, host: str, port: int,
+                 threads: int = None, keep_alive: float = None, shutdown_timeout: float = None):
+        self.logger = logging.getLogger(__name__)
+        self.shutdown_timeout = WEB_CONFIG['SHUTDOWN_TIMEOUT'] if shutdown_timeout is None else shutdown_timeout
+
+        self._active = 0
+        self._active_lock = threading.Condition()
+
+        handler = type('RequestHandler', (_KeepAliveRequestHandler,), {
+            'timeout': WEB_CONFIG['KEEP_ALIVE_TIMEOUT'] if keep_alive is None else keep_alive
+        })
+        self._server = ThreadedWSGIServer(host, port, self._track(app), handler=handler)
+        self.port = self._server.server_port
+
+    def _track(self, app: Callable) -> Callable:
+        """统计进行中的请求，用于优雅关闭"""
+        def tracked_app(environ, start_response):
+            with self._active_lock:
+                self._active += 1
+            try:
+                # 响应体在请求线程内完整写出，因此这里包含了整个请求过程
+                iterable = app(environ, start_response)
+                try:
+                    yield from iterable
+                finally:
+                    if hasattr(iterable, 'close'):
+                        iterable.close()
+            finally:
+                with self._active_lock:
+                    self._active -= 1
+                    self._active_lock.notify_all()
+        return tracked_app
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        deadline = time.monotonic() + self.shutdown_timeout
+        with self._active_lock:
+            while self._active and time.monotonic() < deadline:
+                self._active_lock.wait(deadline - time.monotonic())
+            if self._active:
+                self.logger.warning(f"仍有 {self._active} 个请求未完成，强制关闭")
+        self._server.server_close()
+
+class WaitressBackend:
+    """基于waitress的服务后端(需要安装waitress)
+
+    固定数量的工作线程，由异步IO线程负责连接和长连接管理，内存占用稳定。
+    """
+
+    name = 'waitress'
+
+    def __init__(self, app: Callable, host: str, port: int,
+                 threads: int = None, keep_alive: float = None, shutdown_timeout: float = None):
+        from waitress.server import create_server
+
+        self.logger = logging.getLogger(__name__)
+        self.shutdown_timeout = WEB_CONFIG['SHUTDOWN_TIMEOUT'] if shutdown_timeout is None else shutdown_timeout
+        self.worker_threads = threads or WEB_CONFIG['SERVER_THREADS']
+        self._server = create_server(
+            app, host=host, port=port,
+            threads=self.worker_threads,
+            channel_timeout=WEB_CONFIG['KEEP_ALIVE_TIMEOUT'] if keep_alive is None else keep_alive,
+            cleanup_interval=5,
+            ident='voice-reminder'
+        )
+        self.port = self._server.effective_port
+
+    def serve_forever(self):
+        self._server.run()
+
+    def stop(self):
+        from waitress import wasyncore
+
+        # 先停止接收新连接，再等待工作线程处理完进行中的请求，最后关闭剩余连接让IO循环退出
+        self._server.close()
+        self._server.task_dispatcher.shutdown(timeout=self.shutdown_timeout)
+        wasyncore.close_all(self._server._map)
+
+BACKENDS = {
+    ThreadedBackend.name: ThreadedBackend,
+    WaitressBackend.name: WaitressBackend,
+}
+
+def create_backend(app: Callable, host: str, port: int, backend: str = None, **options):
+    """按名称创建服务后端，可选后端不可用时回退到多线程后端"""
+    logger = logging.getLogger(__name__)
+    name = backend or WEB_CONFIG['SERVER_BACKEND']
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"未知的Web服务后端: {name}，可选: {', '.join(BACKENDS)}")
+
+    try:
+        return backend_class(app, host, port, **options)
+    except ImportError as e:
+        logger.warning(f"Web服务后端 {name} 不可用({e})，改用 {ThreadedBackend.name}")
+        return ThreadedBackend(app, host, port, **options)
@@ -3,7 +3,6 @@
 科大讯飞语音合成模块
 """
 
-import websocket
 import datetime
 import hashlib
 import base64
@@ -20,6 +19,8 @@ import logging
 import tempfile
 import os
 
+from src.state_machine import OperationCancelled, on_cancel
+
 STATUS_FIRST_FRAME = 0  # 第一帧的标识
 STATUS_CONTINUE_FRAME = 1  # 中间帧标识
 STATUS_LAST_FRAME = 2  # 最后一帧的标识
@@ -128,8 +129,15 @@ class XunfeiTTS:
             
         thread.start_new_thread(run, ())
 
-    def synthesis(self, text, voice='xiaoyan', speed=50, pitch=50, volume=50):
-        """语音合成"""
+    def _abort(self, ws):
+        """立即中止连接 - 可在任意线程调用，run_forever 随即退出"""
+        ws.keep_running = False
+        if ws.sock:
+            ws.sock.abort()
+        self.synthesis_complete = True
+
+    def synthesis(self, text, voice='xiaoyan', speed=50, pitch=50, volume=50, cancel_token=None):
+        """语音合成 - cancel_token 被取消时立即断开连接并抛出 OperationCancelled"""
         try:
             self.logger.info(f"开始语音合成: {text}")
             self.audio_data = b''
@@ -153,7 +161,8 @@ class XunfeiTTS:
                 "text": str(base64.b64encode(text.encode('utf-8')), "UTF8")
             }
             
-            # 创建WebSocket连接
+            # 创建WebSocket连接 - websocket库在第一次合成时才导入
+            import websocket
             ws_url = self.create_url()
             self.logger.debug(f"WebSocket URL: {ws_url[:100]}...")
             
@@ -169,17 +178,25 @@ class XunfeiTTS:
             ws_thread.daemon = True
             ws_thread.start()
             
-            # 等待合成完成
+            # 等待合成完成，取消时直接关闭底层socket，不等待服务端的关闭握手
             timeout = 30  # 30秒超时
             start_time = time.time()
-            while not self.synthesis_complete and (time.time() - start_time) < timeout:
-                time.sleep(0.1)
+            with on_cancel(cancel_token, lambda: self._abort(ws)):
+                while not self.synthesis_complete and (time.time() - start_time) < timeout:
+                    if cancel_token is not None and cancel_token.wait(0.02):
+                        break
+                    elif cancel_token is None:
+                        time.sleep(0.1)
                 
             # 确保WebSocket连接关闭
             try:
                 ws.close()
             except:
                 pass
+            
+            if cancel_token is not None and cancel_token.cancelled:
+                self.logger.info("语音合成已取消")
+                raise OperationCancelled()
                 
             elapsed_time = time.time() - start_time
             self.logger.info(f"语音合成耗时: {elapsed_time:.2f}秒")
@@ -200,6 +217,8 @@ class XunfeiTTS:
             self.logger.info(f"音频文件保存到: {temp_file.name}")
             return temp_file.name
             
+        except OperationCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"科大讯飞语音合成失败: {e}")
-            return None
\ No newline at end of file
+            return None